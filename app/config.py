@@ -7,4 +7,127 @@ STEAM_API_KEY = os.getenv("STEAM_API_KEY")
 PSN_API_KEY = os.getenv("PSN_API_KEY")
 XBOX_API_KEY = os.getenv("XBOX_API_KEY")
 IGDB_CLIENT_ID = os.getenv("IGDB_CLIENT_ID")
-IGDB_ACCESS_TOKEN = os.getenv("IGDB_ACCESS_TOKEN")
\ No newline at end of file
+IGDB_ACCESS_TOKEN = os.getenv("IGDB_ACCESS_TOKEN")
+TWITCH_CLIENT_SECRET = os.getenv("TWITCH_CLIENT_SECRET")
+
+# Número máximo de chamadas simultâneas à Steam API por requisição
+STEAM_MAX_CONCURRENCY = int(os.getenv("STEAM_MAX_CONCURRENCY", "16"))
+
+# Cache de schemas de conquistas (GetSchemaForGame): TTL em segundos e tamanho do LRU em memória
+STEAM_SCHEMA_CACHE_TTL = int(os.getenv("STEAM_SCHEMA_CACHE_TTL", "86400"))
+STEAM_SCHEMA_CACHE_SIZE = int(os.getenv("STEAM_SCHEMA_CACHE_SIZE", "2048"))
+
+# Cache das porcentagens globais de conquistas (índice de raridade) por appid
+STEAM_RARITY_CACHE_TTL = int(os.getenv("STEAM_RARITY_CACHE_TTL", "21600"))
+STEAM_RARITY_CACHE_SIZE = int(os.getenv("STEAM_RARITY_CACHE_SIZE", "4096"))
+
+# Cache negativo: appids sem schema de conquistas e (steamid, appid) inacessíveis (perfil privado, jogo sem estatísticas)
+STEAM_NO_SCHEMA_TTL = int(os.getenv("STEAM_NO_SCHEMA_TTL", "604800"))
+STEAM_INACCESSIBLE_TTL = int(os.getenv("STEAM_INACCESSIBLE_TTL", "3600"))
+STEAM_NEGATIVE_CACHE_SIZE = int(os.getenv("STEAM_NEGATIVE_CACHE_SIZE", "50000"))
+
+# Cache de perfis (GetPlayerSummaries) por steamid: TTL em segundos e tamanho do LRU
+STEAM_SUMMARY_CACHE_TTL = int(os.getenv("STEAM_SUMMARY_CACHE_TTL", "300"))
+STEAM_SUMMARY_CACHE_SIZE = int(os.getenv("STEAM_SUMMARY_CACHE_SIZE", "10000"))
+
+# Cache de resolução de identidades (vanity URL Steam, gamertag Xbox, online id PSN):
+# TTL (s) no banco e no LRU, tamanho do LRU e TTL (s) de nomes não encontrados
+IDENTITY_CACHE_TTL = int(os.getenv("IDENTITY_CACHE_TTL", "2592000"))
+IDENTITY_CACHE_SIZE = int(os.getenv("IDENTITY_CACHE_SIZE", "20000"))
+IDENTITY_NEGATIVE_TTL = int(os.getenv("IDENTITY_NEGATIVE_TTL", "600"))
+# Resoluções simultâneas no endpoint em lote (/identity/resolve)
+IDENTITY_RESOLVE_CONCURRENCY = int(os.getenv("IDENTITY_RESOLVE_CONCURRENCY", "8"))
+
+# Snapshot da lista de títulos Xbox por xuid: TTL (s), tempo extra (s) servindo o valor antigo
+# enquanto recarrega em segundo plano e tamanho do LRU
+XBOX_TITLES_CACHE_TTL = int(os.getenv("XBOX_TITLES_CACHE_TTL", "120"))
+XBOX_TITLES_STALE_TTL = int(os.getenv("XBOX_TITLES_STALE_TTL", "900"))
+XBOX_TITLES_CACHE_SIZE = int(os.getenv("XBOX_TITLES_CACHE_SIZE", "1000"))
+
+# Busca das conquistas por título Xbox: chamadas simultâneas e timeout (s) por título
+# (o timeout vale para cada tentativa e começa depois da espera no limitador de chamadas da xbl.io)
+XBOX_MAX_CONCURRENCY = int(os.getenv("XBOX_MAX_CONCURRENCY", "8"))
+XBOX_TITLE_TIMEOUT = float(os.getenv("XBOX_TITLE_TIMEOUT", "10"))
+
+# PSN: renovação antecipada (s) do access token e threads dedicadas às chamadas do PSNAWP
+PSN_TOKEN_REFRESH_MARGIN = int(os.getenv("PSN_TOKEN_REFRESH_MARGIN", "300"))
+PSN_WORKERS = int(os.getenv("PSN_WORKERS", "4"))
+
+# Cache de troféus PSN por conta: TTL (s), tempo extra (s) servindo o valor antigo enquanto recarrega,
+# tamanho do LRU e títulos por chamada à Sony ao baixar a lista de títulos
+PSN_TROPHY_CACHE_TTL = int(os.getenv("PSN_TROPHY_CACHE_TTL", "900"))
+PSN_TROPHY_STALE_TTL = int(os.getenv("PSN_TROPHY_STALE_TTL", "21600"))
+PSN_TROPHY_CACHE_SIZE = int(os.getenv("PSN_TROPHY_CACHE_SIZE", "2000"))
+PSN_TITLES_PAGE_SIZE = int(os.getenv("PSN_TITLES_PAGE_SIZE", "800"))
+
+# Jobs em segundo plano: número de workers, tempo (s) sem atualização para considerar um job abandonado
+# e intervalo mínimo (s) entre gravações de progresso
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+JOB_STALE_SECONDS = int(os.getenv("JOB_STALE_SECONDS", "1800"))
+JOB_PROGRESS_INTERVAL = float(os.getenv("JOB_PROGRESS_INTERVAL", "1"))
+
+# Cliente HTTP compartilhado das APIs externas: timeouts (s), conexões por host e repetições em 429/5xx
+UPSTREAM_CONNECT_TIMEOUT = float(os.getenv("UPSTREAM_CONNECT_TIMEOUT", "5"))
+UPSTREAM_READ_TIMEOUT = float(os.getenv("UPSTREAM_READ_TIMEOUT", "15"))
+UPSTREAM_POOL_SIZE = int(os.getenv("UPSTREAM_POOL_SIZE", "32"))
+UPSTREAM_MAX_RETRIES = int(os.getenv("UPSTREAM_MAX_RETRIES", "3"))
+UPSTREAM_BACKOFF_BASE = float(os.getenv("UPSTREAM_BACKOFF_BASE", "0.5"))
+UPSTREAM_BACKOFF_MAX = float(os.getenv("UPSTREAM_BACKOFF_MAX", "10"))
+
+# Token exigido no header X-Admin-Token pelas rotas /admin (desabilitadas se vazio)
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+
+# Limites por chave de API: tokens por segundo, rajada máxima e cota diária (0 = sem cota)
+STEAM_RATE_PER_SECOND = float(os.getenv("STEAM_RATE_PER_SECOND", "10"))
+STEAM_RATE_BURST = float(os.getenv("STEAM_RATE_BURST", "20"))
+STEAM_DAILY_QUOTA = int(os.getenv("STEAM_DAILY_QUOTA", "100000"))
+XBOX_RATE_PER_SECOND = float(os.getenv("XBOX_RATE_PER_SECOND", "2"))
+XBOX_RATE_BURST = float(os.getenv("XBOX_RATE_BURST", "10"))
+XBOX_DAILY_QUOTA = int(os.getenv("XBOX_DAILY_QUOTA", "0"))
+IGDB_RATE_PER_SECOND = float(os.getenv("IGDB_RATE_PER_SECOND", "4"))
+IGDB_RATE_BURST = float(os.getenv("IGDB_RATE_BURST", "4"))
+IGDB_DAILY_QUOTA = int(os.getenv("IGDB_DAILY_QUOTA", "0"))
+# Fração da rajada reservada para chamadas interativas e fração da cota diária disponível para jobs
+RATE_LIMIT_BACKGROUND_RESERVE = float(os.getenv("RATE_LIMIT_BACKGROUND_RESERVE", "0.25"))
+RATE_LIMIT_BACKGROUND_QUOTA = float(os.getenv("RATE_LIMIT_BACKGROUND_QUOTA", "0.8"))
+# Intervalo (s) entre gravações dos contadores diários no banco
+QUOTA_FLUSH_INTERVAL = float(os.getenv("QUOTA_FLUSH_INTERVAL", "10"))
+
+# Compressão das respostas: tamanho mínimo (bytes) e níveis do gzip e do brotli
+COMPRESSION_MINIMUM_SIZE = int(os.getenv("COMPRESSION_MINIMUM_SIZE", "1024"))
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", "4"))
+
+# Cache das listas da home da IGDB (em alta, lançamentos, mais aguardados): TTL (s) e tempo extra (s)
+# em que o valor antigo continua sendo servido enquanto recarrega ou se a IGDB falhar
+IGDB_LIST_CACHE_TTL = int(os.getenv("IGDB_LIST_CACHE_TTL", "3600"))
+IGDB_LIST_STALE_TTL = int(os.getenv("IGDB_LIST_STALE_TTL", "86400"))
+
+# Índice local da busca de jogos: pontuação mínima (0 a 1) de um resultado local, número mínimo de
+# resultados locais para não consultar a IGDB e cache (TTL em s, tamanho) das buscas feitas na IGDB
+IGDB_SEARCH_MIN_SCORE = float(os.getenv("IGDB_SEARCH_MIN_SCORE", "0.8"))
+IGDB_SEARCH_MIN_RESULTS = int(os.getenv("IGDB_SEARCH_MIN_RESULTS", "5"))
+IGDB_SEARCH_CACHE_TTL = int(os.getenv("IGDB_SEARCH_CACHE_TTL", "86400"))
+IGDB_SEARCH_CACHE_SIZE = int(os.getenv("IGDB_SEARCH_CACHE_SIZE", "5000"))
+
+# Cache dos detalhes de jogos da IGDB por id (TTL em s, tamanho) e blocos de ids buscados em paralelo
+IGDB_GAME_CACHE_TTL = int(os.getenv("IGDB_GAME_CACHE_TTL", "21600"))
+IGDB_GAME_CACHE_SIZE = int(os.getenv("IGDB_GAME_CACHE_SIZE", "5000"))
+IGDB_MAX_CONCURRENCY = int(os.getenv("IGDB_MAX_CONCURRENCY", "4"))
+
+# Antecedência (s) com que o token da IGDB é renovado em segundo plano antes de expirar
+IGDB_TOKEN_REFRESH_MARGIN = int(os.getenv("IGDB_TOKEN_REFRESH_MARGIN", "86400"))
+
+# Cache de imagens da IGDB em disco (/images): diretório, limite total em bytes e max-age (s) enviado
+# aos clientes; origem das imagens, larguras permitidas para miniaturas (w<largura>), tamanho da IGDB
+# usado como fonte das miniaturas e qualidade do JPEG gerado
+IMAGE_CACHE_DIR = os.getenv("IMAGE_CACHE_DIR", "image_cache")
+IMAGE_CACHE_MAX_BYTES = int(os.getenv("IMAGE_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+IMAGE_CACHE_MAX_AGE = int(os.getenv("IMAGE_CACHE_MAX_AGE", "604800"))
+IMAGE_ORIGIN_URL = os.getenv("IMAGE_ORIGIN_URL", "https://images.igdb.com/igdb/image/upload")
+IMAGE_RESIZE_WIDTHS = {int(width) for width in os.getenv("IMAGE_RESIZE_WIDTHS", "90,180,264,320,640").split(",") if width.strip()}
+IMAGE_RESIZE_SOURCE = os.getenv("IMAGE_RESIZE_SOURCE", "1080p")
+IMAGE_RESIZE_QUALITY = int(os.getenv("IMAGE_RESIZE_QUALITY", "85"))
+# URL pública do /images (ex.: https://sua-api.onrender.com/images). Se configurada, cover_url e url
+# das respostas da IGDB apontam para o cache local em vez da CDN da IGDB
+IMAGE_PUBLIC_BASE_URL = os.getenv("IMAGE_PUBLIC_BASE_URL", "")
@@ -1,16 +1,21 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import RedirectResponse 
-from app.routes import steam_routes, playstation_routes, xbox_routes, igdb_routes
+from fastapi.responses import RedirectResponse, JSONResponse
+from app.routes import steam_routes, playstation_routes, xbox_routes, igdb_routes, job_routes, admin_routes, identity_routes, image_routes
 from app.database.database import engine
-from app.models import user_model
+from app.models import user_model, steam_model, job_model, api_usage_model, achievement_model, identity_model, xbox_model, igdb_model
+from app.utils.rate_limiter import QuotaExceededError
+from app.utils.responses import FastJSONResponse, PrettyJSONMiddleware
+from app.utils.compression import CompressionMiddleware
+from app.services.igdb_service import load_search_index
 from app.routes.user_routes import router as user_router
 import os
 
 app = FastAPI(
     title="Tracker API",
     description="API para rastreamento de jogos e conquistas entre múltiplas plataformas",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=FastJSONResponse
 )
 
 # Configure CORS
@@ -38,16 +43,32 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compressão gzip/brotli negociada pelo Accept-Encoding e ?pretty=1 para JSON indentado
+app.add_middleware(CompressionMiddleware)
+app.add_middleware(PrettyJSONMiddleware)
+
+@app.exception_handler(QuotaExceededError)
+async def quota_exceeded_handler(request: Request, exc: QuotaExceededError):
+    return JSONResponse(status_code=429, content={"detail": str(exc)})
 
 app.include_router(steam_routes.router)
 app.include_router(playstation_routes.router)
 app.include_router(xbox_routes.router)
 app.include_router(igdb_routes.router)
+app.include_router(job_routes.router)
+app.include_router(admin_routes.router)
+app.include_router(identity_routes.router)
+app.include_router(image_routes.router)
 
 
 user_model.Base.metadata.create_all(bind=engine)
 app.include_router(user_router)
 
+@app.on_event("startup")
+def load_igdb_search_index():
+    # Índice local da busca de jogos (/igdb/search), persistido no banco
+    load_search_index()
+
 @app.get("/", tags=["Root"])
 async def root():
     """Endpoint raiz - Verificar se a API está funcionando"""
@@ -0,0 +1,78 @@
+from sqlalchemy import Column, Integer, String, Text, Float, Boolean, DateTime, ForeignKey, UniqueConstraint, Index
+from datetime import datetime
+from app.database.database import Base
+
+# Tabelas normalizadas de jogos, conquistas e desbloqueios, compartilhadas entre as plataformas.
+# Contas são identificadas por (platform, account_id): steamid na Steam, xuid no Xbox.
+
+class Game(Base):
+    __tablename__ = "games"
+    __table_args__ = (UniqueConstraint("platform", "platform_game_id", name="uq_game_platform_id"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    platform = Column(String, nullable=False)
+    platform_game_id = Column(String, nullable=False)
+    name = Column(String, nullable=True)
+    icon_url = Column(String, nullable=True)
+    achievement_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<Game(platform={self.platform}, platform_game_id={self.platform_game_id})>"
+
+class AchievementDefinition(Base):
+    __tablename__ = "achievement_definitions"
+    __table_args__ = (
+        UniqueConstraint("game_id", "api_name", name="uq_achievement_definition_game_api_name"),
+        Index("ix_achievement_definitions_global_percentage", "global_percentage"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    game_id = Column(Integer, ForeignKey("games.id", ondelete="CASCADE"), nullable=False, index=True)
+    api_name = Column(String, nullable=False)
+    display_name = Column(String, nullable=True)
+    description = Column(Text, nullable=True)
+    icon_url = Column(String, nullable=True)
+    icon_locked_url = Column(String, nullable=True)
+    hidden = Column(Boolean, default=False)
+    global_percentage = Column(Float, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<AchievementDefinition(game_id={self.game_id}, api_name={self.api_name})>"
+
+class UserGame(Base):
+    __tablename__ = "user_games"
+    __table_args__ = (UniqueConstraint("platform", "account_id", "game_id", name="uq_user_game_account_game"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    platform = Column(String, nullable=False)
+    account_id = Column(String, nullable=False)
+    game_id = Column(Integer, ForeignKey("games.id", ondelete="CASCADE"), nullable=False, index=True)
+    playtime_forever = Column(Integer, default=0)
+    playtime_2weeks = Column(Integer, default=0)
+    last_played = Column(DateTime, nullable=True)
+    synced_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<UserGame(platform={self.platform}, account_id={self.account_id}, game_id={self.game_id})>"
+
+class UserAchievement(Base):
+    """
+    Conquista desbloqueada por uma conta (apenas desbloqueios são armazenados)
+    """
+    __tablename__ = "user_achievements"
+    __table_args__ = (
+        UniqueConstraint("platform", "account_id", "achievement_id", name="uq_user_achievement_account_achievement"),
+        Index("ix_user_achievements_account_game", "platform", "account_id", "game_id"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    platform = Column(String, nullable=False)
+    account_id = Column(String, nullable=False)
+    game_id = Column(Integer, ForeignKey("games.id", ondelete="CASCADE"), nullable=False)
+    achievement_id = Column(Integer, ForeignKey("achievement_definitions.id", ondelete="CASCADE"), nullable=False, index=True)
+    unlocked_at = Column(DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<UserAchievement(account_id={self.account_id}, achievement_id={self.achievement_id})>"
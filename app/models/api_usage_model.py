@@ -0,0 +1,12 @@
+from sqlalchemy import Column, Integer, String, Date
+from app.database.database import Base
+
+class ApiUsage(Base):
+    __tablename__ = "api_usage"
+
+    api = Column(String, primary_key=True)
+    day = Column(Date, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<ApiUsage(api={self.api}, day={self.day}, count={self.count})>"
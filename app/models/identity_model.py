@@ -0,0 +1,18 @@
+from sqlalchemy import Column, String, DateTime
+from datetime import datetime
+from app.database.database import Base
+
+class ResolvedIdentity(Base):
+    """
+    Nome legível (vanity URL, gamertag, online id) já resolvido para o id da plataforma
+    """
+    __tablename__ = "resolved_identities"
+
+    platform = Column(String, primary_key=True)
+    name_key = Column(String, primary_key=True)
+    name = Column(String, nullable=False)
+    platform_id = Column(String, nullable=False, index=True)
+    resolved_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f"<ResolvedIdentity(platform={self.platform}, name={self.name}, platform_id={self.platform_id})>"
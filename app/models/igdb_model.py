@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from datetime import datetime
+from app.database.database import Base
+
+class IgdbGameName(Base):
+    """
+    Nome e capa de um jogo já visto em respostas da IGDB, base do índice local de busca
+    """
+    __tablename__ = "igdb_game_names"
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    name = Column(String, nullable=False)
+    cover_image_id = Column(String, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f"<IgdbGameName(id={self.id}, name={self.name})>"
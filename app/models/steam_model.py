@@ -0,0 +1,35 @@
+from sqlalchemy import Column, Integer, String, DateTime, JSON, ForeignKey, UniqueConstraint
+from datetime import datetime
+from app.database.database import Base
+
+class SteamAchievementSchema(Base):
+    __tablename__ = "steam_achievement_schemas"
+
+    appid = Column(Integer, primary_key=True)
+    language = Column(String, primary_key=True)
+    achievements = Column(JSON, nullable=False)
+    fetched_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f"<SteamAchievementSchema(appid={self.appid}, language={self.language})>"
+
+class SteamGameSnapshot(Base):
+    __tablename__ = "steam_game_snapshots"
+    __table_args__ = (UniqueConstraint("user_id", "appid", name="uq_steam_game_snapshot_user_app"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    steam_id = Column(String, nullable=False)
+    appid = Column(Integer, nullable=False)
+    playtime_forever = Column(Integer, default=0)
+    rtime_last_played = Column(Integer, default=0)
+    total_achievements = Column(Integer, default=0)
+    achieved_achievements = Column(Integer, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    @property
+    def is_platinum(self) -> bool:
+        return bool(self.total_achievements) and self.achieved_achievements == self.total_achievements
+
+    def __repr__(self):
+        return f"<SteamGameSnapshot(user_id={self.user_id}, appid={self.appid})>"
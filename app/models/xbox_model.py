@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, String, DateTime, JSON
+from datetime import datetime
+from app.database.database import Base
+
+class XboxTitleSnapshot(Base):
+    """
+    Contadores de progresso de um título Xbox e a última lista de conquistas buscada para ele
+    """
+    __tablename__ = "xbox_title_snapshots"
+
+    xuid = Column(String, primary_key=True)
+    title_id = Column(String, primary_key=True)
+    last_time_played = Column(String, nullable=True)
+    current_achievements = Column(Integer, nullable=True)
+    total_achievements = Column(Integer, nullable=True)
+    current_gamerscore = Column(Integer, nullable=True)
+    achievements = Column(JSON, nullable=False)
+    fetched_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f"<XboxTitleSnapshot(xuid={self.xuid}, title_id={self.title_id})>"
@@ -0,0 +1,37 @@
+import secrets
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from typing import Optional
+from app.config import ADMIN_TOKEN
+from app.services.steam_service import invalidateGameAchievementSchema
+from app.services.image_service import cache_stats as image_cache_stats
+from app.utils import upstream, rate_limiter
+
+def require_admin(x_admin_token: str | None = Header(None)) -> None:
+    if not ADMIN_TOKEN or not x_admin_token or not secrets.compare_digest(x_admin_token, ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Acesso restrito")
+
+router = APIRouter(prefix="/admin", tags=["Admin"], dependencies=[Depends(require_admin)])
+
+# Contadores de uso dos pools de conexão das APIs externas.
+@router.get("/upstream")
+def upstream_stats():
+    return upstream.pool_stats()
+
+# Uso atual das cotas diárias e dos token buckets de cada API externa.
+@router.get("/quota")
+def quota_usage():
+    return rate_limiter.usage()
+
+# Ocupação do cache de imagens em disco (/images).
+@router.get("/image-cache")
+def image_cache_usage():
+    return image_cache_stats()
+
+# Invalida o schema de conquistas Steam em cache de um jogo (memória e banco de dados).
+@router.delete("/steam/schema-cache/{appid}")
+def invalidate_steam_schema_cache(
+    appid: int,
+    language: Optional[str] = Query(None, description="Idioma do schema; todos se omitido")
+):
+    deleted = invalidateGameAchievementSchema(appid, language)
+    return {"appid": appid, "language": language, "deleted": deleted}
@@ -0,0 +1,42 @@
+from fastapi import APIRouter
+import asyncio
+from typing import Callable, Dict, Optional
+from app.schemas.identity_schema import IdentityQuery, IdentityResolveRequest, IdentityResolveResponse
+from app.services.identity_service import STEAM, XBOX, PSN, IdentityLookupError
+from app.services.steam_service import resolveVanityURL, extractVanityFromURL
+from app.services.xbox_service import resolveXUID
+from app.services.playstation_service import resolveAccountId, PSNUnavailableError
+from psnawp_api.core.psnawp_exceptions import PSNAWPError
+from app.utils.concurrency import gather_bounded
+from app.config import IDENTITY_RESOLVE_CONCURRENCY
+
+router = APIRouter(prefix="/identity", tags=["Identidades"])
+
+def _resolveSteam(name: str) -> Optional[str]:
+    # Aceita também a URL completa do perfil
+    if "steamcommunity.com" in name:
+        name = extractVanityFromURL(name) or ""
+    return resolveVanityURL(name) if name else None
+
+_RESOLVERS: Dict[str, Callable[[str], Optional[str]]] = {
+    STEAM: _resolveSteam,
+    XBOX: resolveXUID,
+    PSN: resolveAccountId,
+}
+
+# Resolve vários nomes (vanity URL / URL de perfil Steam, gamertag Xbox, online id PSN) de uma vez.
+@router.post("/resolve", response_model=IdentityResolveResponse)
+async def resolve_identities(payload: IdentityResolveRequest):
+    """
+    Nomes já resolvidos vêm do cache de identidades; os demais são consultados em paralelo.
+    """
+    async def resolve(item: IdentityQuery) -> dict:
+        try:
+            platform_id = await asyncio.to_thread(_RESOLVERS[item.platform], item.name)
+        except (IdentityLookupError, PSNUnavailableError, PSNAWPError):
+            # Plataforma fora do ar (ou PSN não configurada) não derruba o lote inteiro
+            return {"platform": item.platform, "name": item.name, "id": None, "error": "unavailable"}
+        return {"platform": item.platform, "name": item.name, "id": platform_id}
+
+    results = await gather_bounded(payload.items, resolve, IDENTITY_RESOLVE_CONCURRENCY)
+    return {"results": results}
@@ -1,15 +1,36 @@
 from fastapi import APIRouter, HTTPException
 from fastapi.params import Query
 import requests
-from app.services.igdb_service import get_game_by_id, get_trending_games, get_upcoming_games, get_anticipated_games, fetch_games_from_igdb
+from app.services.igdb_token_service import IGDBUnavailableError
+from app.utils.rate_limiter import QuotaExceededError
+from app.services.igdb_service import get_game_by_id, get_games_by_ids, get_trending_games, get_upcoming_games, get_anticipated_games, get_home_feed, find_games
 
 router = APIRouter(prefix="/igdb", tags=["IGDB"])
 
+# Em alta, lançamentos e mais aguardados em uma única chamada à IGDB
+@router.get("/home")
+def home_feed():
+    try:
+        return get_home_feed()
+    except IGDBUnavailableError as err:
+        raise HTTPException(status_code=503, detail=str(err))
+    except requests.HTTPError as err:
+        raise HTTPException(status_code=502, detail=str(err))
+    except QuotaExceededError:
+        # Respondida com 429 pelo handler do app
+        raise
+    except Exception as err:
+        raise HTTPException(status_code=500, detail=f"Erro interno: {err}")
+
 @router.get("/trending")
 def trending_games():
     try:
         games = get_trending_games()
         return games
+    except IGDBUnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except QuotaExceededError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     
@@ -18,8 +39,12 @@ def upcoming_games():
     try:
         games = get_upcoming_games()
         return games
+    except IGDBUnavailableError as err:
+        raise HTTPException(status_code=503, detail=str(err))
     except requests.HTTPError as err:
         raise HTTPException(status_code=502, detail=str(err))
+    except QuotaExceededError:
+        raise
     except Exception as err:
         raise HTTPException(status_code=500, detail=f"Erro interno: {err}")
     
@@ -28,11 +53,40 @@ def anticipated_games():
     try:
         games = get_anticipated_games()
         return games
+    except IGDBUnavailableError as err:
+        raise HTTPException(status_code=503, detail=str(err))
     except requests.HTTPError as err:
         raise HTTPException(status_code=502, detail=str(err))
+    except QuotaExceededError:
+        raise
     except Exception as err:
         raise HTTPException(status_code=500, detail=f"Erro interno: {err}")
   
+# Detalhes de vários jogos de uma vez (?ids=1,2,3); só os ids fora do cache são buscados na IGDB
+@router.get("/games")
+def get_games_details(ids: str = Query(..., description="Ids IGDB separados por vírgula (até 1000)")):
+    try:
+        game_ids = list(dict.fromkeys(int(game_id) for game_id in ids.split(",") if game_id.strip()))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="ids deve ser uma lista de números separados por vírgula")
+    if not game_ids or len(game_ids) > 1000:
+        raise HTTPException(status_code=400, detail="Informe entre 1 e 1000 ids")
+
+    try:
+        games = get_games_by_ids(game_ids)
+    except IGDBUnavailableError as err:
+        raise HTTPException(status_code=503, detail=str(err))
+    except requests.HTTPError as err:
+        raise HTTPException(status_code=502, detail=str(err))
+    except QuotaExceededError:
+        raise
+    except Exception as err:
+        raise HTTPException(status_code=500, detail=f"Erro interno: {err}")
+    return {
+        "games": [games[game_id] for game_id in game_ids if game_id in games],
+        "not_found": [game_id for game_id in game_ids if game_id not in games]
+    }
+
 @router.get("/games/{game_id}")
 def get_game_details(game_id: int):
     try:
@@ -40,15 +94,25 @@ def get_game_details(game_id: int):
         if not game:
             raise HTTPException(status_code=404, detail="Game not found")
         return game
+    except HTTPException:
+        raise
+    except IGDBUnavailableError as err:
+        raise HTTPException(status_code=503, detail=str(err))
     except requests.HTTPError as err:
         raise HTTPException(status_code=502, detail=str(err))
+    except QuotaExceededError:
+        raise
     except Exception as err:
         raise HTTPException(status_code=500, detail=f"Internal error: {err}")
 
 @router.get("/search")
 def search_games(q: str = Query(..., min_length=3)):
     try:
-        games = fetch_games_from_igdb(q)
+        games = find_games(q)
         return games
+    except IGDBUnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except QuotaExceededError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
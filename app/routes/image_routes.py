@@ -0,0 +1,31 @@
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import Response
+import requests
+from app.config import IMAGE_CACHE_MAX_AGE
+from app.services.image_service import get_image, is_valid_image, ImageNotFoundError
+
+router = APIRouter(prefix="/images", tags=["Images"])
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or etag in tags or f"W/{etag}" in tags
+
+# Capas e screenshots da IGDB servidas a partir do cache em disco.
+# size: tamanho da IGDB (cover_big, 1080p, ...) ou miniatura w<largura> (ex.: w180)
+@router.get("/{image_id}/{size}")
+def cached_image(image_id: str, size: str, request: Request):
+    if not is_valid_image(image_id, size):
+        raise HTTPException(status_code=404, detail="Imagem não encontrada")
+    try:
+        data, digest = get_image(image_id, size)
+    except ImageNotFoundError:
+        raise HTTPException(status_code=404, detail="Imagem não encontrada")
+    except requests.RequestException as err:
+        raise HTTPException(status_code=502, detail=str(err))
+
+    # O conteúdo de um image_id na IGDB não muda, então a resposta pode ficar no cache do cliente
+    etag = f'"{digest}"'
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={IMAGE_CACHE_MAX_AGE}, immutable"}
+    if _etag_matches(request.headers.get("if-none-match", ""), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=data, media_type="image/jpeg", headers=headers)
@@ -0,0 +1,16 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from app.routes.user_routes import get_current_user, get_db
+from app.models.user_model import User
+from app.schemas.job_schema import JobOut
+from app.services.job_service import get_job
+
+router = APIRouter(prefix="/jobs", tags=["Jobs"])
+
+# Retorna o status, o progresso (jogos processados / total) e o resultado de um job.
+@router.get("/{job_id}", response_model=JobOut)
+def job_status(job_id: str, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    job = get_job(db, job_id)
+    if not job or job.user_id != current_user.id:
+        raise HTTPException(status_code=404, detail="Job não encontrado")
+    return job
@@ -1,13 +1,62 @@
 from fastapi import APIRouter, HTTPException, Query
 from fastapi.responses import Response
 import json
-from app.services.playstation_service import getProfileInfo
+from typing import Optional
+from psnawp_api.core.psnawp_exceptions import PSNAWPError, PSNAWPForbiddenError
+from app.services.playstation_service import (
+    getProfileInfoAsync,
+    getTrophySummaryAsync,
+    getTrophyTitlesPageAsync,
+    PSNUnavailableError
+)
 
 router = APIRouter(prefix="/psn", tags=["Playstation"])
 
 @router.get("/profile/{psnid}")
-def psn_profile(psnid: str):
-    info = getProfileInfo(psnid)
+async def psn_profile(psnid: str):
+    try:
+        info = await getProfileInfoAsync(psnid)
+    except PSNUnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except PSNAWPError as e:
+        raise HTTPException(status_code=502, detail=str(e))
     if not info:
         raise HTTPException(status_code=404, detail="Usuário PSN não encontrado")
     return info
+
+@router.get("/profile/{psnid}/trophies")
+async def psn_trophy_summary(psnid: str):
+    try:
+        summary = await getTrophySummaryAsync(psnid)
+    except PSNUnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except PSNAWPForbiddenError:
+        raise HTTPException(status_code=403, detail="Os troféus deste perfil são privados")
+    except PSNAWPError as e:
+        raise HTTPException(status_code=502, detail=str(e))
+    if not summary:
+        raise HTTPException(status_code=404, detail="Usuário PSN não encontrado")
+    return summary
+
+# Títulos com troféus, do jogado mais recentemente para o mais antigo, paginados sobre a lista em cache
+@router.get("/profile/{psnid}/titles")
+async def psn_trophy_titles(
+    psnid: str,
+    page: int = Query(1, ge=1),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Cursor retornado em next_cursor; substitui page")
+):
+    try:
+        result = await getTrophyTitlesPageAsync(psnid, limit, cursor, page)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except PSNUnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except PSNAWPForbiddenError:
+        raise HTTPException(status_code=403, detail="Os troféus deste perfil são privados")
+    except PSNAWPError as e:
+        raise HTTPException(status_code=502, detail=str(e))
+    if result is None:
+        raise HTTPException(status_code=404, detail="Usuário PSN não encontrado")
+    titles, next_cursor, total = result
+    return {"titles": titles, "total": total, "next_cursor": next_cursor}
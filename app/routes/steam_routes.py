@@ -1,19 +1,34 @@
 from fastapi import APIRouter, HTTPException, Query, Depends
-from fastapi.responses import Response
-import json
+import asyncio
+import heapq
+import itertools
+import httpx
+from datetime import timezone
+from typing import List, Optional, Tuple
 from sqlalchemy.orm import Session
 from app.routes.user_routes import get_current_user, get_db
-from app.services.user_service import update_steam_id, update_general_stats, get_general_stats_by_id
+from app.services.user_service import update_steam_id, get_general_stats_by_id
+from app.services.identity_service import IdentityLookupError
+from app.services.steam_sync_service import steamStatsSyncJob, STEAM_STATS_SYNC_JOB
+from app.services.job_service import submitJob
+from app.services.achievement_store_service import STEAM, has_synced_account, get_account_stats, get_rare_unlocks, count_rare_unlocks
 from app.models.user_model import User
+from app.schemas.steam_schema import SteamProfilesBatchRequest, SteamProfilesBatchResponse
 from app.services.steam_service import (
     getPlayerSummary, 
+    getPlayerSummariesAsync,
     getOwnedGames,
     getPlayerStats,
     resolveVanityURL,
-    getPlayerAchievements,
-    getGameAchievementSchema,
-    getGlobalAchievementPercentagesForApp
+    getOwnedGamesAsync,
+    getPlayerAchievementsAsync,
+    getGameAchievementSchemaAsync,
+    getAchievementRarityIndexAsync,
+    hasAchievementStats
 )
+from app.utils.concurrency import gather_bounded, iter_bounded
+from app.utils.responses import ndjson_response
+from app.config import STEAM_MAX_CONCURRENCY
 
 router = APIRouter(prefix="/steam", tags=["Steam"])
 
@@ -23,7 +38,20 @@ def steam_profile(steamid):
     profile = getPlayerSummary(steamid)
     if not profile:
         raise HTTPException(status_code=404, detail="Usuário Steam não encontrado")
-    return Response(content=json.dumps(profile, indent=2, ensure_ascii=False), media_type="application/json")
+    return profile
+
+# Obtém os perfis de vários steamids de uma vez (até 100 por chamada à Steam).
+@router.post("/profiles:batch", response_model=SteamProfilesBatchResponse)
+async def steam_profiles_batch(payload: SteamProfilesBatchRequest):
+    steamids = list(dict.fromkeys(s.strip() for s in payload.steamids if s.strip()))
+    try:
+        profiles = await getPlayerSummariesAsync(steamids)
+    except httpx.HTTPError:
+        raise HTTPException(status_code=502, detail="Erro ao consultar a Steam API")
+    return {
+        "profiles": [profiles[steamid] for steamid in steamids if steamid in profiles],
+        "not_found": [steamid for steamid in steamids if steamid not in profiles]
+    }
 
 # Obtém todos os jogos do usuário a partir do steamid.
 @router.get("/profile/games/{steamid}")
@@ -31,7 +59,7 @@ def profile_games(steamid):
     games = getOwnedGames(steamid)
     if not games:
         raise HTTPException(status_code=404, detail="Usuário Steam não encontrado")
-    return Response(content=json.dumps(games, indent=2, ensure_ascii=False))
+    return games
 
 # Obtém estatísticas básicas do jogador
 @router.get("/profile/stats/{steamid}")
@@ -44,10 +72,7 @@ def player_stats(steamid: str):
     if "error" in stats:
         raise HTTPException(status_code=400, detail=stats["error"])
     
-    return Response(
-        content=json.dumps(stats, indent=2, ensure_ascii=False), 
-        media_type="application/json"
-    )
+    return stats
 # Salva o SteamID no usuário autenticado.
 @router.post("/save-steamid")
 def save_steamid_from_vanity(
@@ -55,7 +80,10 @@ def save_steamid_from_vanity(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    steamid = resolveVanityURL(vanity_url)
+    try:
+        steamid = resolveVanityURL(vanity_url)
+    except IdentityLookupError as e:
+        raise HTTPException(status_code=502, detail=str(e))
     if not steamid:
         raise HTTPException(status_code=404, detail="Vanity URL não encontrada")
     update_steam_id(db, current_user, steamid)
@@ -63,70 +91,66 @@ def save_steamid_from_vanity(
 
 # Retorna as conquistas de todos os jogos do usuário a partir do steamid, incluindo ícones.
 @router.get("/profile/achievements/{steamid}")
-def all_games_achievements(steamid: str):
-    owned_games = getOwnedGames(steamid)
-    games = owned_games.get("games", [])
-    achievements_list = []
+async def all_games_achievements(
+    steamid: str,
+    stream: Optional[str] = Query(None, pattern="^ndjson$", description="ndjson: envia um jogo por linha assim que ficar pronto")
+):
+    owned_games = await getOwnedGamesAsync(steamid)
+    games = [game for game in owned_games.get("games", []) if game.get("appid")]
 
-    for game in games:
+    async def fetchGameAchievements(game: dict) -> dict:
         appid = game.get("appid")
         name = game.get("name", "Desconhecido")
 
-        if appid:
-            # Pega conquistas do jogador
-            player_achievements = getPlayerAchievements(steamid, appid).get("achievements", [])
-            # Pega o schema com os ícones
-            schema_achievements = getGameAchievementSchema(appid)
-
-            # Cria um dicionário para mapear por API name
-            schema_map = {a["name"]: a for a in schema_achievements}
-
-            # Enriquecer cada conquista com ícone
-            enriched_achievements = []
-            for ach in player_achievements:
-                schema = schema_map.get(ach.get("apiname"))
-                enriched_achievements.append({
-                    "name": ach.get("name"),
-                    "apiname": ach.get("apiname"),
-                    "achieved": ach.get("achieved"),
-                    "unlocktime": ach.get("unlocktime"),
-                    "icon": schema.get("icon") if schema else None,
-                    "icongray": schema.get("icongray") if schema else None,
-                    "description": schema.get("description") if schema else "",
-                })
-
-            achievements_list.append({
-                "appid": appid,
-                "name": name,
-                "achievements": enriched_achievements,
-                "total_achievements": len(enriched_achievements),
-                "achieved_achievements": len([a for a in enriched_achievements if a["achieved"] == 1])
+        # Jogos sem estatísticas (demos, ferramentas, trilhas sonoras) não têm conquistas para buscar
+        if not hasAchievementStats(game):
+            player_data, schema_achievements = {}, []
+        else:
+            # Pega conquistas do jogador e o schema com os ícones em paralelo
+            player_data, schema_achievements = await asyncio.gather(
+                getPlayerAchievementsAsync(steamid, appid),
+                getGameAchievementSchemaAsync(appid)
+            )
+        player_achievements = player_data.get("achievements", [])
+
+        # Cria um dicionário para mapear por API name
+        schema_map = {a["name"]: a for a in schema_achievements}
+
+        # Enriquecer cada conquista com ícone
+        enriched_achievements = []
+        for ach in player_achievements:
+            schema = schema_map.get(ach.get("apiname"))
+            enriched_achievements.append({
+                "name": ach.get("name"),
+                "apiname": ach.get("apiname"),
+                "achieved": ach.get("achieved"),
+                "unlocktime": ach.get("unlocktime"),
+                "icon": schema.get("icon") if schema else None,
+                "icongray": schema.get("icongray") if schema else None,
+                "description": schema.get("description") if schema else "",
             })
 
-    return Response(content=json.dumps(achievements_list, indent=2, ensure_ascii=False), media_type="application/json")
+        return {
+            "appid": appid,
+            "name": name,
+            "achievements": enriched_achievements,
+            "total_achievements": len(enriched_achievements),
+            "achieved_achievements": len([a for a in enriched_achievements if a["achieved"] == 1])
+        }
 
-# Atualiza as estatísticas gerais do usuário baseado nos dados do Steam.
-@router.post("/update-general-stats")
-def update_steam_general_stats(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
-):
+    if stream == "ndjson":
+        return ndjson_response(iter_bounded(games, fetchGameAchievements, STEAM_MAX_CONCURRENCY))
+
+    achievements_list = await gather_bounded(games, fetchGameAchievements, STEAM_MAX_CONCURRENCY)
+
+    return achievements_list
+
+async def _calculateGeneralStats(steamid: str) -> dict:
     """
-    Atualiza as estatísticas gerais do usuário baseado nos dados do Steam.
+    Calcula as estatísticas gerais a partir dos dados do Steam, buscando as conquistas em paralelo.
     """
-    if not current_user.steam_id:  # type: ignore
-        raise HTTPException(status_code=400, detail="Usuário não possui Steam ID configurado")
-    
-    if not current_user.general_stats_id:  # type: ignore
-        raise HTTPException(status_code=400, detail="Estatísticas gerais não encontradas")
-    
-    # Buscar estatísticas atuais
-    stats = get_general_stats_by_id(db, current_user.general_stats_id)  # type: ignore
-    if not stats:
-        raise HTTPException(status_code=404, detail="Estatísticas gerais não encontradas")
-    
     # Obter dados do Steam
-    owned_games = getOwnedGames(current_user.steam_id)  # type: ignore
+    owned_games = await getOwnedGamesAsync(steamid)
     games = owned_games.get("games", [])
     
     # Calcular estatísticas
@@ -136,168 +160,262 @@ def update_steam_general_stats(
     total_platinums = 0
     
     # Contar conquistas e platinums
-    for game in games:
-        appid = game.get("appid")
-        if appid:
-            achievements = getPlayerAchievements(current_user.steam_id, appid)  # type: ignore
-            game_achievements = achievements.get("achievements", [])
-            total_achievements += len(game_achievements)
-            
-            # Considerar platinum se 100% das conquistas foram obtidas
-            if game_achievements:
-                achieved_count = len([a for a in game_achievements if a.get("achieved") == 1])
-                if achieved_count == len(game_achievements):
-                    total_platinums += 1
+    appids = [game.get("appid") for game in games if game.get("appid") and hasAchievementStats(game)]
+    results = await gather_bounded(
+        appids,
+        lambda appid: getPlayerAchievementsAsync(steamid, appid),
+        STEAM_MAX_CONCURRENCY
+    )
+    for achievements in results:
+        game_achievements = achievements.get("achievements", [])
+        total_achievements += len(game_achievements)
+        
+        # Considerar platinum se 100% das conquistas foram obtidas
+        if game_achievements:
+            achieved_count = len([a for a in game_achievements if a.get("achieved") == 1])
+            if achieved_count == len(game_achievements):
+                total_platinums += 1
     
     # Jogos recentes (últimos 30 dias - simplificado como jogos com playtime > 0)
     recent_games = len([game for game in games if game.get("playtime_2weeks", 0) > 0])
     
     # Média de platinums (porcentagem de jogos platinados)
     avg_platinums = round((total_platinums / total_games * 100) if total_games > 0 else 0)
-    
-    # Atualizar estatísticas
-    update_general_stats(db, stats,
-        total_games=total_games,
-        total_platinums=total_platinums,
-        recent_games=recent_games,
-        total_achievements=total_achievements,
-        total_hours=total_hours,
-        avg_platinums=avg_platinums
-    )
-    
+
     return {
-        "message": "Estatísticas atualizadas com sucesso",
-        "stats": {
-            "total_games": total_games,
-            "total_platinums": total_platinums,
-            "recent_games": recent_games,
-            "total_achievements": total_achievements,
-            "total_hours": total_hours,
-            "avg_platinums": avg_platinums
-        }
+        "total_games": total_games,
+        "total_platinums": total_platinums,
+        "recent_games": recent_games,
+        "total_achievements": total_achievements,
+        "total_hours": total_hours,
+        "avg_platinums": avg_platinums
     }
 
-# Retorna as estatísticas gerais calculadas a partir do Steam ID. SOMENTE PARA TESTES
-@router.get("/general-stats/{steamid}")
-def get_steam_general_stats(steamid: str):
+# Inicia a atualização das estatísticas gerais do usuário em segundo plano.
+@router.post("/update-general-stats", status_code=202)
+def update_steam_general_stats(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
     """
-    Retorna as estatísticas gerais calculadas a partir do Steam ID.
+    Enfileira a atualização das estatísticas gerais do usuário baseado nos dados do Steam.
+    O progresso e o resultado ficam disponíveis em /jobs/{job_id}.
     """
-    # Obter dados do Steam
-    owned_games = getOwnedGames(steamid)
-    games = owned_games.get("games", [])
-    
-    # Calcular estatísticas
-    total_games = len(games)
-    total_hours = sum(game.get("playtime_forever", 0) for game in games)
-    total_achievements = 0
-    total_platinums = 0
+    if not current_user.steam_id:  # type: ignore
+        raise HTTPException(status_code=400, detail="Usuário não possui Steam ID configurado")
     
-    # Contar conquistas e platinums
-    for game in games:
-        appid = game.get("appid")
-        if appid:
-            achievements = getPlayerAchievements(steamid, appid)
-            game_achievements = achievements.get("achievements", [])
-            total_achievements += len(game_achievements)
-            
-            # Considerar platinum se 100% das conquistas foram obtidas
-            if game_achievements:
-                achieved_count = len([a for a in game_achievements if a.get("achieved") == 1])
-                if achieved_count == len(game_achievements):
-                    total_platinums += 1
+    if not current_user.general_stats_id:  # type: ignore
+        raise HTTPException(status_code=400, detail="Estatísticas gerais não encontradas")
     
-    # Jogos recentes (últimos 30 dias - simplificado como jogos com playtime > 0)
-    recent_games = len([game for game in games if game.get("playtime_2weeks", 0) > 0])
+    # Buscar estatísticas atuais
+    stats = get_general_stats_by_id(db, current_user.general_stats_id)  # type: ignore
+    if not stats:
+        raise HTTPException(status_code=404, detail="Estatísticas gerais não encontradas")
     
-    # Média de platinums (porcentagem de jogos platinados)
-    avg_platinums = round((total_platinums / total_games * 100) if total_games > 0 else 0)
+    # Requisições repetidas enquanto a sincronização roda reaproveitam o mesmo job
+    job = submitJob(db, STEAM_STATS_SYNC_JOB, current_user.id, steamStatsSyncJob(current_user.id))  # type: ignore
     
+    return {
+        "message": "Atualização de estatísticas iniciada",
+        "job_id": job.id,
+        "status": job.status,
+        "status_url": f"/jobs/{job.id}"
+    }
+
+def _storedGeneralStats(db: Session, steamid: str) -> Optional[dict]:
+    if not has_synced_account(db, STEAM, steamid):
+        return None
+    return get_account_stats(db, STEAM, steamid)
+
+# Retorna as estatísticas gerais calculadas a partir do Steam ID.
+@router.get("/general-stats/{steamid}")
+async def get_steam_general_stats(
+    steamid: str,
+    live: bool = Query(False, description="Ignora o banco local e calcula a partir da Steam API"),
+    db: Session = Depends(get_db)
+):
+    """
+    Retorna as estatísticas gerais do Steam ID. Contas já sincronizadas (POST /steam/update-general-stats)
+    são respondidas por agregação no banco; as demais são calculadas a partir da Steam API.
+    """
+    general_stats = None if live else await asyncio.to_thread(_storedGeneralStats, db, steamid)
+    source = "store"
+    if general_stats is None:
+        general_stats = await _calculateGeneralStats(steamid)
+        source = "live"
     return {
         "steam_id": steamid,
-        "general_stats": {
-            "total_games": total_games,
-            "total_platinums": total_platinums,
-            "recent_games": recent_games,
-            "total_achievements": total_achievements,
-            "total_hours": total_hours,
-            "avg_platinums": avg_platinums
+        "source": source,
+        "general_stats": general_stats
+    }
+
+def _storedRareAchievements(db: Session, steamid: str, rarity_threshold: float, limit: Optional[int] = None) -> Optional[Tuple[List[dict], int]]:
+    """
+    Conquistas raras desbloqueadas lidas do banco normalizado, da mais rara para a mais comum,
+    junto com o total. Com limit, só as primeiras são lidas. Retorna None se a conta ainda não foi sincronizada.
+    """
+    if not has_synced_account(db, STEAM, steamid):
+        return None
+    rare_list = [
+        {
+            "appid": int(game.platform_game_id),
+            "game_name": game.name or "Desconhecido",
+            "apiname": definition.api_name,
+            "name": definition.display_name,
+            "description": definition.description,
+            "icon": definition.icon_url,
+            "icongray": definition.icon_locked_url,
+            "unlocktime": int(unlocked_at.replace(tzinfo=timezone.utc).timestamp()) if unlocked_at else None,
+            "global_percentage": definition.global_percentage
         }
+        for game, definition, unlocked_at in get_rare_unlocks(db, STEAM, steamid, rarity_threshold, limit)
+    ]
+    total = len(rare_list) if limit is None or len(rare_list) < limit else count_rare_unlocks(db, STEAM, steamid, rarity_threshold)
+    return rare_list, total
+
+def _storedRareAchievementsResponse(steamid: str, rarity_threshold: float, sort: str, limit: Optional[int], rare_list: List[dict], total: int) -> dict:
+    if sort == "rarity":
+        return {
+            "steam_id": steamid,
+            "source": "store",
+            "rarity_threshold": f"< {rarity_threshold}%",
+            "sort": sort,
+            "total_rare_achievements": total,
+            "achievements": rare_list
+        }
+
+    # Agrupa por jogo mantendo a ordem de raridade dentro de cada um
+    games: dict = {}
+    for ach in rare_list:
+        game = games.setdefault(ach["appid"], {
+            "appid": ach["appid"],
+            "game_name": ach["game_name"],
+            "rare_achievements": [],
+            "total_rare": 0
+        })
+        game["rare_achievements"].append({k: v for k, v in ach.items() if k not in ("appid", "game_name")})
+        game["total_rare"] += 1
+
+    return {
+        "steam_id": steamid,
+        "source": "store",
+        "rarity_threshold": f"< {rarity_threshold}%",
+        "total_games_with_rare": len(games),
+        "total_rare_achievements": total,
+        "games": list(games.values())[:limit]
     }
 
 @router.get("/profile/rare-achievements/{steamid}")
-def get_rare_achievements(steamid: str, rarity_threshold: float = 10.0):
+async def get_rare_achievements(
+    steamid: str,
+    rarity_threshold: float = 10.0,
+    sort: str = Query("game", pattern="^(game|rarity)$", description="game: agrupado por jogo; rarity: lista única da mais rara para a mais comum"),
+    limit: Optional[int] = Query(None, ge=1, description="Máximo de jogos (sort=game) ou de conquistas (sort=rarity)"),
+    stream: Optional[str] = Query(None, pattern="^ndjson$", description="ndjson: envia um jogo por linha assim que ficar pronto (apenas sort=game)"),
+    live: bool = Query(False, description="Ignora o banco local e consulta a Steam API"),
+    db: Session = Depends(get_db)
+):
+    if stream == "ndjson" and sort == "rarity":
+        raise HTTPException(status_code=400, detail="stream=ndjson não é compatível com sort=rarity")
+
+    # Contas sincronizadas são respondidas pelo banco, sem chamadas à Steam
+    if not live and stream is None:
+        # Em sort=rarity o limite vai direto para a consulta; em sort=game ele conta jogos
+        sql_limit = limit if sort == "rarity" else None
+        stored = await asyncio.to_thread(_storedRareAchievements, db, steamid, rarity_threshold, sql_limit)
+        if stored is not None:
+            rare_list, total = stored
+            return _storedRareAchievementsResponse(steamid, rarity_threshold, sort, limit, rare_list, total)
 
     # Obter jogos do usuário
-    owned_games = getOwnedGames(steamid)
-    games = owned_games.get("games", [])
-    
-    all_rare_achievements = []
-    
-    for game in games:
+    owned_games = await getOwnedGamesAsync(steamid)
+    games = [game for game in owned_games.get("games", []) if game.get("appid") and hasAchievementStats(game)]
+
+    async def fetchGameRareAchievements(game: dict) -> Optional[dict]:
         appid = game.get("appid")
         name = game.get("name", "Desconhecido")
-        
-        if appid:
-            # Conquistas do jogador
-            player_achievements = getPlayerAchievements(steamid, appid)
-            player_achs = player_achievements.get("achievements", [])
-            
-            # Schema de conquistas do jogo (para obter ícones)
-            game_schema = getGameAchievementSchema(appid)
-            
-            # Porcentagem global de cada conquista
-            global_percentages = getGlobalAchievementPercentagesForApp(appid)
-            global_achs = global_percentages.get("achievements", [])
-            
-            # Filtrar conquistas raras
-            game_rare_achievements = []
-            for achievement in player_achs:
-                if achievement.get("achieved") == 1:  # Se o jogador tem
-                    apiname = achievement.get("apiname")
-                    
-                    # Buscar porcentagem global
-                    for global_ach in global_achs:
-                        if global_ach.get("name") == apiname:
-                            percentage = global_ach.get("percent", 100.0)
-                            if float(percentage) < float(rarity_threshold):
-                                # Buscar ícones no schema do jogo
-                                icon_url = None
-                                icongray_url = None
-                                for schema_ach in game_schema:
-                                    if schema_ach.get("name") == apiname:
-                                        icon_url = schema_ach.get("icon")
-                                        icongray_url = schema_ach.get("icongray")
-                                        break
-                                
-                                game_rare_achievements.append({
-                                    "apiname": apiname,
-                                    "name": achievement.get("name"),
-                                    "description": achievement.get("description"),
-                                    "icon": icon_url,
-                                    "icongray": icongray_url,
-                                    "unlocktime": achievement.get("unlocktime"),
-                                    "global_percentage": percentage
-                                })
-                            break
-            
-            if game_rare_achievements:
-                all_rare_achievements.append({
-                    "appid": appid,
-                    "game_name": name,
-                    "rare_achievements": game_rare_achievements,
-                    "total_rare": len(game_rare_achievements)
-                })
-    
-    response_data = {
-        "steam_id": steamid,
-        "rarity_threshold": f"< {rarity_threshold}%",
-        "total_games_with_rare": len(all_rare_achievements),
-        "total_rare_achievements": sum(game["total_rare"] for game in all_rare_achievements),
-        "games": all_rare_achievements
-    }
+
+        # Conquistas do jogador e índice de raridade (porcentagens globais em cache)
+        player_achievements, rarity_index = await asyncio.gather(
+            getPlayerAchievementsAsync(steamid, appid),
+            getAchievementRarityIndexAsync(appid)
+        )
+        unlocked = {
+            ach.get("apiname"): ach
+            for ach in player_achievements.get("achievements", [])
+            if ach.get("achieved") == 1
+        }
+
+        # Conquistas abaixo do limite, da mais rara para a mais comum, que o jogador tem
+        rare_apinames = [apiname for apiname in rarity_index.rarer_than(rarity_threshold) if apiname in unlocked]
+        if not rare_apinames:
+            return None
+
+        # Schema do jogo (para obter ícones) apenas para jogos com conquistas raras
+        schema_map = {a.get("name"): a for a in await getGameAchievementSchemaAsync(appid)}
+
+        game_rare_achievements = []
+        for apiname in rare_apinames:
+            achievement = unlocked[apiname]
+            schema_ach = schema_map.get(apiname, {})
+            game_rare_achievements.append({
+                "apiname": apiname,
+                "name": achievement.get("name"),
+                "description": achievement.get("description"),
+                "icon": schema_ach.get("icon"),
+                "icongray": schema_ach.get("icongray"),
+                "unlocktime": achievement.get("unlocktime"),
+                "global_percentage": rarity_index.percentage(apiname)
+            })
+
+        return {
+            "appid": appid,
+            "game_name": name,
+            "rare_achievements": game_rare_achievements,
+            "total_rare": len(game_rare_achievements)
+        }
+
+    if stream == "ndjson":
+        async def streamRareGames():
+            sent = 0
+            async for game in iter_bounded(games, fetchGameRareAchievements, STEAM_MAX_CONCURRENCY):
+                if not game:
+                    continue
+                yield game
+                sent += 1
+                if limit and sent >= limit:
+                    break
+        return ndjson_response(streamRareGames())
+
+    results = await gather_bounded(games, fetchGameRareAchievements, STEAM_MAX_CONCURRENCY)
+    all_rare_achievements = [game for game in results if game]
+
+    if sort == "rarity":
+        # Cada jogo já está ordenado por raridade, então basta intercalar as listas
+        ordered = heapq.merge(
+            *(
+                [{"appid": game["appid"], "game_name": game["game_name"], **ach} for ach in game["rare_achievements"]]
+                for game in all_rare_achievements
+            ),
+            key=lambda ach: ach["global_percentage"]
+        )
+        rare_list = list(itertools.islice(ordered, limit))
+        response_data = {
+            "steam_id": steamid,
+            "source": "live",
+            "rarity_threshold": f"< {rarity_threshold}%",
+            "sort": sort,
+            "total_rare_achievements": sum(game["total_rare"] for game in all_rare_achievements),
+            "achievements": rare_list
+        }
+    else:
+        response_data = {
+            "steam_id": steamid,
+            "source": "live",
+            "rarity_threshold": f"< {rarity_threshold}%",
+            "total_games_with_rare": len(all_rare_achievements),
+            "total_rare_achievements": sum(game["total_rare"] for game in all_rare_achievements),
+            "games": all_rare_achievements[:limit]
+        }
     
-    return Response(
-        content=json.dumps(response_data, indent=2, ensure_ascii=False), 
-        media_type="application/json"
-    )
+    return response_data
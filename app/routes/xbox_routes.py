@@ -1,10 +1,27 @@
 from fastapi import APIRouter, HTTPException, Query 
 from fastapi.responses import Response
 import json
-from app.services.xbox_service import getPlayerXUID, getPlayerAchievements, getPlayerAchievementsByGame, is_valid_platform_game, getPlayerGamesWithFullAchievements
+import asyncio
+from typing import Optional
+from app.services.xbox_service import (
+    resolveXUID,
+    getPlayerTitles,
+    getPlayerTitlesPage,
+    getPlayerAchievementsByGame,
+    getTitleAchievements,
+    findCachedTitle,
+    getPlayerGamesWithFullAchievementsAsync,
+    fetchTitlesWithAchievements,
+    iterTitlesWithAchievements
+)
 from app.services.user_service import update_xbox_id
+from app.services.identity_service import IdentityLookupError
+from app.services.xbox_sync_service import xboxAchievementSyncJob, XBOX_ACHIEVEMENT_SYNC_JOB
+from app.services.achievement_store_service import XBOX, has_synced_account, get_account_stats
+from app.services.job_service import submitJob
 from app.routes.user_routes import get_current_user, get_db
 from app.models.user_model import User
+from app.utils.responses import ndjson_response
 from sqlalchemy.orm import Session
 from fastapi import Depends
 
@@ -15,14 +32,13 @@ router = APIRouter(prefix="/xbox", tags=["Xbox"])
 # Retorna apenas o XUID do usuário Xbox
 @router.get("/profile/xuid/{gamertag}")
 def xbox_xuid(gamertag : str):
-    xuid_data = getPlayerXUID(gamertag)
-    if not xuid_data:
-        raise HTTPException(status_code=404, detail="XUID não encontrado")
-    
-    # Extrair apenas o XUID do objeto
-    xuid = xuid_data.get("xuid")
+    # Gamertags já resolvidas vêm do cache de identidades, sem chamada à API
+    try:
+        xuid = resolveXUID(gamertag)
+    except IdentityLookupError as e:
+        raise HTTPException(status_code=502, detail=str(e))
     if not xuid:
-        raise HTTPException(status_code=404, detail="XUID não encontrado no perfil")
+        raise HTTPException(status_code=404, detail="XUID não encontrado")
     
     return {"xuid": xuid}
 
@@ -32,77 +48,101 @@ def save_xboxid(xboxid: str, db: Session = Depends(get_db), current_user: User =
     update_xbox_id(db, current_user, xboxid)
     return {"xboxid": xboxid}
 
+# Inicia a sincronização das conquistas Xbox do usuário autenticado em segundo plano.
+@router.post("/sync-achievements", status_code=202)
+def sync_xbox_achievements(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    """
+    Enfileira a sincronização dos títulos e conquistas Xbox no banco local.
+    O progresso e o resultado ficam disponíveis em /jobs/{job_id}.
+    """
+    if not current_user.xbox_id:  # type: ignore
+        raise HTTPException(status_code=400, detail="Usuário não possui Xbox ID configurado")
+
+    job = submitJob(db, XBOX_ACHIEVEMENT_SYNC_JOB, current_user.id, xboxAchievementSyncJob(current_user.id))  # type: ignore
+
+    return {
+        "message": "Sincronização de conquistas iniciada",
+        "job_id": job.id,
+        "status": job.status,
+        "status_url": f"/jobs/{job.id}"
+    }
+
+# Retorna as estatísticas gerais do usuário Xbox a partir do banco local (após a sincronização)
+@router.get("/profile/stats/{xuid}")
+def xbox_stats(xuid: str, db: Session = Depends(get_db)):
+    if not has_synced_account(db, XBOX, xuid):
+        raise HTTPException(status_code=404, detail="Conta Xbox ainda não sincronizada")
+    return {"xuid": xuid, "general_stats": get_account_stats(db, XBOX, xuid)}
+
 # Retorna as conquistas do usuário Xbox (apenas PC, XboxSeries e XboxOne)
 @router.get("/profile/achievements/{xuid}")
 def xbox_achievements(xuid: str):
-    achievements = getPlayerAchievements(xuid)
-    if not achievements or "titles" not in achievements:
+    titles = getPlayerTitles(xuid)
+    if titles is None:
         raise HTTPException(status_code=404, detail="Conquistas não encontradas")
     
-    jogos_filtrados = []
-    for jogo in achievements["titles"]:
-        devices = jogo.get("devices", [])
-        
-        # Filtra apenas jogos que tenham PC, XboxSeries ou XboxOne
-        if is_valid_platform_game(devices):
-            jogos_filtrados.append({
-                "name": jogo.get("name"),
-                "titleId": jogo.get("titleId"),
-                "displayImage": jogo.get("displayImage"),
-                "lastTimePlayed": jogo.get("titleHistory", {}).get("lastTimePlayed")
-            })
+    jogos_filtrados = [
+        {
+            "name": jogo.get("name"),
+            "titleId": jogo.get("titleId"),
+            "displayImage": jogo.get("displayImage"),
+            "lastTimePlayed": jogo.get("titleHistory", {}).get("lastTimePlayed")
+        }
+        for jogo in titles
+    ]
     
     return {"jogos": jogos_filtrados}
 
 # Retorna as conquistas de um jogo específico do usuário Xbox
 @router.get("/profile/achievements/game/{xuid}/{game_id}")
 def xbox_achievements_by_game(xuid: str, game_id: str):
-    achievements = getPlayerAchievementsByGame(xuid, game_id)
-    if not achievements:
-        raise HTTPException(status_code=404, detail="Conquistas não encontradas")
-    return {"achievements": achievements}
+    # Com o título na lista em cache, as conquistas só são baixadas de novo se o progresso mudou.
+    # Os dois caminhos devolvem só a lista de conquistas, no mesmo formato
+    jogo = findCachedTitle(xuid, game_id)
+    achievements = getTitleAchievements(xuid, jogo) if jogo else None
+    if achievements is None:
+        data = getPlayerAchievementsByGame(xuid, game_id)
+        if not data:
+            raise HTTPException(status_code=404, detail="Conquistas não encontradas")
+        achievements = data.get("achievements", [])
+    return {"achievements": {"achievements": achievements}}
 
 @router.get("/profile/games-with-full-achievements/{xuid}")
-def xbox_games_with_full_achievements(
+async def xbox_games_with_full_achievements(
     xuid: str,
     page: int = Query(1, ge=1),
-    limit: int = Query(5, ge=1, le=50)
+    limit: int = Query(5, ge=1, le=50),
+    cursor: Optional[str] = Query(None, description="Cursor retornado em next_cursor; substitui page")
 ):
-    jogos = getPlayerGamesWithFullAchievements(xuid, page=page, limit=limit)
+    try:
+        jogos, next_cursor = await getPlayerGamesWithFullAchievementsAsync(xuid, page=page, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     if not jogos:
         raise HTTPException(status_code=404, detail="Jogos ou conquistas não encontradas")
-    return {"jogos": jogos}
+    return {"jogos": jogos, "next_cursor": next_cursor}
 
+# Conquistas dos títulos da página, buscadas em paralelo; títulos que falham vêm com o campo "error"
 @router.get("/profile/achievements/all/{xuid}")
-def xbox_all_achievements(
+async def xbox_all_achievements(
     xuid: str,
     page: int = Query(1, ge=1),
-    limit: int = Query(5, ge=1, le=50)
+    limit: int = Query(5, ge=1, le=50),
+    cursor: Optional[str] = Query(None, description="Cursor retornado em next_cursor; substitui page"),
+    stream: Optional[str] = Query(None, pattern="^ndjson$", description="ndjson: envia um jogo por linha assim que ficar pronto")
 ):
-    achievements = getPlayerAchievements(xuid)
-    if not achievements or "titles" not in achievements:
+    # Páginas são servidas a partir do snapshot da lista de títulos em cache
+    try:
+        jogos_paginados, next_cursor = await asyncio.to_thread(getPlayerTitlesPage, xuid, limit, cursor, page)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if jogos_paginados is None:
         raise HTTPException(status_code=404, detail="Conquistas não encontradas")
 
-    jogos_filtrados = []
-    for jogo in achievements["titles"]:
-        devices = jogo.get("devices", [])
-        if is_valid_platform_game(devices):
-            jogos_filtrados.append(jogo)
-    start = (page - 1) * limit
-    end = start + limit
-    jogos_paginados = jogos_filtrados[start:end]
-    jogos_resultado = []
-    for jogo in jogos_paginados:
-        title_id = jogo.get("titleId")
-        if not title_id:
-            continue
-        conquistas_data = getPlayerAchievementsByGame(xuid, title_id)
-        achievements_list = conquistas_data.get("achievements", [])
-        jogos_resultado.append({
-            "name": jogo.get("name"),
-            "titleId": title_id,
-            "displayImage": jogo.get("displayImage"),
-            "lastTimePlayed": jogo.get("titleHistory", {}).get("lastTimePlayed"),
-            "achievements": achievements_list,
-        })
-    return {"jogos": jogos_resultado}
\ No newline at end of file
+    if stream == "ndjson":
+        response = ndjson_response(iterTitlesWithAchievements(xuid, jogos_paginados))
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
+        return response
+
+    return {"jogos": await fetchTitlesWithAchievements(xuid, jogos_paginados), "next_cursor": next_cursor}
@@ -0,0 +1,18 @@
+from pydantic import BaseModel, Field
+from typing import Literal
+
+class IdentityQuery(BaseModel):
+    platform: Literal["steam", "xbox", "psn"]
+    name: str = Field(..., min_length=1, max_length=200)
+
+class IdentityResolveRequest(BaseModel):
+    items: list[IdentityQuery] = Field(..., min_length=1, max_length=100)
+
+class IdentityResult(BaseModel):
+    platform: str
+    name: str
+    id: str | None = None
+    error: str | None = None
+
+class IdentityResolveResponse(BaseModel):
+    results: list[IdentityResult]
@@ -0,0 +1,17 @@
+from pydantic import BaseModel
+from datetime import datetime
+
+class JobOut(BaseModel):
+    id: str
+    kind: str
+    status: str
+    progress_done: int = 0
+    progress_total: int = 0
+    result: dict | None = None
+    error: str | None = None
+    created_at: datetime
+    updated_at: datetime
+    finished_at: datetime | None = None
+
+    class Config:
+        from_attributes = True
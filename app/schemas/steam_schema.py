@@ -0,0 +1,8 @@
+from pydantic import BaseModel, Field
+
+class SteamProfilesBatchRequest(BaseModel):
+    steamids: list[str] = Field(..., min_length=1, max_length=1000)
+
+class SteamProfilesBatchResponse(BaseModel):
+    profiles: list[dict]
+    not_found: list[str]
@@ -0,0 +1,269 @@
+from sqlalchemy import func, case
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import IntegrityError
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+from app.models.achievement_model import Game, AchievementDefinition, UserGame, UserAchievement
+
+STEAM = "steam"
+XBOX = "xbox"
+
+def _find_game(db: Session, platform: str, platform_game_id: str) -> Optional[Game]:
+    return (
+        db.query(Game)
+        .filter(Game.platform == platform, Game.platform_game_id == platform_game_id)
+        .first()
+    )
+
+def get_or_create_game(db: Session, platform: str, platform_game_id: str, name: Optional[str] = None, icon_url: Optional[str] = None) -> Game:
+    game = _find_game(db, platform, platform_game_id)
+    if game is None:
+        try:
+            # Savepoint: outro job pode criar o mesmo jogo ao mesmo tempo (uq_game_platform_id)
+            with db.begin_nested():
+                game = Game(platform=platform, platform_game_id=platform_game_id, achievement_count=0)
+                db.add(game)
+        except IntegrityError:
+            game = _find_game(db, platform, platform_game_id)
+            if game is None:
+                raise
+    if name:
+        game.name = name  # type: ignore
+    if icon_url:
+        game.icon_url = icon_url  # type: ignore
+    db.flush()
+    return game
+
+def _get_definitions(db: Session, game: Game) -> Dict[str, AchievementDefinition]:
+    return {
+        definition.api_name: definition  # type: ignore
+        for definition in db.query(AchievementDefinition).filter(AchievementDefinition.game_id == game.id)
+    }
+
+def _insert_definitions(db: Session, game: Game, api_names: List[str]) -> Dict[str, AchievementDefinition]:
+    """
+    Cria as definições que ainda não existem e retorna todas as do jogo. Se outro job inserir as
+    mesmas ao mesmo tempo (uq_achievement_definition_game_api_name), lê de novo e usa as dele.
+    """
+    for attempt in range(2):
+        existing = _get_definitions(db, game)
+        missing = [api_name for api_name in dict.fromkeys(api_names) if api_name not in existing]
+        if not missing:
+            return existing
+        try:
+            with db.begin_nested():
+                for api_name in missing:
+                    db.add(AchievementDefinition(game_id=game.id, api_name=api_name))
+        except IntegrityError:
+            if attempt:
+                raise
+            continue
+        return _get_definitions(db, game)
+    return _get_definitions(db, game)
+
+def save_definitions(
+    db: Session,
+    game: Game,
+    definitions: List[dict],
+    schema_names: Optional[Iterable[str]] = None
+) -> Dict[str, AchievementDefinition]:
+    """
+    Atualiza as definições de conquistas do jogo (chaveadas por api_name) e retorna o mapa api_name -> definição.
+    Cada item pode ter display_name, description, icon_url, icon_locked_url, hidden e global_percentage.
+    As definições são compartilhadas entre as contas, então só são removidas as ausentes de schema_names,
+    que deve vir do schema oficial do jogo e nunca da lista de conquistas de um usuário.
+    """
+    if not definitions:
+        # Nada a gravar (jogo sem estatísticas para esta conta ou falha ao obter o schema)
+        return _get_definitions(db, game)
+
+    stored = _insert_definitions(db, game, [item["api_name"] for item in definitions])
+    result: Dict[str, AchievementDefinition] = {}
+    for item in definitions:
+        definition = stored[item["api_name"]]
+        for key in ("display_name", "description", "icon_url", "icon_locked_url", "hidden", "global_percentage"):
+            if key in item:
+                setattr(definition, key, item[key])
+        result[item["api_name"]] = definition
+
+    keep = set(schema_names or ()) | set(result)
+    if schema_names:
+        # Conquistas removidas do jogo (exclusão em lote: outro job pode já ter removido as mesmas)
+        (
+            db.query(AchievementDefinition)
+            .filter(AchievementDefinition.game_id == game.id, AchievementDefinition.api_name.notin_(keep))
+            .delete(synchronize_session=False)
+        )
+    db.flush()
+
+    game.achievement_count = (  # type: ignore
+        db.query(func.count(AchievementDefinition.id))
+        .filter(AchievementDefinition.game_id == game.id)
+        .scalar()
+    )
+    db.flush()
+    return result
+
+def get_user_games(db: Session, platform: str, account_id: str) -> Dict[str, UserGame]:
+    """
+    Retorna os jogos da conta chaveados pelo id do jogo na plataforma (appid / titleId)
+    """
+    rows = (
+        db.query(UserGame, Game.platform_game_id)
+        .join(Game, Game.id == UserGame.game_id)
+        .filter(UserGame.platform == platform, UserGame.account_id == account_id)
+        .all()
+    )
+    return {platform_game_id: user_game for user_game, platform_game_id in rows}
+
+def save_user_game(
+    db: Session,
+    platform: str,
+    account_id: str,
+    game: Game,
+    unlocked: Optional[Dict[int, Optional[datetime]]],
+    playtime_forever: int = 0,
+    playtime_2weeks: int = 0,
+    last_played: Optional[datetime] = None
+) -> UserGame:
+    """
+    Grava o jogo da conta e substitui os desbloqueios pelo conjunto informado (achievement_id -> data).
+    Com unlocked=None, só o tempo de jogo é atualizado e os desbloqueios gravados são mantidos.
+    """
+    user_game = (
+        db.query(UserGame)
+        .filter(UserGame.platform == platform, UserGame.account_id == account_id, UserGame.game_id == game.id)
+        .first()
+    )
+    if user_game is None:
+        user_game = UserGame(platform=platform, account_id=account_id, game_id=game.id)
+        db.add(user_game)
+    user_game.playtime_forever = playtime_forever  # type: ignore
+    user_game.playtime_2weeks = playtime_2weeks  # type: ignore
+    user_game.last_played = last_played  # type: ignore
+    user_game.synced_at = datetime.utcnow()  # type: ignore
+    if unlocked is None:
+        db.flush()
+        return user_game
+
+    stored = {
+        unlock.achievement_id: unlock
+        for unlock in db.query(UserAchievement).filter(
+            UserAchievement.platform == platform,
+            UserAchievement.account_id == account_id,
+            UserAchievement.game_id == game.id
+        )
+    }
+    for achievement_id, unlock in stored.items():
+        if achievement_id not in unlocked:
+            db.delete(unlock)
+    for achievement_id, unlocked_at in unlocked.items():
+        unlock = stored.get(achievement_id)
+        if unlock is None:
+            db.add(UserAchievement(
+                platform=platform,
+                account_id=account_id,
+                game_id=game.id,
+                achievement_id=achievement_id,
+                unlocked_at=unlocked_at
+            ))
+        elif unlocked_at and unlock.unlocked_at != unlocked_at:
+            unlock.unlocked_at = unlocked_at  # type: ignore
+    db.flush()
+    return user_game
+
+def remove_user_games(db: Session, platform: str, account_id: str, keep_game_ids: Iterable[int]) -> int:
+    """
+    Remove os jogos (e desbloqueios) da conta que não estão mais na biblioteca
+    """
+    keep = list(keep_game_ids)
+    removed = 0
+    for model in (UserAchievement, UserGame):
+        query = db.query(model).filter(model.platform == platform, model.account_id == account_id)
+        if keep:
+            query = query.filter(model.game_id.notin_(keep))
+        removed = query.delete(synchronize_session=False)
+    db.flush()
+    # Número de jogos removidos (a última exclusão é a de UserGame)
+    return removed
+
+def has_synced_account(db: Session, platform: str, account_id: str) -> bool:
+    return db.query(
+        db.query(UserGame).filter(UserGame.platform == platform, UserGame.account_id == account_id).exists()
+    ).scalar()
+
+def count_platinums(db: Session, platform: str, account_id: str) -> int:
+    """
+    Conta os jogos da conta com todas as conquistas desbloqueadas
+    """
+    unlocked = (
+        db.query(UserAchievement.game_id, func.count(UserAchievement.id).label("unlocked"))
+        .filter(UserAchievement.platform == platform, UserAchievement.account_id == account_id)
+        .group_by(UserAchievement.game_id)
+        .subquery()
+    )
+    return (
+        db.query(func.count())
+        .select_from(unlocked)
+        .join(Game, Game.id == unlocked.c.game_id)
+        .filter(Game.achievement_count > 0, unlocked.c.unlocked >= Game.achievement_count)
+        .scalar()
+    ) or 0
+
+def get_account_stats(db: Session, platform: str, account_id: str) -> dict:
+    """
+    Estatísticas gerais da conta calculadas por agregação no banco
+    (mesmos campos de GeneralStats).
+    """
+    total_games, total_hours, recent_games, total_achievements = (
+        db.query(
+            func.count(UserGame.id),
+            func.coalesce(func.sum(UserGame.playtime_forever), 0),
+            func.coalesce(func.sum(case((UserGame.playtime_2weeks > 0, 1), else_=0)), 0),
+            func.coalesce(func.sum(Game.achievement_count), 0)
+        )
+        .join(Game, Game.id == UserGame.game_id)
+        .filter(UserGame.platform == platform, UserGame.account_id == account_id)
+        .one()
+    )
+    total_platinums = count_platinums(db, platform, account_id)
+    return {
+        "total_games": total_games,
+        "total_platinums": total_platinums,
+        "recent_games": recent_games,
+        "total_achievements": total_achievements,
+        "total_hours": total_hours,
+        "avg_platinums": round((total_platinums / total_games * 100) if total_games > 0 else 0)
+    }
+
+def _rare_unlocks_query(db: Session, platform: str, account_id: str, threshold: float, *columns):
+    return (
+        db.query(*columns)
+        .join(AchievementDefinition, AchievementDefinition.id == UserAchievement.achievement_id)
+        .filter(
+            UserAchievement.platform == platform,
+            UserAchievement.account_id == account_id,
+            AchievementDefinition.global_percentage.isnot(None),
+            AchievementDefinition.global_percentage < threshold
+        )
+    )
+
+def get_rare_unlocks(db: Session, platform: str, account_id: str, threshold: float, limit: Optional[int] = None) -> List[tuple]:
+    """
+    Conquistas desbloqueadas pela conta com porcentagem global abaixo do limite,
+    da mais rara para a mais comum. Retorna tuplas (Game, AchievementDefinition, unlocked_at).
+    """
+    query = (
+        _rare_unlocks_query(db, platform, account_id, threshold, Game, AchievementDefinition, UserAchievement.unlocked_at)
+        .join(Game, Game.id == UserAchievement.game_id)
+        .order_by(AchievementDefinition.global_percentage.asc(), AchievementDefinition.id.asc())
+    )
+    if limit:
+        query = query.limit(limit)
+    return query.all()
+
+def count_rare_unlocks(db: Session, platform: str, account_id: str, threshold: float) -> int:
+    """
+    Total de conquistas raras desbloqueadas pela conta, sem carregar as linhas
+    """
+    return _rare_unlocks_query(db, platform, account_id, threshold, func.count(UserAchievement.id)).scalar() or 0
@@ -0,0 +1,96 @@
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import SQLAlchemyError
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+from app.database.database import SessionLocal
+from app.models.identity_model import ResolvedIdentity
+from app.utils.cache import TTLCache
+from app.config import IDENTITY_CACHE_TTL, IDENTITY_CACHE_SIZE, IDENTITY_NEGATIVE_TTL
+
+class IdentityLookupError(Exception):
+    """
+    Falha ao consultar a plataforma (rede ou erro HTTP): não se sabe se o nome existe
+    """
+
+STEAM = "steam"
+XBOX = "xbox"
+PSN = "psn"
+
+# LRU na frente da tabela resolved_identities, chaveado por (plataforma, nome normalizado).
+# Nomes não encontrados ficam guardados como "" por IDENTITY_NEGATIVE_TTL, apenas em memória.
+_identity_cache = TTLCache(maxsize=IDENTITY_CACHE_SIZE, ttl=IDENTITY_CACHE_TTL)
+
+def _nameKey(name: str) -> str:
+    # Vanity URLs, gamertags e online ids não diferenciam maiúsculas de minúsculas
+    return name.strip().lower()
+
+def get_stored_identity(db: Session, platform: str, name: str, max_age: float) -> Optional[ResolvedIdentity]:
+    entry = db.get(ResolvedIdentity, (platform, _nameKey(name)))
+    if not entry or entry.resolved_at < datetime.utcnow() - timedelta(seconds=max_age):
+        return None
+    return entry
+
+def save_identity(db: Session, platform: str, name: str, platform_id: str) -> ResolvedIdentity:
+    entry = db.get(ResolvedIdentity, (platform, _nameKey(name)))
+    if entry:
+        entry.name = name.strip()  # type: ignore
+        entry.platform_id = platform_id  # type: ignore
+        entry.resolved_at = datetime.utcnow()  # type: ignore
+    else:
+        entry = ResolvedIdentity(platform=platform, name_key=_nameKey(name), name=name.strip(), platform_id=platform_id)
+        db.add(entry)
+    db.commit()
+    return entry
+
+def _loadIdentity(platform: str, name: str) -> Optional[str]:
+    db = SessionLocal()
+    try:
+        entry = get_stored_identity(db, platform, name, IDENTITY_CACHE_TTL)
+        if not entry:
+            return None
+        # O LRU expira junto com a linha do banco
+        remaining = IDENTITY_CACHE_TTL - (datetime.utcnow() - entry.resolved_at).total_seconds()
+        _identity_cache.set((platform, _nameKey(name)), entry.platform_id, ttl=remaining)
+        return entry.platform_id  # type: ignore
+    except SQLAlchemyError:
+        return None
+    finally:
+        db.close()
+
+def _storeIdentity(platform: str, name: str, platform_id: str) -> None:
+    _identity_cache.set((platform, _nameKey(name)), platform_id)
+    db = SessionLocal()
+    try:
+        save_identity(db, platform, name, platform_id)
+    except SQLAlchemyError:
+        # Outra requisição pode ter resolvido o mesmo nome ao mesmo tempo
+        db.rollback()
+    finally:
+        db.close()
+
+def resolve_cached(platform: str, name: str, resolver: Callable[[str], Optional[str]]) -> Optional[str]:
+    """
+    Resolve um nome legível para o id da plataforma consultando o LRU, o banco e, por último,
+    a API da plataforma (resolver). Resultados positivos são gravados nos dois níveis.
+    O resolver retorna None apenas quando a plataforma confirma que o nome não existe (resultado
+    guardado por IDENTITY_NEGATIVE_TTL); falhas de consulta devem levantar IdentityLookupError,
+    que é repassada sem ir para o cache.
+    """
+    if not name or not name.strip():
+        return None
+
+    cached = _identity_cache.get((platform, _nameKey(name)))
+    if cached is not None:
+        return cached or None
+
+    platform_id = _loadIdentity(platform, name)
+    if platform_id:
+        return platform_id
+
+    platform_id = resolver(name.strip())
+    if platform_id:
+        _storeIdentity(platform, name, str(platform_id))
+        return str(platform_id)
+
+    _identity_cache.set((platform, _nameKey(name)), "", ttl=IDENTITY_NEGATIVE_TTL)
+    return None
@@ -0,0 +1,35 @@
+from sqlalchemy.orm import Session
+from datetime import datetime
+from typing import Iterable, List
+from app.models.igdb_model import IgdbGameName
+
+def get_game_names(db: Session) -> List[IgdbGameName]:
+    return db.query(IgdbGameName).all()
+
+def save_game_names(db: Session, games: Iterable[dict]) -> int:
+    """
+    Grava (id, nome, capa) dos jogos informados, atualizando os que já existem.
+    Cada item deve ter id, name e, opcionalmente, cover_image_id. Retorna quantos mudaram.
+    """
+    items = {game["id"]: game for game in games}
+    if not items:
+        return 0
+    existing = {
+        entry.id: entry
+        for entry in db.query(IgdbGameName).filter(IgdbGameName.id.in_(list(items)))
+    }
+    changed = 0
+    for game_id, game in items.items():
+        entry = existing.get(game_id)
+        cover = game.get("cover_image_id")
+        if entry is None:
+            db.add(IgdbGameName(id=game_id, name=game["name"], cover_image_id=cover))
+            changed += 1
+        elif entry.name != game["name"] or (cover and entry.cover_image_id != cover):
+            entry.name = game["name"]  # type: ignore
+            if cover:
+                entry.cover_image_id = cover  # type: ignore
+            entry.updated_at = datetime.utcnow()  # type: ignore
+            changed += 1
+    db.commit()
+    return changed
@@ -1,18 +1,143 @@
 from fastapi import HTTPException
 import requests
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from app.config import IGDB_CLIENT_ID, IGDB_ACCESS_TOKEN
+from sqlalchemy.exc import SQLAlchemyError
+from typing import Dict, List
+from app.config import (
+    IGDB_CLIENT_ID,
+    IGDB_LIST_CACHE_TTL,
+    IGDB_LIST_STALE_TTL,
+    IGDB_SEARCH_MIN_SCORE,
+    IGDB_SEARCH_MIN_RESULTS,
+    IGDB_SEARCH_CACHE_TTL,
+    IGDB_SEARCH_CACHE_SIZE,
+    IGDB_GAME_CACHE_TTL,
+    IGDB_GAME_CACHE_SIZE,
+    IGDB_MAX_CONCURRENCY
+)
+from app.database.database import SessionLocal
+from app.services.igdb_index_service import get_game_names, save_game_names
+from app.services.image_service import image_url
+from app.services.igdb_token_service import get_igdb_token, refresh_igdb_token, IGDBUnavailableError
+from app.utils import upstream
+from app.utils.cache import StaleWhileRevalidateCache, TTLCache
+from app.utils.search_index import SearchIndex, normalize_text
 url = "https://api.igdb.com/v4"
-headers = {
-    "Client-ID": IGDB_CLIENT_ID,
-    "Authorization": f"Bearer {IGDB_ACCESS_TOKEN}"
-}
+
+def _headers(token: str) -> dict:
+    return {
+        "Client-ID": IGDB_CLIENT_ID,
+        "Authorization": f"Bearer {token}"
+    }
+
+def _post(endpoint: str, body: str) -> requests.Response:
+    """
+    POST na API da IGDB com o token atual. Em um 401 (token revogado ou expirado antes do
+    previsto) gera um novo token e repete a chamada uma vez.
+    """
+    token = get_igdb_token()
+    response = upstream.post(f"{url}/{endpoint}", headers=_headers(token), data=body)
+    if response.status_code == 401:
+        token = refresh_igdb_token(token)
+        response = upstream.post(f"{url}/{endpoint}", headers=_headers(token), data=body)
+    return response
+
+# Listas da home (em alta, lançamentos e mais aguardados): iguais para todos os usuários e
+# mudam em horas. Depois do TTL o valor antigo continua sendo servido enquanto recarrega,
+# inclusive se a IGDB estiver fora do ar.
+_lists_cache = StaleWhileRevalidateCache(maxsize=64, ttl=IGDB_LIST_CACHE_TTL, stale_ttl=IGDB_LIST_STALE_TTL)
+
+# Índice local de nomes para a busca, alimentado por todas as respostas da IGDB e
+# persistido na tabela igdb_game_names. Payload: (id, nome, image_id da capa).
+_search_index = SearchIndex()
+_search_index_loaded = False
+_search_index_lock = threading.Lock()
+# Resultados das buscas que precisaram ir até a IGDB, por busca normalizada
+_search_cache = TTLCache(maxsize=IGDB_SEARCH_CACHE_SIZE, ttl=IGDB_SEARCH_CACHE_TTL)
+
+def load_search_index() -> int:
+    """
+    Carrega o índice de busca a partir do banco (apenas na primeira chamada) e retorna o número de jogos
+    """
+    global _search_index_loaded
+    with _search_index_lock:
+        if not _search_index_loaded:
+            db = SessionLocal()
+            try:
+                for entry in get_game_names(db):
+                    _search_index.add(entry.id, entry.name, (entry.id, entry.name, entry.cover_image_id))
+                _search_index_loaded = True
+            except SQLAlchemyError:
+                # Sem o banco a busca continua funcionando pela IGDB; tenta carregar de novo depois
+                traceback.print_exc()
+            finally:
+                db.close()
+    return len(_search_index)
+
+def _index_games(games: list) -> None:
+    """
+    Adiciona ao índice de busca os jogos (com capa) de uma resposta da IGDB e grava os novos no banco
+    """
+    changed = []
+    for game in games:
+        image_id = (game.get("cover") or {}).get("image_id")
+        if not game.get("id") or not game.get("name") or not image_id:
+            continue
+        payload = (game["id"], game["name"], image_id)
+        if _search_index.get(game["id"]) != payload:
+            _search_index.add(game["id"], game["name"], payload)
+            changed.append({"id": game["id"], "name": game["name"], "cover_image_id": image_id})
+    if not changed:
+        return
+
+    db = SessionLocal()
+    try:
+        save_game_names(db, changed)
+    except SQLAlchemyError:
+        # Outra requisição pode ter gravado os mesmos jogos ao mesmo tempo
+        db.rollback()
+    finally:
+        db.close()
+
+# Detalhes de jogos por id, compartilhados entre /igdb/games/{id} e /igdb/games?ids=
+_game_cache = TTLCache(maxsize=IGDB_GAME_CACHE_SIZE, ttl=IGDB_GAME_CACHE_TTL)
+
+# Máximo de resultados por consulta na IGDB
+GAMES_CHUNK_SIZE = 500
+
+def _bucket_now() -> datetime:
+    """
+    Horário atual arredondado para baixo ao múltiplo do TTL das listas, para que a mesma
+    consulta seja enviada durante toda a janela
+    """
+    bucket = max(int(IGDB_LIST_CACHE_TTL), 1)
+    return datetime.fromtimestamp(int(time.time()) // bucket * bucket)
 
 def get_trending_games() -> list:
-    
-    current_time = int(datetime.now().timestamp())
-    someday_time = int((datetime.now() - timedelta(days=30)).timestamp())
-    body = f"""
+    return _lists_cache.get(("trending",), _fetch_trending_games)
+
+def get_upcoming_games(days_ahead: int = 150, limit: int = 100) -> list:
+    return _lists_cache.get(("upcoming", days_ahead, limit), lambda: _fetch_upcoming_games(days_ahead, limit))
+
+def get_anticipated_games(days_ahead: int = 365, limit: int = 100) -> list:
+    return _lists_cache.get(("anticipated", days_ahead, limit), lambda: _fetch_anticipated_games(days_ahead, limit))
+
+def get_home_feed() -> dict:
+    """
+    As três listas da home em uma única requisição ao /multiquery da IGDB.
+    Cada recarga também atualiza o cache das listas individuais (parâmetros padrão).
+    """
+    return _lists_cache.get(("home",), _fetch_home_feed)
+
+def _trending_query() -> str:
+    now = _bucket_now()
+    current_time = int(now.timestamp())
+    someday_time = int((now - timedelta(days=30)).timestamp())
+    return f"""
     fields name, cover.image_id, total_rating, total_rating_count, first_release_date;
     where cover != null 
         & total_rating != null
@@ -21,22 +146,25 @@ def get_trending_games() -> list:
     sort total_rating_count desc;
     limit 6;
     """
-    response = requests.post(f"{url}/games", headers=headers, data=body)
-    response.raise_for_status()
-    games = response.json()
+
+def _process_trending(games: list) -> list:
+    _index_games(games)
     for game in games:
         if game.get("cover"):
             image_id = game["cover"]["image_id"]
-            game["cover_url"] = f"https://images.igdb.com/igdb/image/upload/t_cover_big/{image_id}.jpg"
+            game["cover_url"] = image_url(image_id, "cover_big")
     return games
 
-def get_upcoming_games(days_ahead: int = 150, limit: int = 100) -> list:
-    now_ts = int(datetime.now().timestamp())
-    future_ts = int((datetime.now() + timedelta(days=days_ahead)).timestamp())
+def _fetch_trending_games() -> list:
+    response = _post("games", _trending_query())
+    response.raise_for_status()
+    return _process_trending(response.json())
 
-    upcoming = []
-    seen_ids = set()
-    query = f"""
+def _upcoming_query(days_ahead: int, limit: int) -> str:
+    now = _bucket_now()
+    now_ts = int(now.timestamp())
+    future_ts = int((now + timedelta(days=days_ahead)).timestamp())
+    return f"""
         fields date,
                game.id,
                game.name,
@@ -47,10 +175,11 @@ def get_upcoming_games(days_ahead: int = 150, limit: int = 100) -> list:
         sort date asc;
         limit {limit};
         """
-    resp = requests.post(f"{url}/release_dates", headers=headers, data=query)
-    resp.raise_for_status()
-    entries = resp.json()
-        
+
+def _process_upcoming(entries: list) -> list:
+    _index_games([e.get("game") or {} for e in entries])
+    upcoming = []
+    seen_ids = set()
 
     for e in entries:
         g = e.get("game") or {}
@@ -64,17 +193,22 @@ def get_upcoming_games(days_ahead: int = 150, limit: int = 100) -> list:
                 "id":           gid,
                 "name":         g["name"],
                 "release_date": datetime.fromtimestamp(e["date"]).strftime("%Y-%m-%d"),
-                "cover_url":    f"https://images.igdb.com/igdb/image/upload/t_cover_big/{img}.jpg"
+                "cover_url":    image_url(img, "cover_big")
         })
 
 
     return upcoming
 
-def get_anticipated_games(days_ahead: int = 365, limit: int = 100) -> list:
-    now_ts = int(datetime.now().timestamp())
-    future_ts = int((datetime.now() + timedelta(days=days_ahead)).timestamp())
+def _fetch_upcoming_games(days_ahead: int, limit: int) -> list:
+    resp = _post("release_dates", _upcoming_query(days_ahead, limit))
+    resp.raise_for_status()
+    return _process_upcoming(resp.json())
 
-    body = f"""
+def _anticipated_query(days_ahead: int, limit: int) -> str:
+    now = _bucket_now()
+    now_ts = int(now.timestamp())
+    future_ts = int((now + timedelta(days=days_ahead)).timestamp())
+    return f"""
     fields name, hypes, cover.image_id, first_release_date;
     where first_release_date > {now_ts}
       & first_release_date <= {future_ts}
@@ -84,10 +218,8 @@ def get_anticipated_games(days_ahead: int = 365, limit: int = 100) -> list:
     limit {limit};
     """
 
-    resp = requests.post(f"{url}/games", headers=headers, data=body)
-    resp.raise_for_status()
-    games = resp.json()
-
+def _process_anticipated(games: list) -> list:
+    _index_games(games)
     anticipated = []
     for game in games:
         image_id = game["cover"]["image_id"]
@@ -96,39 +228,42 @@ def get_anticipated_games(days_ahead: int = 365, limit: int = 100) -> list:
             "name": game["name"],
             "hypes": game.get("hypes", 0),
             "release_date": datetime.fromtimestamp(game["first_release_date"]).strftime("%Y-%m-%d"),
-            "cover_url": f"https://images.igdb.com/igdb/image/upload/t_cover_big/{image_id}.jpg"
+            "cover_url": image_url(image_id, "cover_big")
         })
 
     return anticipated
 
-def get_game_by_id(game_id: int) -> dict:
+def _fetch_anticipated_games(days_ahead: int, limit: int) -> list:
+    resp = _post("games", _anticipated_query(days_ahead, limit))
+    resp.raise_for_status()
+    return _process_anticipated(resp.json())
+
+def _fetch_home_feed() -> dict:
+    # Mesmos parâmetros padrão de get_upcoming_games e get_anticipated_games
     body = f"""
-    fields name, 
-           summary, 
-           cover.image_id, 
-           first_release_date, 
-           genres.name, 
-           platforms.name, 
-           involved_companies.company.name, 
-           screenshots.*, 
-           similar_games.name, 
-           similar_games.cover.image_id;
-    where id = {game_id};
+    query games "trending" {{ {_trending_query()} }};
+    query release_dates "upcoming" {{ {_upcoming_query(150, 100)} }};
+    query games "anticipated" {{ {_anticipated_query(365, 100)} }};
     """
-    
-    response = requests.post(f"{url}/games", headers=headers, data=body)
-    response.raise_for_status()
-    games = response.json()
-    
-    if not games:
-        return None
-    
-    game = games[0]
-    
+    resp = _post("multiquery", body)
+    resp.raise_for_status()
+    results = {item["name"]: item.get("result", []) for item in resp.json()}
+
+    feed = {
+        "trending": _process_trending(results.get("trending", [])),
+        "upcoming": _process_upcoming(results.get("upcoming", [])),
+        "anticipated": _process_anticipated(results.get("anticipated", []))
+    }
+    _lists_cache.set(("trending",), feed["trending"])
+    _lists_cache.set(("upcoming", 150, 100), feed["upcoming"])
+    _lists_cache.set(("anticipated", 365, 100), feed["anticipated"])
+    return feed
+
+def _process_game(game: dict) -> dict:
     # Processar imagens
     if game.get("cover"):
         image_id = game["cover"]["image_id"]
-        game["cover_url"] = f"https://images.igdb.com/igdb/image/upload/t_cover_big/{image_id}.jpg"
+        game["cover_url"] = image_url(image_id, "cover_big")
     
     # Processar data de lançamento
     if game.get("first_release_date"):
@@ -136,7 +271,7 @@ def get_game_by_id(game_id: int) -> dict:
     
     # Processar screenshots
     for screenshot in game.get("screenshots", []):
-        screenshot["url"] = f"https://images.igdb.com/igdb/image/upload/t_1080p/{screenshot['image_id']}.jpg"
+        screenshot["url"] = image_url(screenshot['image_id'], "1080p")
 
     
     # Processar empresas
@@ -147,10 +282,66 @@ def get_game_by_id(game_id: int) -> dict:
     # Processar jogos similares
     for similar in game.get("similar_games", []):
         if similar.get("cover"):
-            similar["cover_url"] = f"https://images.igdb.com/igdb/image/upload/t_cover_small/{similar['cover']['image_id']}.jpg"
+            similar["cover_url"] = image_url(similar['cover']['image_id'], "cover_small")
     
     return game
 
+def _fetch_games_chunk(chunk: List[int]) -> Dict[int, dict]:
+    body = f"""
+    fields name, 
+           summary, 
+           cover.image_id, 
+           first_release_date, 
+           genres.name, 
+           platforms.name, 
+           involved_companies.company.name, 
+           screenshots.*, 
+           similar_games.name, 
+           similar_games.cover.image_id;
+    where id = ({",".join(str(game_id) for game_id in chunk)});
+    limit {len(chunk)};
+    """
+    
+    response = _post("games", body)
+    response.raise_for_status()
+    games = response.json()
+
+    found = {}
+    for game in games:
+        _index_games([game] + game.get("similar_games", []))
+        found[game["id"]] = _process_game(game)
+    # Ids inexistentes ficam em cache como {} para não serem buscados de novo a cada requisição
+    for game_id in chunk:
+        _game_cache.set(game_id, found.get(game_id, {}))
+    return found
+
+def get_games_by_ids(game_ids: List[int]) -> Dict[int, dict]:
+    """
+    Detalhes de vários jogos. Apenas os ids fora do cache são buscados na IGDB, em blocos de
+    até 500 por chamada. Retorna um dicionário id -> jogo, sem os ids não encontrados.
+    """
+    result: Dict[int, dict] = {}
+    missing: List[int] = []
+    for game_id in dict.fromkeys(game_ids):
+        game = _game_cache.get(game_id)
+        if game is None:
+            missing.append(game_id)
+        elif game:
+            result[game_id] = game
+
+    chunks = [missing[i:i + GAMES_CHUNK_SIZE] for i in range(0, len(missing), GAMES_CHUNK_SIZE)]
+    if len(chunks) <= 1:
+        fetched = [_fetch_games_chunk(chunk) for chunk in chunks]
+    else:
+        with ThreadPoolExecutor(max_workers=min(len(chunks), IGDB_MAX_CONCURRENCY)) as executor:
+            fetched = list(executor.map(_fetch_games_chunk, chunks))
+    for found in fetched:
+        result.update(found)
+    return {game_id: result[game_id] for game_id in dict.fromkeys(game_ids) if game_id in result}
+
+def get_game_by_id(game_id: int) -> dict:
+    return get_games_by_ids([game_id]).get(game_id)
+
 
 def fetch_games_from_igdb(query: str) -> list:
     body = f"""
@@ -159,11 +350,46 @@ def fetch_games_from_igdb(query: str) -> list:
     where cover != null;
     limit 50;
     """
-    response = requests.post(f"{url}/games", headers=headers, data=body)
+    response = _post("games", body)
     response.raise_for_status()
     games = response.json()
+    _index_games(games)
     for game in games:
         if game.get("cover"):
             image_id = game["cover"]["image_id"]
-            game["cover_url"] = f"https://images.igdb.com/igdb/image/upload/t_cover_big/{image_id}.jpg"
+            game["cover_url"] = image_url(image_id, "cover_big")
+    return games
+
+def find_games(query: str) -> list:
+    """
+    Busca primeiro no índice local. Vai até a IGDB quando há menos de IGDB_SEARCH_MIN_RESULTS
+    resultados com pontuação mínima; os jogos retornados passam a fazer parte do índice.
+    Se a IGDB falhar, os resultados locais (se houver) são usados.
+    """
+    load_search_index()
+    key = normalize_text(query)
+    cached = _search_cache.get(key)
+    if cached is not None:
+        return cached
+
+    local = [
+        {
+            "id": game_id,
+            "name": name,
+            "cover": {"image_id": image_id},
+            "cover_url": image_url(image_id, "cover_big")
+        }
+        for score, (game_id, name, image_id) in _search_index.search(query, limit=50)
+        if score >= IGDB_SEARCH_MIN_SCORE
+    ]
+    if len(local) >= IGDB_SEARCH_MIN_RESULTS:
+        return local
+
+    try:
+        games = fetch_games_from_igdb(query)
+    except (requests.RequestException, IGDBUnavailableError):
+        if local:
+            return local
+        raise
+    _search_cache.set(key, games)
     return games
\ No newline at end of file
@@ -0,0 +1,104 @@
+import threading
+import time
+import traceback
+from typing import Optional
+from app.config import IGDB_CLIENT_ID, IGDB_ACCESS_TOKEN, TWITCH_CLIENT_SECRET, IGDB_TOKEN_REFRESH_MARGIN
+from app.utils import upstream
+
+TWITCH_TOKEN_URL = "https://id.twitch.tv/oauth2/token"
+
+class IGDBUnavailableError(Exception):
+    """
+    Sem token da IGDB: credenciais da Twitch ausentes ou falha ao gerar o token
+    """
+
+class TwitchTokenManager:
+    """
+    Mantém o access token da IGDB (client credentials da Twitch) em memória junto com a expiração.
+    Faltando IGDB_TOKEN_REFRESH_MARGIN segundos para expirar (ou na metade da validade), o token
+    atual continua sendo usado enquanto um novo é gerado em segundo plano; sem token válido,
+    a geração bloqueia sob um lock.
+    Sem TWITCH_CLIENT_SECRET, usa o IGDB_ACCESS_TOKEN fixo do ambiente.
+    """
+
+    def __init__(self, client_id: Optional[str], client_secret: Optional[str], static_token: Optional[str] = None):
+        self._client_id = client_id
+        self._client_secret = client_secret
+        self._token: Optional[str] = None if client_secret else static_token
+        self._expires_at = 0.0
+        self._refresh_at = 0.0
+        self._lock = threading.Lock()
+        self._refreshing = False
+
+    def get(self) -> str:
+        if not self._client_secret:
+            if not self._token:
+                raise IGDBUnavailableError("TWITCH_CLIENT_SECRET e IGDB_ACCESS_TOKEN não configurados")
+            return self._token
+
+        now = time.time()
+        token = self._token
+        if token and now < self._refresh_at:
+            return token
+        if token and now < self._expires_at:
+            self._refreshInBackground()
+            return token
+        return self.refresh(token)
+
+    def refresh(self, failed_token: Optional[str] = None) -> str:
+        """
+        Gera um novo token. Se outra thread já trocou o token que falhou, usa o novo sem chamar a Twitch.
+        """
+        with self._lock:
+            if self._token and self._token != failed_token and time.time() < self._expires_at:
+                return self._token
+            if not self._client_secret:
+                raise IGDBUnavailableError("Token da IGDB recusado e TWITCH_CLIENT_SECRET não configurado")
+            self._fetchToken()
+            return self._token  # type: ignore
+
+    def _fetchToken(self) -> None:
+        params = {
+            "client_id": self._client_id,
+            "client_secret": self._client_secret,
+            "grant_type": "client_credentials"
+        }
+        try:
+            response = upstream.post(TWITCH_TOKEN_URL, data=params, coalesce=False)
+        except Exception as e:
+            raise IGDBUnavailableError(f"Falha ao gerar o token da IGDB: {e}") from e
+        if response.status_code != 200:
+            raise IGDBUnavailableError(f"Falha ao gerar o token da IGDB: {response.status_code} {response.text}")
+        data = response.json()
+        expires_in = data.get("expires_in", 0)
+        now = time.time()
+        self._token = data["access_token"]
+        self._expires_at = now + expires_in
+        # Tokens de vida curta renovam na metade da validade
+        self._refresh_at = now + max(expires_in - IGDB_TOKEN_REFRESH_MARGIN, expires_in / 2)
+
+    def _refreshInBackground(self) -> None:
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+        failed_token = self._token
+
+        def run() -> None:
+            try:
+                self.refresh(failed_token)
+            except IGDBUnavailableError:
+                # O token atual vale até expirar; a próxima chamada tenta de novo
+                traceback.print_exc()
+            finally:
+                self._refreshing = False
+
+        threading.Thread(target=run, name="igdb-token-refresh", daemon=True).start()
+
+_token_manager = TwitchTokenManager(IGDB_CLIENT_ID, TWITCH_CLIENT_SECRET, IGDB_ACCESS_TOKEN)
+
+def get_igdb_token() -> str:
+    return _token_manager.get()
+
+def refresh_igdb_token(failed_token: Optional[str] = None) -> str:
+    return _token_manager.refresh(failed_token)
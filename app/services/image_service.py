@@ -0,0 +1,97 @@
+import io
+import re
+from typing import Optional, Tuple
+from PIL import Image
+from app.config import (
+    IMAGE_CACHE_DIR,
+    IMAGE_CACHE_MAX_BYTES,
+    IMAGE_ORIGIN_URL,
+    IMAGE_PUBLIC_BASE_URL,
+    IMAGE_RESIZE_WIDTHS,
+    IMAGE_RESIZE_SOURCE,
+    IMAGE_RESIZE_QUALITY
+)
+from app.utils import upstream
+from app.utils.image_cache import DiskImageCache
+from app.utils.singleflight import SingleFlight
+
+# Tamanhos servidos pela CDN da IGDB (t_<size>)
+IGDB_SIZES = {
+    "cover_small", "cover_big", "screenshot_med", "screenshot_big", "screenshot_huge",
+    "logo_med", "thumb", "micro", "720p", "1080p", "original"
+}
+IGDB_IMAGE_URL = "https://images.igdb.com/igdb/image/upload"
+
+_IMAGE_ID = re.compile(r"^[a-z0-9]{1,64}$")
+_RESIZED_SIZE = re.compile(r"^w(\d{1,4})$")
+
+class ImageNotFoundError(Exception):
+    """
+    Imagem inexistente na origem
+    """
+
+_image_cache = DiskImageCache(IMAGE_CACHE_DIR, IMAGE_CACHE_MAX_BYTES)
+# Agrupa downloads e redimensionamentos simultâneos da mesma imagem
+_flight = SingleFlight()
+
+def image_url(image_id: str, size: str) -> str:
+    """
+    URL pública da imagem: o cache local (/images) se IMAGE_PUBLIC_BASE_URL estiver configurada,
+    senão a CDN da IGDB
+    """
+    if IMAGE_PUBLIC_BASE_URL:
+        return f"{IMAGE_PUBLIC_BASE_URL.rstrip('/')}/{image_id}/{size}"
+    return f"{IGDB_IMAGE_URL}/t_{size}/{image_id}.jpg"
+
+def _resized_width(size: str) -> Optional[int]:
+    match = _RESIZED_SIZE.match(size)
+    if match and int(match.group(1)) in IMAGE_RESIZE_WIDTHS:
+        return int(match.group(1))
+    return None
+
+def is_valid_image(image_id: str, size: str) -> bool:
+    """
+    Aceita tamanhos da IGDB e miniaturas w<largura> com larguras de IMAGE_RESIZE_WIDTHS
+    """
+    return bool(_IMAGE_ID.match(image_id)) and (size in IGDB_SIZES or _resized_width(size) is not None)
+
+def _fetch_image(image_id: str, size: str) -> bytes:
+    response = upstream.get(f"{IMAGE_ORIGIN_URL.rstrip('/')}/t_{size}/{image_id}.jpg")
+    if response.status_code == 404:
+        raise ImageNotFoundError(image_id)
+    response.raise_for_status()
+    return response.content
+
+def _resize(data: bytes, width: int) -> bytes:
+    with Image.open(io.BytesIO(data)) as image:
+        image = image.convert("RGB")
+        # thumbnail mantém a proporção e nunca aumenta a imagem
+        image.thumbnail((width, width * 10))
+        output = io.BytesIO()
+        image.save(output, format="JPEG", quality=IMAGE_RESIZE_QUALITY, optimize=True)
+    return output.getvalue()
+
+def _load_image(image_id: str, size: str) -> Tuple[bytes, str]:
+    key = f"{image_id}_{size}"
+    cached = _image_cache.get(key)
+    if cached is not None:
+        return cached
+
+    width = _resized_width(size)
+    if width is not None:
+        # Miniaturas são geradas a partir da versão IMAGE_RESIZE_SOURCE, também guardada no cache
+        source, _ = get_image(image_id, IMAGE_RESIZE_SOURCE)
+        data = _resize(source, width)
+    else:
+        data = _fetch_image(image_id, size)
+    return data, _image_cache.set(key, data)
+
+def get_image(image_id: str, size: str) -> Tuple[bytes, str]:
+    """
+    Retorna (bytes JPEG, hash do conteúdo), buscando na origem apenas o que não estiver em disco.
+    Levanta ImageNotFoundError se a imagem não existir e requests.RequestException em falhas da origem.
+    """
+    return _flight.do((image_id, size), lambda: _load_image(image_id, size))
+
+def cache_stats() -> dict:
+    return _image_cache.stats()
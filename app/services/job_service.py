@@ -0,0 +1,105 @@
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+from sqlalchemy.orm import Session
+from app.database.database import SessionLocal
+from app.models.job_model import Job
+from app.utils.rate_limiter import request_priority, BACKGROUND
+from app.config import JOB_WORKERS, JOB_STALE_SECONDS, JOB_PROGRESS_INTERVAL
+
+ACTIVE_STATUSES = ("queued", "running")
+
+# Pool de workers em processo para tarefas longas (ex.: sincronização de estatísticas)
+_executor = ThreadPoolExecutor(max_workers=JOB_WORKERS, thread_name_prefix="jobs")
+_submit_lock = threading.Lock()
+
+ProgressCallback = Callable[[int, int], None]
+JobFunction = Callable[[Session, ProgressCallback], dict]
+
+def get_job(db: Session, job_id: str) -> Job | None:
+    return db.get(Job, job_id)
+
+def get_active_job(db: Session, kind: str, user_id: int) -> Job | None:
+    """
+    Retorna o job ainda em andamento para o mesmo tipo e usuário.
+    Jobs sem atualização há mais de JOB_STALE_SECONDS (ex.: processo reiniciado) são ignorados.
+    """
+    stale_before = datetime.utcnow() - timedelta(seconds=JOB_STALE_SECONDS)
+    return (
+        db.query(Job)
+        .filter(
+            Job.kind == kind,
+            Job.user_id == user_id,
+            Job.status.in_(ACTIVE_STATUSES),
+            Job.updated_at >= stale_before
+        )
+        .order_by(Job.created_at.desc())
+        .first()
+    )
+
+def _updateJob(job_id: str, **fields) -> None:
+    db = SessionLocal()
+    try:
+        job = db.get(Job, job_id)
+        if job:
+            for key, value in fields.items():
+                setattr(job, key, value)
+            job.updated_at = datetime.utcnow()  # type: ignore
+            db.commit()
+    finally:
+        db.close()
+
+def _progressReporter(job_id: str) -> ProgressCallback:
+    """
+    Cria o callback de progresso do job, gravando no máximo uma vez a cada JOB_PROGRESS_INTERVAL segundos
+    """
+    last_write = 0.0
+
+    def report(done: int, total: int) -> None:
+        nonlocal last_write
+        now = time.monotonic()
+        if done < total and now - last_write < JOB_PROGRESS_INTERVAL:
+            return
+        last_write = now
+        _updateJob(job_id, progress_done=done, progress_total=total)
+
+    return report
+
+def _runJob(job_id: str, func: JobFunction) -> None:
+    # Chamadas feitas pelos jobs ficam atrás das interativas no limitador das APIs
+    priority_token = request_priority.set(BACKGROUND)
+    _updateJob(job_id, status="running")
+    db = SessionLocal()
+    try:
+        result = func(db, _progressReporter(job_id))
+        _updateJob(job_id, status="completed", result=result, finished_at=datetime.utcnow())
+    except Exception as e:
+        db.rollback()
+        traceback.print_exc()
+        _updateJob(job_id, status="failed", error=str(e), finished_at=datetime.utcnow())
+    finally:
+        db.close()
+        request_priority.reset(priority_token)
+
+def submitJob(db: Session, kind: str, user_id: Optional[int], func: JobFunction) -> Job:
+    """
+    Enfileira um job no pool de workers e retorna o registro persistido.
+    Se já houver um job do mesmo tipo em andamento para o usuário, ele é retornado no lugar de um novo.
+    """
+    with _submit_lock:
+        if user_id is not None:
+            existing = get_active_job(db, kind, user_id)
+            if existing:
+                return existing
+
+        job = Job(id=str(uuid.uuid4()), kind=kind, user_id=user_id, status="queued")
+        db.add(job)
+        db.commit()
+        db.refresh(job)
+
+    _executor.submit(_runJob, job.id, func)  # type: ignore
+    return job
@@ -1,13 +1,109 @@
-import requests
-from app.config import PSN_API_KEY
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from dataclasses import asdict
+from typing import Any, Callable, List, Optional, Tuple, TypeVar
+from app.config import (
+    PSN_API_KEY,
+    PSN_TOKEN_REFRESH_MARGIN,
+    PSN_WORKERS,
+    PSN_TROPHY_CACHE_TTL,
+    PSN_TROPHY_STALE_TTL,
+    PSN_TROPHY_CACHE_SIZE,
+    PSN_TITLES_PAGE_SIZE
+)
+from app.services.identity_service import resolve_cached, PSN as IDENTITY_PSN
+from app.utils.cache import StaleWhileRevalidateCache
+from app.utils.pagination import paginate
 from psnawp_api import PSNAWP
+from psnawp_api.models import User
+from psnawp_api.models.trophies import TrophyTitle
+from psnawp_api.core.psnawp_exceptions import PSNAWPError, PSNAWPNotFoundError
 
-psnawp = PSNAWP(PSN_API_KEY)
+T = TypeVar("T")
 
-client = psnawp.me()
+class PSNUnavailableError(Exception):
+    """
+    PSN não configurada (PSN_API_KEY ausente) ou falha ao autenticar com a Sony
+    """
+
+class PSNClientHolder:
+    """
+    Cria o cliente PSNAWP sob demanda, na primeira chamada, e renova o access token
+    PSN_TOKEN_REFRESH_MARGIN segundos antes de expirar. Seguro para uso entre threads:
+    a autenticação e as renovações acontecem sob um lock, então as chamadas paralelas
+    nunca disputam a troca de tokens.
+    """
+
+    def __init__(self, npsso: Optional[str]):
+        self._npsso = npsso
+        self._client: Optional[PSNAWP] = None
+        self._lock = threading.Lock()
+
+    def get(self) -> PSNAWP:
+        with self._lock:
+            if not self._npsso:
+                raise PSNUnavailableError("PSN_API_KEY não configurada")
+            if self._client is None:
+                self._client = PSNAWP(self._npsso)
+            try:
+                self._ensureToken(self._client)
+            except PSNAWPError as e:
+                # Na próxima chamada recomeça do zero a partir do npsso
+                self._client = None
+                raise PSNUnavailableError(f"Falha ao autenticar na PSN: {e}") from e
+            return self._client
+
+    def _ensureToken(self, client: PSNAWP) -> None:
+        authenticator = client.authenticator
+        now = time.time()
+        if (
+            authenticator.token_response is None
+            or authenticator.refresh_token_expiration_time - PSN_TOKEN_REFRESH_MARGIN <= now
+        ):
+            # Sem tokens ou com o refresh token perto de expirar: novo login pelo npsso
+            authorization_code = authenticator.get_authorization_code()
+            authenticator.fetch_access_token_from_authorization(authorization_code)
+        elif authenticator.access_token_expiration_time - PSN_TOKEN_REFRESH_MARGIN <= now:
+            # O PSNAWP só renova depois de expirar: antecipa marcando o token atual como vencido
+            authenticator.token_response["access_token_expires_at"] = now
+            authenticator.fetch_access_token_from_refresh()
+
+_client_holder = PSNClientHolder(PSN_API_KEY)
+
+# Pool exclusivo para as chamadas bloqueantes do PSNAWP, separado do threadpool do FastAPI
+_psn_executor = ThreadPoolExecutor(max_workers=PSN_WORKERS, thread_name_prefix="psn")
+
+# Resumo de troféus e lista completa de títulos com troféus por account id. As chamadas de troféus
+# são lentas e muito limitadas pela Sony, então os valores vencidos são servidos enquanto recarregam.
+_trophy_summary_cache = StaleWhileRevalidateCache(
+    maxsize=PSN_TROPHY_CACHE_SIZE,
+    ttl=PSN_TROPHY_CACHE_TTL,
+    stale_ttl=PSN_TROPHY_STALE_TTL
+)
+_trophy_titles_cache = StaleWhileRevalidateCache(
+    maxsize=PSN_TROPHY_CACHE_SIZE,
+    ttl=PSN_TROPHY_CACHE_TTL,
+    stale_ttl=PSN_TROPHY_STALE_TTL
+)
+
+def getPSNClient() -> PSNAWP:
+    return _client_holder.get()
+
+async def runPSN(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Executa uma função bloqueante que usa o PSNAWP no pool de threads da PSN
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_psn_executor, partial(func, *args, **kwargs))
 
 def getProfileInfo(online_id: str) -> dict:
-    user = psnawp.user(online_id=online_id)
+    try:
+        user = getPSNClient().user(online_id=online_id)
+    except PSNAWPNotFoundError:
+        return {}
     if not user or not user.online_id:
         return {}
 
@@ -15,4 +111,94 @@ def getProfileInfo(online_id: str) -> dict:
         "online_id": user.online_id,
         "account_id": user.account_id,
         "region": user.get_region(),
-    }
\ No newline at end of file
+    }
+
+async def getProfileInfoAsync(online_id: str) -> dict:
+    return await runPSN(getProfileInfo, online_id)
+
+def _fetchAccountId(online_id: str) -> Optional[str]:
+    try:
+        return getPSNClient().user(online_id=online_id).account_id
+    except PSNAWPNotFoundError:
+        return None
+
+def resolveAccountId(online_id: str) -> Optional[str]:
+    """
+    Resolve o online id PSN para o account id usando o cache de identidades
+    """
+    return resolve_cached(IDENTITY_PSN, online_id, _fetchAccountId)
+
+def _userFor(online_id: str) -> Optional[User]:
+    """
+    Monta o usuário a partir do account id em cache, sem a chamada de perfil feita por psnawp.user()
+    """
+    account_id = resolveAccountId(online_id)
+    if not account_id:
+        return None
+    return User(getPSNClient().authenticator, online_id, account_id)
+
+def _serializeTrophyTitle(title: TrophyTitle) -> dict:
+    return {
+        "np_communication_id": title.np_communication_id,
+        "title_name": title.title_name,
+        "title_icon_url": title.title_icon_url,
+        "platforms": sorted(platform.value for platform in title.title_platform),
+        "progress": title.progress,
+        "earned_trophies": asdict(title.earned_trophies),
+        "defined_trophies": asdict(title.defined_trophies),
+        "has_trophy_groups": title.has_trophy_groups,
+        "last_updated": title.last_updated_datetime.isoformat() if title.last_updated_datetime else None,
+    }
+
+def getTrophySummary(online_id: str) -> dict:
+    """
+    Nível, progresso e troféus conquistados por tipo. Retorna {} se o usuário não existir;
+    perfis com troféus privados levantam PSNAWPForbiddenError.
+    """
+    user = _userFor(online_id)
+    if user is None:
+        return {}
+
+    def load() -> dict:
+        summary = user.trophy_summary()
+        return {
+            "online_id": user.online_id,
+            "account_id": summary.account_id,
+            "trophy_level": summary.trophy_level,
+            "progress": summary.progress,
+            "tier": summary.tier,
+            "earned_trophies": asdict(summary.earned_trophies),
+        }
+
+    return _trophy_summary_cache.get(user.account_id, load)
+
+def getTrophyTitles(online_id: str) -> Optional[List[dict]]:
+    """
+    Todos os títulos com troféus do usuário, do mais recente para o mais antigo.
+    Retorna None se o usuário não existir.
+    """
+    user = _userFor(online_id)
+    if user is None:
+        return None
+
+    def load() -> List[dict]:
+        return [_serializeTrophyTitle(title) for title in user.trophy_titles(limit=None, page_size=PSN_TITLES_PAGE_SIZE)]
+
+    return _trophy_titles_cache.get(user.account_id, load)
+
+def getTrophyTitlesPage(online_id: str, limit: int, cursor: Optional[str] = None, page: int = 1) -> Optional[Tuple[List[dict], Optional[str], int]]:
+    """
+    Página da lista de títulos em cache: (títulos, cursor da próxima página, total).
+    Levanta ValueError para cursores inválidos.
+    """
+    titles = getTrophyTitles(online_id)
+    if titles is None:
+        return None
+    page_titles, next_cursor = paginate(titles, limit, cursor, page, key=lambda title: title["np_communication_id"])
+    return page_titles, next_cursor, len(titles)
+
+async def getTrophySummaryAsync(online_id: str) -> dict:
+    return await runPSN(getTrophySummary, online_id)
+
+async def getTrophyTitlesPageAsync(online_id: str, limit: int, cursor: Optional[str] = None, page: int = 1) -> Optional[Tuple[List[dict], Optional[str], int]]:
+    return await runPSN(getTrophyTitlesPage, online_id, limit, cursor, page)
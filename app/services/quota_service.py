@@ -0,0 +1,29 @@
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import IntegrityError
+from datetime import date
+from app.models.api_usage_model import ApiUsage
+
+def get_usage(db: Session, api: str, day: date) -> int:
+    entry = db.get(ApiUsage, (api, day))
+    return entry.count if entry else 0  # type: ignore
+
+def add_usage(db: Session, api: str, day: date, delta: int) -> int:
+    """
+    Soma delta ao contador diário de forma atômica e retorna o total atualizado
+    (que inclui as chamadas feitas por outros processos).
+    """
+    for _ in range(2):
+        updated = (
+            db.query(ApiUsage)
+            .filter(ApiUsage.api == api, ApiUsage.day == day)
+            .update({ApiUsage.count: ApiUsage.count + delta}, synchronize_session=False)
+        )
+        if not updated:
+            db.add(ApiUsage(api=api, day=day, count=delta))
+        try:
+            db.commit()
+            break
+        except IntegrityError:
+            # Outro processo criou a linha do dia ao mesmo tempo: tenta de novo com UPDATE
+            db.rollback()
+    return get_usage(db, api, day)
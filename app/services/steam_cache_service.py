@@ -0,0 +1,32 @@
+from sqlalchemy.orm import Session
+from datetime import datetime, timedelta
+from typing import Optional
+from app.models.steam_model import SteamAchievementSchema
+
+def get_stored_schema(db: Session, appid: int, language: str, max_age: float) -> Optional[SteamAchievementSchema]:
+    """
+    Retorna o schema armazenado se ainda estiver dentro do TTL.
+    """
+    entry = db.get(SteamAchievementSchema, (appid, language))
+    if not entry or entry.fetched_at < datetime.utcnow() - timedelta(seconds=max_age):
+        return None
+    return entry
+
+def save_schema(db: Session, appid: int, language: str, achievements: list) -> SteamAchievementSchema:
+    entry = db.get(SteamAchievementSchema, (appid, language))
+    if entry:
+        entry.achievements = achievements  # type: ignore
+        entry.fetched_at = datetime.utcnow()  # type: ignore
+    else:
+        entry = SteamAchievementSchema(appid=appid, language=language, achievements=achievements)
+        db.add(entry)
+    db.commit()
+    return entry
+
+def delete_schemas(db: Session, appid: int, language: Optional[str] = None) -> int:
+    query = db.query(SteamAchievementSchema).filter(SteamAchievementSchema.appid == appid)
+    if language:
+        query = query.filter(SteamAchievementSchema.language == language)
+    deleted = query.delete(synchronize_session=False)
+    db.commit()
+    return deleted
@@ -1,14 +1,60 @@
 import requests
+import httpx
+import asyncio
 import re
-from typing import Dict, List, Optional
-from app.config import STEAM_API_KEY
+from concurrent.futures import ThreadPoolExecutor
+from bisect import bisect_left
+from typing import Dict, List, Optional, Tuple
+from datetime import datetime
+from sqlalchemy.exc import SQLAlchemyError
+from app.config import (
+    STEAM_API_KEY,
+    STEAM_MAX_CONCURRENCY,
+    STEAM_SCHEMA_CACHE_TTL,
+    STEAM_SCHEMA_CACHE_SIZE,
+    STEAM_RARITY_CACHE_TTL,
+    STEAM_RARITY_CACHE_SIZE,
+    STEAM_NO_SCHEMA_TTL,
+    STEAM_INACCESSIBLE_TTL,
+    STEAM_NEGATIVE_CACHE_SIZE,
+    STEAM_SUMMARY_CACHE_TTL,
+    STEAM_SUMMARY_CACHE_SIZE
+)
+from app.database.database import SessionLocal
+from app.services.steam_cache_service import get_stored_schema, save_schema, delete_schemas
+from app.services.identity_service import resolve_cached, IdentityLookupError, STEAM as IDENTITY_STEAM
+from app.utils.cache import TTLCache
+from app.utils.concurrency import gather_bounded
+from app.utils import upstream
 
 BASE_URL = "https://api.steampowered.com"
 
-def resolveVanityURL(vanity_url: str) -> Optional[str]:
-    """
-    Resolve uma URL personalizada do Steam para obter o Steam ID
-    """
+# Cache em memória (LRU) na frente da tabela steam_achievement_schemas, chaveado por (appid, idioma)
+_schema_cache = TTLCache(maxsize=STEAM_SCHEMA_CACHE_SIZE, ttl=STEAM_SCHEMA_CACHE_TTL)
+
+# Índices de raridade (porcentagens globais) por appid
+_rarity_cache = TTLCache(maxsize=STEAM_RARITY_CACHE_SIZE, ttl=STEAM_RARITY_CACHE_TTL)
+
+# Cache negativo: appids sem schema de conquistas e combinações (steamid, appid) inacessíveis
+_no_schema_cache = TTLCache(maxsize=STEAM_NEGATIVE_CACHE_SIZE, ttl=STEAM_NO_SCHEMA_TTL)
+_inaccessible_cache = TTLCache(maxsize=STEAM_NEGATIVE_CACHE_SIZE, ttl=STEAM_INACCESSIBLE_TTL)
+
+# Perfis (GetPlayerSummaries) por steamid; perfis inexistentes ficam guardados como {}
+_summary_cache = TTLCache(maxsize=STEAM_SUMMARY_CACHE_SIZE, ttl=STEAM_SUMMARY_CACHE_TTL)
+
+# Máximo de steamids aceitos pela GetPlayerSummaries em uma única chamada
+SUMMARIES_CHUNK_SIZE = 100
+
+# Status retornados pela Steam para jogos sem estatísticas (400) e perfis privados (403)
+_INACCESSIBLE_STATUS = (400, 403)
+
+# SteamID64 de contas individuais: 17 dígitos começando por 7656119
+_STEAMID64_PATTERN = re.compile(r"^7656119\d{10}$")
+
+def isSteamID64(value: str) -> bool:
+    return bool(_STEAMID64_PATTERN.match(value.strip()))
+
+def _fetchVanityURL(vanity_url: str) -> Optional[str]:
     url = f"{BASE_URL}/ISteamUser/ResolveVanityURL/v1"
     params = {
         "key": STEAM_API_KEY,
@@ -16,19 +62,32 @@ def resolveVanityURL(vanity_url: str) -> Optional[str]:
     }
     
     try:
-        resp = requests.get(url, params=params)
+        resp = upstream.get(url, params=params)
         resp.raise_for_status()
         data = resp.json().get("response", {})
-        
-        if data.get("success") == 1:
-            return data.get("steamid")
-        return None
-    except requests.RequestException:
+    except requests.RequestException as e:
+        raise IdentityLookupError(f"Erro ao consultar a Steam API: {e}") from e
+
+    if data.get("success") == 1:
+        return data.get("steamid")
+    # 42 (k_EResultNoMatch): a Steam confirmou que a vanity URL não existe
+    if data.get("success") == 42:
         return None
+    raise IdentityLookupError(f"Resposta inesperada da Steam API: {data.get('message') or data.get('success')}")
+
+def resolveVanityURL(vanity_url: str) -> Optional[str]:
+    """
+    Resolve uma URL personalizada do Steam para obter o Steam ID.
+    SteamIDs numéricos são retornados direto; os demais passam pelo cache de identidades.
+    """
+    if isSteamID64(vanity_url):
+        return vanity_url.strip()
+    return resolve_cached(IDENTITY_STEAM, vanity_url, _fetchVanityURL)
 
 def extractVanityFromURL(profile_url: str) -> Optional[str]:
     """
-    Extrai o vanity URL de uma URL completa do perfil Steam
+    Extrai o vanity URL de uma URL completa do perfil Steam.
+    URLs /profiles/ já contêm o SteamID, que resolveVanityURL retorna sem consultar a Steam.
     """
     # Padrões comuns de URLs do Steam
     patterns = [
@@ -44,86 +103,334 @@ def extractVanityFromURL(profile_url: str) -> Optional[str]:
     
     return None
 
-def getPlayerSummary(steamid: str) -> dict:
-    url = f"{BASE_URL}/ISteamUser/GetPlayerSummaries/v2"
-    params = {
+def _splitSummaryRequest(steamids: List[str]) -> tuple[Dict[str, dict], List[List[str]]]:
+    """
+    Separa os steamids já em cache dos que precisam ser buscados, em blocos de até 100
+    """
+    cached: Dict[str, dict] = {}
+    missing: List[str] = []
+    for steamid in dict.fromkeys(steamids):
+        summary = _summary_cache.get(steamid)
+        if summary is None:
+            missing.append(steamid)
+        else:
+            cached[steamid] = summary
+    chunks = [missing[i:i + SUMMARIES_CHUNK_SIZE] for i in range(0, len(missing), SUMMARIES_CHUNK_SIZE)]
+    return cached, chunks
+
+def _storeSummaries(chunk: List[str], players: List[dict]) -> Dict[str, dict]:
+    found = {player.get("steamid"): player for player in players}
+    for steamid in chunk:
+        _summary_cache.set(steamid, found.get(steamid, {}))
+    return found
+
+def _mergeSummaries(steamids: List[str], cached: Dict[str, dict], fetched: List[Dict[str, dict]]) -> Dict[str, dict]:
+    for found in fetched:
+        cached.update(found)
+    return {steamid: cached[steamid] for steamid in dict.fromkeys(steamids) if cached.get(steamid)}
+
+# As versões síncrona e assíncrona de cada chamada compartilham a montagem da requisição
+# (URL e parâmetros) e o tratamento da resposta; só o cliente HTTP muda.
+
+def _summariesRequest(chunk: List[str]) -> Tuple[str, dict]:
+    return f"{BASE_URL}/ISteamUser/GetPlayerSummaries/v2", {
         "key": STEAM_API_KEY,
-        "steamids": steamid
+        "steamids": ",".join(chunk)
     }
 
-    resp = requests.get(url, params=params)
+def _parseSummaries(chunk: List[str], resp) -> Dict[str, dict]:
     resp.raise_for_status()
-    data = resp.json().get("response", {})
-    players = data.get("players", [])
-    return players[0] if players else {}
+    players = resp.json().get("response", {}).get("players", [])
+    return _storeSummaries(chunk, players)
 
-def getOwnedGames(steamid: str) -> dict:
-    url = f"{BASE_URL}/IPlayerService/GetOwnedGames/v1"
-    params = {
+def _fetchSummaryChunk(chunk: List[str]) -> Dict[str, dict]:
+    url, params = _summariesRequest(chunk)
+    return _parseSummaries(chunk, upstream.get(url, params=params))
+
+async def _fetchSummaryChunkAsync(chunk: List[str]) -> Dict[str, dict]:
+    url, params = _summariesRequest(chunk)
+    return _parseSummaries(chunk, await upstream.aget(url, params=params))
+
+def getPlayerSummaries(steamids: List[str]) -> Dict[str, dict]:
+    """
+    Obtém os perfis de vários steamids, em blocos de 100 por chamada à Steam.
+    Retorna um dicionário steamid -> perfil, sem os steamids não encontrados.
+    """
+    cached, chunks = _splitSummaryRequest(steamids)
+    if len(chunks) <= 1:
+        fetched = [_fetchSummaryChunk(chunk) for chunk in chunks]
+    else:
+        with ThreadPoolExecutor(max_workers=min(len(chunks), STEAM_MAX_CONCURRENCY)) as executor:
+            fetched = list(executor.map(_fetchSummaryChunk, chunks))
+    return _mergeSummaries(steamids, cached, fetched)
+
+async def getPlayerSummariesAsync(steamids: List[str]) -> Dict[str, dict]:
+    """
+    Versão assíncrona de getPlayerSummaries; os blocos são buscados em paralelo
+    """
+    cached, chunks = _splitSummaryRequest(steamids)
+    fetched = await gather_bounded(chunks, _fetchSummaryChunkAsync, STEAM_MAX_CONCURRENCY)
+    return _mergeSummaries(steamids, cached, fetched)
+
+def getPlayerSummary(steamid: str) -> dict:
+    return getPlayerSummaries([steamid]).get(steamid, {})
+
+def _ownedGamesRequest(steamid: str) -> Tuple[str, dict]:
+    return f"{BASE_URL}/IPlayerService/GetOwnedGames/v1", {
         "key": STEAM_API_KEY,
         "steamid": steamid,
         "include_appinfo": True,
-        "include_played_free_games": True,
-        "appsids_filter": None
+        "include_played_free_games": True
     }
 
-    resp = requests.get(url, params=params)
+def _parseOwnedGames(resp) -> dict:
     resp.raise_for_status()
     return resp.json().get("response", {})
 
-def getPlayerAchievements(steamid: str, appid: int) -> dict:
+def getOwnedGames(steamid: str) -> dict:
+    url, params = _ownedGamesRequest(steamid)
+    return _parseOwnedGames(upstream.get(url, params=params))
+
+def hasAchievementStats(game: dict) -> bool:
     """
-    Obtém conquistas de um jogo específico para um usuário
+    Indica se vale a pena buscar conquistas de um jogo de GetOwnedGames: a Steam só informa
+    has_community_visible_stats para jogos com estatísticas, e appids já conhecidos sem schema são ignorados
     """
-    url = f"{BASE_URL}/ISteamUserStats/GetPlayerAchievements/v1"
-    params = {
+    return bool(game.get("has_community_visible_stats")) and _no_schema_cache.get(game.get("appid")) is None
+
+def _isKnownInaccessible(steamid: str, appid: int) -> bool:
+    return _no_schema_cache.get(appid) is not None or _inaccessible_cache.get((steamid, appid)) is not None
+
+def _playerAchievementsRequest(steamid: str, appid: int) -> Tuple[str, dict]:
+    return f"{BASE_URL}/ISteamUserStats/GetPlayerAchievements/v1", {
         "key": STEAM_API_KEY,
         "steamid": steamid,
         "appid": appid,
         "l": "portuguese"  # Idioma para descrições
     }
-    
+
+def _parsePlayerAchievements(steamid: str, appid: int, resp) -> dict:
+    if resp.status_code in _INACCESSIBLE_STATUS:
+        _inaccessible_cache.set((steamid, appid), True)
+    resp.raise_for_status()
+    return resp.json().get("playerstats", {})
+
+def getPlayerAchievements(steamid: str, appid: int) -> dict:
+    """
+    Obtém conquistas de um jogo específico para um usuário
+    """
+    if _isKnownInaccessible(steamid, appid):
+        return {}
+
+    url, params = _playerAchievementsRequest(steamid, appid)
     try:
-        resp = requests.get(url, params=params)
-        resp.raise_for_status()
-        return resp.json().get("playerstats", {})
+        return _parsePlayerAchievements(steamid, appid, upstream.get(url, params=params))
     except requests.RequestException:
         return {}
 
-def getGameAchievementSchema(appid: int) -> list:
+def _loadCachedSchema(appid: int, language: str) -> Optional[list]:
     """
-    Retorna o schema de conquistas de um jogo, incluindo ícones.
+    Busca o schema no cache em memória e, em seguida, no banco de dados
     """
-    url = f"{BASE_URL}/ISteamUserStats/GetSchemaForGame/v2/"
-    params = {
+    key = (appid, language)
+    cached = _schema_cache.get(key)
+    if cached is not None:
+        return cached
+
+    db = SessionLocal()
+    try:
+        entry = get_stored_schema(db, appid, language, STEAM_SCHEMA_CACHE_TTL)
+        if not entry:
+            return None
+        achievements = entry.achievements
+        # O LRU expira junto com a linha do banco
+        remaining = STEAM_SCHEMA_CACHE_TTL - (datetime.utcnow() - entry.fetched_at).total_seconds()
+        _schema_cache.set(key, achievements, ttl=remaining)
+        return achievements  # type: ignore
+    except SQLAlchemyError:
+        return None
+    finally:
+        db.close()
+
+def _storeSchema(appid: int, language: str, achievements: list) -> None:
+    _schema_cache.set((appid, language), achievements)
+    db = SessionLocal()
+    try:
+        save_schema(db, appid, language, achievements)
+    except SQLAlchemyError:
+        # Outra requisição pode ter gravado o mesmo schema ao mesmo tempo
+        db.rollback()
+    finally:
+        db.close()
+
+def invalidateGameAchievementSchema(appid: int, language: Optional[str] = None) -> int:
+    """
+    Remove o schema de um jogo dos dois níveis de cache (todos os idiomas se language for None)
+    """
+    _schema_cache.pop_matching(lambda key: key[0] == appid and (language is None or key[1] == language))
+    db = SessionLocal()
+    try:
+        return delete_schemas(db, appid, language)
+    finally:
+        db.close()
+
+def _schemaRequest(appid: int, language: str) -> Tuple[str, dict]:
+    return f"{BASE_URL}/ISteamUserStats/GetSchemaForGame/v2/", {
         "key": STEAM_API_KEY,
         "appid": appid,
-        "l": "portuguese" 
+        "l": language
     }
 
+def _parseSchema(appid: int, resp) -> list:
+    resp.raise_for_status()
+    achievements = resp.json().get("game", {}).get("availableGameStats", {}).get("achievements", [])
+    if not achievements:
+        _no_schema_cache.set(appid, True)
+    return achievements
+
+def getGameAchievementSchema(appid: int, language: str = "portuguese") -> list:
+    """
+    Retorna o schema de conquistas de um jogo, incluindo ícones.
+    """
+    if _no_schema_cache.get(appid) is not None:
+        return []
+    cached = _loadCachedSchema(appid, language)
+    if cached is not None:
+        return cached
+
+    url, params = _schemaRequest(appid, language)
     try:
-        resp = requests.get(url, params=params)
-        resp.raise_for_status()
-        return resp.json().get("game", {}).get("availableGameStats", {}).get("achievements", [])
+        achievements = _parseSchema(appid, upstream.get(url, params=params))
     except requests.RequestException:
         return []
 
+    if achievements:
+        _storeSchema(appid, language, achievements)
+    return achievements
+
+def _globalPercentagesRequest(appid: int) -> Tuple[str, dict]:
+    return f"{BASE_URL}/ISteamUserStats/GetGlobalAchievementPercentagesForApp/v2", {
+        "gameid": appid
+    }
+
+def _parseGlobalPercentages(resp) -> dict:
+    resp.raise_for_status()
+    return resp.json().get("achievementpercentages", {})
+
 def getGlobalAchievementPercentagesForApp(appid: int) -> dict:
     """
     Obtém estatísticas globais de conquistas para um jogo
     """
-    url = f"{BASE_URL}/ISteamUserStats/GetGlobalAchievementPercentagesForApp/v2"
-    params = {
-        "gameid": appid
-    }
-    
+    url, params = _globalPercentagesRequest(appid)
     try:
-        resp = requests.get(url, params=params)
-        resp.raise_for_status()
-        return resp.json().get("achievementpercentages", {})
+        return _parseGlobalPercentages(upstream.get(url, params=params))
     except requests.RequestException:
         return {}
 
+async def getOwnedGamesAsync(steamid: str) -> dict:
+    """
+    Versão assíncrona de getOwnedGames
+    """
+    url, params = _ownedGamesRequest(steamid)
+    return _parseOwnedGames(await upstream.aget(url, params=params))
+
+async def getPlayerAchievementsAsync(steamid: str, appid: int) -> dict:
+    """
+    Versão assíncrona de getPlayerAchievements
+    """
+    if _isKnownInaccessible(steamid, appid):
+        return {}
+
+    url, params = _playerAchievementsRequest(steamid, appid)
+    try:
+        return _parsePlayerAchievements(steamid, appid, await upstream.aget(url, params=params))
+    except httpx.HTTPError:
+        return {}
+
+async def getGameAchievementSchemaAsync(appid: int, language: str = "portuguese") -> list:
+    """
+    Versão assíncrona de getGameAchievementSchema
+    """
+    if _no_schema_cache.get(appid) is not None:
+        return []
+    cached = _schema_cache.get((appid, language))
+    if cached is None:
+        cached = await asyncio.to_thread(_loadCachedSchema, appid, language)
+    if cached is not None:
+        return cached
+
+    url, params = _schemaRequest(appid, language)
+    try:
+        achievements = _parseSchema(appid, await upstream.aget(url, params=params))
+    except httpx.HTTPError:
+        return []
+
+    if achievements:
+        await asyncio.to_thread(_storeSchema, appid, language, achievements)
+    return achievements
+
+async def getGlobalAchievementPercentagesForAppAsync(appid: int) -> dict:
+    """
+    Versão assíncrona de getGlobalAchievementPercentagesForApp
+    """
+    url, params = _globalPercentagesRequest(appid)
+    try:
+        return _parseGlobalPercentages(await upstream.aget(url, params=params))
+    except httpx.HTTPError:
+        return {}
+
+class AchievementRarityIndex:
+    """
+    Porcentagens globais de conquistas de um jogo, indexadas por apiname e ordenadas da mais rara para a mais comum
+    """
+
+    def __init__(self, global_achievements: list):
+        self.percentages = {
+            ach["name"]: float(ach.get("percent", 100.0))
+            for ach in global_achievements
+            if ach.get("name")
+        }
+        ordered = sorted((percent, name) for name, percent in self.percentages.items())
+        self._percents = [percent for percent, _ in ordered]
+        self._names = [name for _, name in ordered]
+
+    def percentage(self, apiname: str) -> Optional[float]:
+        return self.percentages.get(apiname)
+
+    def rarer_than(self, threshold: float) -> List[str]:
+        """
+        Retorna os apinames com porcentagem global abaixo do limite, do mais raro para o mais comum
+        """
+        return self._names[:bisect_left(self._percents, threshold)]
+
+    def __len__(self) -> int:
+        return len(self.percentages)
+
+def _buildRarityIndex(appid: int, global_percentages: dict) -> AchievementRarityIndex:
+    index = AchievementRarityIndex(global_percentages.get("achievements", []))
+    # Resposta vazia (falha na chamada) não vai para o cache
+    if global_percentages:
+        _rarity_cache.set(appid, index)
+    return index
+
+def getAchievementRarityIndex(appid: int) -> AchievementRarityIndex:
+    """
+    Retorna o índice de raridade de um jogo, usando o cache por appid
+    """
+    index = _rarity_cache.get(appid)
+    if index is None:
+        index = _buildRarityIndex(appid, getGlobalAchievementPercentagesForApp(appid))
+    return index
+
+async def getAchievementRarityIndexAsync(appid: int) -> AchievementRarityIndex:
+    """
+    Versão assíncrona de getAchievementRarityIndex
+    """
+    index = _rarity_cache.get(appid)
+    if index is None:
+        index = _buildRarityIndex(appid, await getGlobalAchievementPercentagesForAppAsync(appid))
+    return index
+
 def getPlayerProfileInfo(profile_url: str) -> Dict:
     """
     Função principal que obtém informações completas do perfil Steam
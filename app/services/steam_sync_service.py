@@ -0,0 +1,256 @@
+import asyncio
+from datetime import datetime
+from sqlalchemy.orm import Session
+from typing import Callable, Dict, List, Optional
+from app.models.user_model import User, GeneralStats
+from app.models.steam_model import SteamGameSnapshot
+from app.services.user_service import update_general_stats, get_general_stats_by_id
+from app.services.steam_service import (
+    getOwnedGamesAsync,
+    getPlayerAchievementsAsync,
+    getGameAchievementSchemaAsync,
+    getAchievementRarityIndexAsync,
+    hasAchievementStats,
+    AchievementRarityIndex
+)
+from app.services.achievement_store_service import (
+    STEAM,
+    get_or_create_game,
+    save_definitions,
+    save_user_game,
+    get_user_games,
+    remove_user_games,
+    has_synced_account
+)
+from app.utils import upstream
+from app.utils.concurrency import gather_bounded
+from app.config import STEAM_MAX_CONCURRENCY
+
+STEAM_STATS_SYNC_JOB = "steam_stats_sync"
+
+def get_game_snapshots(db: Session, user_id: int) -> Dict[int, SteamGameSnapshot]:
+    snapshots = db.query(SteamGameSnapshot).filter(SteamGameSnapshot.user_id == user_id).all()
+    return {snapshot.appid: snapshot for snapshot in snapshots}  # type: ignore
+
+def _hasChanged(snapshot: SteamGameSnapshot | None, game: dict) -> bool:
+    """
+    Um jogo precisa ser buscado novamente se for novo ou se o tempo de jogo / última sessão mudou
+    """
+    if snapshot is None:
+        return True
+    return (
+        snapshot.playtime_forever != game.get("playtime_forever", 0)
+        or snapshot.rtime_last_played != game.get("rtime_last_played", 0)
+    )
+
+def _timestamp(value: int | None) -> Optional[datetime]:
+    return datetime.utcfromtimestamp(value) if value else None
+
+def _storeGameRow(db: Session, game: dict):
+    appid = game["appid"]
+    icon_hash = game.get("img_icon_url")
+    icon_url = f"https://media.steampowered.com/steamcommunity/public/images/apps/{appid}/{icon_hash}.jpg" if icon_hash else None
+    return get_or_create_game(db, STEAM, str(appid), game.get("name"), icon_url)
+
+def _storePlaytime(db: Session, steamid: str, game: dict, stored_game, unlocked: Optional[Dict[int, Optional[datetime]]]) -> None:
+    save_user_game(
+        db, STEAM, steamid, stored_game, unlocked,
+        playtime_forever=game.get("playtime_forever", 0),
+        playtime_2weeks=game.get("playtime_2weeks", 0),
+        last_played=_timestamp(game.get("rtime_last_played"))
+    )
+
+def _storeGame(
+    db: Session,
+    steamid: str,
+    game: dict,
+    player_achievements: List[dict],
+    schema: List[dict],
+    rarity_index: Optional[AchievementRarityIndex]
+) -> int:
+    """
+    Grava o jogo, as definições de conquistas (schema + porcentagens globais) e os desbloqueios
+    da conta no banco normalizado. Retorna o id do jogo.
+    """
+    stored_game = _storeGameRow(db, game)
+
+    schema_map = {a.get("name"): a for a in schema}
+    definitions = []
+    for ach in player_achievements:
+        apiname = ach.get("apiname")
+        if not apiname:
+            continue
+        schema_ach = schema_map.get(apiname, {})
+        definitions.append({
+            "api_name": apiname,
+            "display_name": schema_ach.get("displayName") or ach.get("name"),
+            "description": schema_ach.get("description") or ach.get("description"),
+            "icon_url": schema_ach.get("icon"),
+            "icon_locked_url": schema_ach.get("icongray"),
+            "hidden": bool(schema_ach.get("hidden")),
+            "global_percentage": rarity_index.percentage(apiname) if rarity_index else None
+        })
+    # Só o schema oficial do jogo define quais conquistas deixaram de existir
+    schema_names = [a["name"] for a in schema if a.get("name")]
+    stored_definitions = save_definitions(db, stored_game, definitions, schema_names)
+
+    unlocked = {
+        stored_definitions[ach["apiname"]].id: _timestamp(ach.get("unlocktime"))
+        for ach in player_achievements
+        if ach.get("achieved") == 1 and ach.get("apiname") in stored_definitions
+    }
+    _storePlaytime(db, steamid, game, stored_game, unlocked)  # type: ignore
+    return stored_game.id  # type: ignore
+
+async def syncSteamGeneralStats(
+    db: Session,
+    user: User,
+    stats: GeneralStats,
+    progress: Optional[Callable[[int, int], None]] = None
+) -> dict:
+    """
+    Sincroniza as estatísticas gerais de forma incremental: apenas os jogos cujo tempo de jogo
+    ou última sessão mudaram desde o último snapshot têm as conquistas buscadas novamente,
+    e as estatísticas são atualizadas a partir das diferenças. Os jogos buscados também são
+    gravados no banco normalizado (jogos, conquistas e desbloqueios).
+    """
+    steamid: str = user.steam_id  # type: ignore
+    owned_games = await getOwnedGamesAsync(steamid)
+    games = [game for game in owned_games.get("games", []) if game.get("appid")]
+    owned_appids = {game["appid"] for game in games}
+
+    snapshots = get_game_snapshots(db, user.id)  # type: ignore
+
+    # Snapshots de outro Steam ID não valem mais, e sem dados no banco normalizado
+    # os jogos inalterados não teriam conquistas gravadas: recomeça do zero
+    if any(snapshot.steam_id != steamid for snapshot in snapshots.values()) or (
+        snapshots and not has_synced_account(db, STEAM, steamid)
+    ):
+        for snapshot in snapshots.values():
+            db.delete(snapshot)
+        snapshots = {}
+
+    # Sem snapshots, a base das diferenças é zero (primeira sincronização)
+    total_achievements = stats.total_achievements if snapshots else 0
+    total_platinums = stats.total_platinums if snapshots else 0
+
+    # Jogos que saíram da biblioteca
+    for appid in list(snapshots):
+        if appid not in owned_appids:
+            snapshot = snapshots.pop(appid)
+            total_achievements -= snapshot.total_achievements  # type: ignore
+            total_platinums -= int(snapshot.is_platinum)
+            db.delete(snapshot)
+
+    changed_games: List[dict] = [game for game in games if _hasChanged(snapshots.get(game["appid"]), game)]
+
+    # Progresso: jogos inalterados já contam como processados
+    total = len(games)
+    processed = total - len(changed_games)
+    if progress:
+        progress(processed, total)
+
+    async def fetchAchievements(game: dict) -> tuple:
+        nonlocal processed
+        # Jogos sem estatísticas são registrados sem conquistas, sem chamada à Steam
+        if not hasAchievementStats(game):
+            result = ({"achievements": []}, [], None)
+        else:
+            # Schema e porcentagens globais vêm dos caches; são usados no banco normalizado
+            result = await asyncio.gather(
+                getPlayerAchievementsAsync(steamid, game["appid"]),
+                getGameAchievementSchemaAsync(game["appid"]),
+                getAchievementRarityIndexAsync(game["appid"])
+            )
+        processed += 1
+        if progress:
+            progress(processed, total)
+        return result
+
+    results = await gather_bounded(changed_games, fetchAchievements, STEAM_MAX_CONCURRENCY)
+
+    for game, (achievements, schema, rarity_index) in zip(changed_games, results):
+        # Falha na chamada: o jogo entra (ou continua) no banco com o tempo de jogo atual, mas os
+        # desbloqueios e o snapshot ficam como estavam, para tentar de novo na próxima sincronização
+        if not achievements:
+            _storePlaytime(db, steamid, game, _storeGameRow(db, game), None)
+            continue
+
+        game_achievements = achievements.get("achievements", [])
+        _storeGame(db, steamid, game, game_achievements, schema, rarity_index)
+        appid = game["appid"]
+        snapshot = snapshots.get(appid)
+        if snapshot is None:
+            snapshot = SteamGameSnapshot(user_id=user.id, steam_id=steamid, appid=appid, total_achievements=0, achieved_achievements=0)
+            db.add(snapshot)
+            snapshots[appid] = snapshot
+
+        was_platinum = snapshot.is_platinum
+        previous_total = snapshot.total_achievements or 0
+
+        snapshot.playtime_forever = game.get("playtime_forever", 0)
+        snapshot.rtime_last_played = game.get("rtime_last_played", 0)
+        snapshot.total_achievements = len(game_achievements)  # type: ignore
+        snapshot.achieved_achievements = len([a for a in game_achievements if a.get("achieved") == 1])  # type: ignore
+
+        total_achievements += snapshot.total_achievements - previous_total  # type: ignore
+        total_platinums += int(snapshot.is_platinum) - int(was_platinum)
+
+    # Jogos inalterados: atualiza apenas o tempo de jogo no banco normalizado
+    user_games = get_user_games(db, STEAM, steamid)
+    for game in games:
+        user_game = user_games.get(str(game["appid"]))
+        if user_game is not None:
+            user_game.playtime_forever = game.get("playtime_forever", 0)  # type: ignore
+            user_game.playtime_2weeks = game.get("playtime_2weeks", 0)  # type: ignore
+            user_game.last_played = _timestamp(game.get("rtime_last_played"))  # type: ignore
+    remove_user_games(db, STEAM, steamid, (user_game.game_id for appid, user_game in user_games.items() if int(appid) in owned_appids))
+
+    total_games = len(games)
+    total_hours = sum(game.get("playtime_forever", 0) for game in games)
+
+    # Jogos recentes (últimos 30 dias - simplificado como jogos com playtime > 0)
+    recent_games = len([game for game in games if game.get("playtime_2weeks", 0) > 0])
+
+    # Média de platinums (porcentagem de jogos platinados)
+    avg_platinums = round((total_platinums / total_games * 100) if total_games > 0 else 0)
+
+    general_stats = {
+        "total_games": total_games,
+        "total_platinums": total_platinums,
+        "recent_games": recent_games,
+        "total_achievements": total_achievements,
+        "total_hours": total_hours,
+        "avg_platinums": avg_platinums
+    }
+
+    # update_general_stats faz o commit dos snapshots junto com as estatísticas
+    update_general_stats(db, stats, **general_stats)
+
+    return {
+        "stats": general_stats,
+        "refetched_games": len(changed_games)
+    }
+
+def steamStatsSyncJob(user_id: int) -> Callable[[Session, Callable[[int, int], None]], dict]:
+    """
+    Cria a função executada pelo worker de jobs para sincronizar as estatísticas Steam de um usuário
+    """
+    def run(db: Session, progress: Callable[[int, int], None]) -> dict:
+        user = db.get(User, user_id)
+        if not user or not user.steam_id:  # type: ignore
+            raise ValueError("Usuário não possui Steam ID configurado")
+        stats = get_general_stats_by_id(db, user.general_stats_id)  # type: ignore
+        if not stats:
+            raise ValueError("Estatísticas gerais não encontradas")
+
+        async def sync() -> dict:
+            try:
+                return await syncSteamGeneralStats(db, user, stats, progress)
+            finally:
+                await upstream.aclose()
+
+        # O worker roda fora do event loop do servidor, então cria o seu próprio
+        return asyncio.run(sync())
+
+    return run
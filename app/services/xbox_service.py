@@ -1,15 +1,40 @@
 import requests
-from app.config import XBOX_API_KEY
+import httpx
+import asyncio
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from sqlalchemy.exc import SQLAlchemyError
+from app.config import (
+    XBOX_API_KEY,
+    XBOX_TITLES_CACHE_TTL,
+    XBOX_TITLES_STALE_TTL,
+    XBOX_TITLES_CACHE_SIZE,
+    XBOX_MAX_CONCURRENCY,
+    XBOX_TITLE_TIMEOUT
+)
+from app.database.database import SessionLocal
+from app.services.identity_service import resolve_cached, IdentityLookupError, XBOX as IDENTITY_XBOX
+from app.services.xbox_snapshot_service import title_counters, snapshot_matches, get_title_snapshots, save_title_snapshot
+from app.utils.cache import StaleWhileRevalidateCache
+from app.utils.pagination import paginate
+from app.utils.concurrency import gather_bounded, iter_bounded
+from app.utils import upstream
 
 BASE_URL = "https://xbl.io/api/v2"
 
+# Lista de títulos (já filtrada por plataforma) por xuid, recarregada em segundo plano quando vence
+_titles_cache = StaleWhileRevalidateCache(
+    maxsize=XBOX_TITLES_CACHE_SIZE,
+    ttl=XBOX_TITLES_CACHE_TTL,
+    stale_ttl=XBOX_TITLES_STALE_TTL
+)
+
 def getPlayerXUID(gamertag: str) -> dict:
     url = f"{BASE_URL}/search/{gamertag}"
     headers = {
         "X-Authorization": XBOX_API_KEY
     }
     try:
-        resp = requests.get(url, headers=headers)
+        resp = upstream.get(url, headers=headers)
         resp.raise_for_status()
         data = resp.json()
         return data.get("people", [])[0] if data.get("people") else {}
@@ -17,13 +42,34 @@ def getPlayerXUID(gamertag: str) -> dict:
         print(f"Erro ao buscar XUID: {e}")
         return {}
 
+def _fetchXUID(gamertag: str) -> Optional[str]:
+    url = f"{BASE_URL}/search/{gamertag}"
+    headers = {
+        "X-Authorization": XBOX_API_KEY
+    }
+    try:
+        resp = upstream.get(url, headers=headers)
+        resp.raise_for_status()
+        data = resp.json()
+    except (requests.RequestException, ValueError) as e:
+        raise IdentityLookupError(f"Erro ao buscar XUID: {e}") from e
+    # Busca sem resultados: a gamertag não existe
+    people = data.get("people") or []
+    return people[0].get("xuid") if people else None
+
+def resolveXUID(gamertag: str) -> Optional[str]:
+    """
+    Resolve a gamertag para o XUID usando o cache de identidades
+    """
+    return resolve_cached(IDENTITY_XBOX, gamertag, _fetchXUID)
+
 def getPlayerAchievements(xuid: str) -> dict:
     url = f"{BASE_URL}/achievements/player/{xuid}"
     headers = {
         "X-Authorization": XBOX_API_KEY
     }
     try:
-        resp = requests.get(url, headers=headers)
+        resp = upstream.get(url, headers=headers)
         resp.raise_for_status()
         data = resp.json()
         return data
@@ -36,13 +82,25 @@ def getPlayerAchievementsByGame(xuid: str, game_id: str) -> dict:
         "X-Authorization": XBOX_API_KEY
     }
     try:
-        resp = requests.get(url, headers=headers)
+        resp = upstream.get(url, headers=headers)
         resp.raise_for_status()
         data = resp.json()
         return data
     except requests.RequestException as e:
         return {}
 
+async def getPlayerAchievementsByGameAsync(xuid: str, game_id: str, timeout: Optional[float] = None) -> dict:
+    """
+    Versão assíncrona de getPlayerAchievementsByGame; erros de rede e HTTP são propagados.
+    O timeout vale para cada tentativa, sem contar a espera pelo limitador de chamadas.
+    """
+    url = f"{BASE_URL}/achievements/player/{xuid}/{game_id}"
+    headers = {
+        "X-Authorization": XBOX_API_KEY
+    }
+    resp = await upstream.aget(url, headers=headers, attempt_timeout=timeout)
+    resp.raise_for_status()
+    return resp.json()
 
 def is_valid_platform_game(devices: list) -> bool:
     """
@@ -58,30 +116,137 @@ def is_valid_platform_game(devices: list) -> bool:
     return any(platform in devices for platform in valid_platforms)
 
 
-def getPlayerGamesWithFullAchievements(xuid: str, page: int = 1, limit: int = 5) -> list:
+def _loadPlayerTitles(xuid: str) -> Optional[List[dict]]:
     jogos_data = getPlayerAchievements(xuid)
     if not jogos_data or "titles" not in jogos_data:
-        return []
-
-    start = (page - 1) * limit
-    end = start + limit
-    jogos_paginados = jogos_data["titles"][start:end]
-
-    jogos_resultado = []
-    for jogo in jogos_paginados:
-        title_id = jogo.get("titleId")
-        if not title_id:
-            continue
-
-        conquistas_data = getPlayerAchievementsByGame(xuid, title_id)
-        achievements = conquistas_data.get("achievements", [])
-
-        jogos_resultado.append({
-            "name": jogo.get("name"),
-            "titleId": title_id,
-            "displayImage": jogo.get("displayImage"),
-            "lastTimePlayed": jogo.get("titleHistory", {}).get("lastTimePlayed"),
-            "achievements": achievements,
-        })
-
-    return jogos_resultado
\ No newline at end of file
+        return None
+    return [jogo for jogo in jogos_data["titles"] if is_valid_platform_game(jogo.get("devices", []))]
+
+def getPlayerTitles(xuid: str) -> Optional[List[dict]]:
+    """
+    Retorna os títulos do usuário (apenas PC, XboxSeries e XboxOne) a partir do snapshot em cache.
+    Retorna None se a lista não pôde ser obtida.
+    """
+    return _titles_cache.get(xuid, lambda: _loadPlayerTitles(xuid))
+
+def findCachedTitle(xuid: str, title_id: str) -> Optional[dict]:
+    """
+    Procura o título no snapshot em cache, sem baixar a lista se ela não estiver em memória
+    """
+    titles = _titles_cache.peek(xuid) or []
+    return next((title for title in titles if str(title.get("titleId")) == str(title_id)), None)
+
+def getPlayerTitlesPage(xuid: str, limit: int, cursor: Optional[str] = None, page: int = 1) -> Tuple[Optional[List[dict]], Optional[str]]:
+    """
+    Retorna uma página de títulos e o cursor da próxima (None na última página).
+    Sem cursor, a página é calculada por page/limit. Levanta ValueError para cursores inválidos.
+    """
+    titles = getPlayerTitles(xuid)
+    if titles is None:
+        return None, None
+    return paginate(titles, limit, cursor, page, key=lambda title: title.get("titleId"))
+
+def _loadStoredAchievements(xuid: str, jogos: List[dict]) -> Dict[str, list]:
+    """
+    Retorna as conquistas guardadas dos títulos cujos contadores (progresso e lastTimePlayed)
+    não mudaram desde a última busca, chaveadas por titleId
+    """
+    by_id = {str(jogo["titleId"]): jogo for jogo in jogos if jogo.get("titleId")}
+    db = SessionLocal()
+    try:
+        snapshots = get_title_snapshots(db, xuid, by_id)
+        return {
+            title_id: snapshot.achievements  # type: ignore
+            for title_id, snapshot in snapshots.items()
+            if snapshot_matches(snapshot, title_counters(by_id[title_id]))
+        }
+    except SQLAlchemyError:
+        return {}
+    finally:
+        db.close()
+
+def _storeAchievements(xuid: str, jogo: dict, achievements: list) -> None:
+    db = SessionLocal()
+    try:
+        save_title_snapshot(db, xuid, str(jogo["titleId"]), title_counters(jogo), achievements)
+    except SQLAlchemyError:
+        # Outra requisição pode ter gravado o mesmo título ao mesmo tempo
+        db.rollback()
+    finally:
+        db.close()
+
+def getTitleAchievements(xuid: str, jogo: dict) -> Optional[list]:
+    """
+    Retorna as conquistas de um título da lista de títulos do usuário, buscando na API apenas
+    se o progresso ou o lastTimePlayed mudaram desde a última busca. Retorna None em caso de falha.
+    """
+    stored = _loadStoredAchievements(xuid, [jogo]).get(str(jogo["titleId"]))
+    if stored is not None:
+        return stored
+
+    conquistas_data = getPlayerAchievementsByGame(xuid, jogo["titleId"])
+    if not conquistas_data:
+        return None
+    achievements = conquistas_data.get("achievements", [])
+    _storeAchievements(xuid, jogo, achievements)
+    return achievements
+
+async def _fetchTitleWithAchievements(xuid: str, jogo: dict, stored: Optional[list] = None) -> dict:
+    """
+    Busca as conquistas de um título com timeout próprio, a menos que as guardadas ainda valham.
+    Em caso de falha o título é retornado sem conquistas e com o campo "error" ("timeout" ou "unavailable").
+    """
+    title_id = jogo.get("titleId")
+    resultado = {
+        "name": jogo.get("name"),
+        "titleId": title_id,
+        "displayImage": jogo.get("displayImage"),
+        "lastTimePlayed": jogo.get("titleHistory", {}).get("lastTimePlayed"),
+        "achievements": [],
+    }
+    if stored is not None:
+        resultado["achievements"] = stored
+        return resultado
+
+    try:
+        conquistas_data = await getPlayerAchievementsByGameAsync(xuid, title_id, XBOX_TITLE_TIMEOUT)  # type: ignore
+        resultado["achievements"] = conquistas_data.get("achievements", [])
+        await asyncio.to_thread(_storeAchievements, xuid, jogo, resultado["achievements"])
+    except httpx.TimeoutException:
+        resultado["error"] = "timeout"
+    except (httpx.HTTPError, ValueError):
+        resultado["error"] = "unavailable"
+    return resultado
+
+async def fetchTitlesWithAchievements(xuid: str, jogos: List[dict]) -> List[dict]:
+    """
+    Busca as conquistas dos títulos em paralelo (até XBOX_MAX_CONCURRENCY por vez), mantendo a ordem.
+    Títulos sem mudança desde a última busca são servidos do banco.
+    """
+    jogos = [jogo for jogo in jogos if jogo.get("titleId")]
+    stored = await asyncio.to_thread(_loadStoredAchievements, xuid, jogos)
+    return await gather_bounded(
+        jogos,
+        lambda jogo: _fetchTitleWithAchievements(xuid, jogo, stored.get(str(jogo["titleId"]))),
+        XBOX_MAX_CONCURRENCY
+    )
+
+async def iterTitlesWithAchievements(xuid: str, jogos: List[dict]) -> AsyncIterator[dict]:
+    """
+    Como fetchTitlesWithAchievements, mas entrega cada título assim que fica pronto
+    """
+    jogos = [jogo for jogo in jogos if jogo.get("titleId")]
+    stored = await asyncio.to_thread(_loadStoredAchievements, xuid, jogos)
+    async for resultado in iter_bounded(
+        jogos,
+        lambda jogo: _fetchTitleWithAchievements(xuid, jogo, stored.get(str(jogo["titleId"]))),
+        XBOX_MAX_CONCURRENCY
+    ):
+        yield resultado
+
+async def getPlayerGamesWithFullAchievementsAsync(xuid: str, page: int = 1, limit: int = 5, cursor: Optional[str] = None) -> Tuple[list, Optional[str]]:
+    jogos_paginados, next_cursor = await asyncio.to_thread(getPlayerTitlesPage, xuid, limit, cursor, page)
+    if not jogos_paginados:
+        return [], None
+
+    return await fetchTitlesWithAchievements(xuid, jogos_paginados), next_cursor
@@ -0,0 +1,45 @@
+from sqlalchemy.orm import Session
+from datetime import datetime
+from typing import Dict, Iterable
+from app.models.xbox_model import XboxTitleSnapshot
+
+def title_counters(title: dict) -> dict:
+    """
+    Contadores do título (lista /achievements/player/{xuid}) que indicam mudança nas conquistas
+    """
+    progress = title.get("achievement") or {}
+    return {
+        "last_time_played": (title.get("titleHistory") or {}).get("lastTimePlayed"),
+        "current_achievements": progress.get("currentAchievements"),
+        "total_achievements": progress.get("totalAchievements"),
+        "current_gamerscore": progress.get("currentGamerscore"),
+    }
+
+def snapshot_matches(snapshot: XboxTitleSnapshot, counters: dict) -> bool:
+    # Sem nenhum contador não há como saber se o título mudou
+    if all(value is None for value in counters.values()):
+        return False
+    return all(getattr(snapshot, key) == value for key, value in counters.items())
+
+def get_title_snapshots(db: Session, xuid: str, title_ids: Iterable[str]) -> Dict[str, XboxTitleSnapshot]:
+    ids = [str(title_id) for title_id in title_ids]
+    if not ids:
+        return {}
+    snapshots = (
+        db.query(XboxTitleSnapshot)
+        .filter(XboxTitleSnapshot.xuid == xuid, XboxTitleSnapshot.title_id.in_(ids))
+        .all()
+    )
+    return {snapshot.title_id: snapshot for snapshot in snapshots}  # type: ignore
+
+def save_title_snapshot(db: Session, xuid: str, title_id: str, counters: dict, achievements: list) -> XboxTitleSnapshot:
+    snapshot = db.get(XboxTitleSnapshot, (xuid, str(title_id)))
+    if snapshot is None:
+        snapshot = XboxTitleSnapshot(xuid=xuid, title_id=str(title_id))
+        db.add(snapshot)
+    for key, value in counters.items():
+        setattr(snapshot, key, value)
+    snapshot.achievements = achievements  # type: ignore
+    snapshot.fetched_at = datetime.utcnow()  # type: ignore
+    db.commit()
+    return snapshot
@@ -0,0 +1,126 @@
+from datetime import datetime
+from sqlalchemy.orm import Session
+from typing import Callable, List, Optional
+from app.models.user_model import User
+from app.services.xbox_service import getPlayerAchievements, getTitleAchievements, is_valid_platform_game
+from app.services.achievement_store_service import (
+    XBOX,
+    get_or_create_game,
+    save_definitions,
+    save_user_game,
+    get_user_games,
+    remove_user_games,
+    get_account_stats
+)
+
+XBOX_ACHIEVEMENT_SYNC_JOB = "xbox_achievement_sync"
+
+def _parseTime(value: Optional[str]) -> Optional[datetime]:
+    """
+    Converte as datas ISO 8601 da API do Xbox (UTC) para datetime sem fuso
+    """
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    # A API usa 0001-01-01 para conquistas sem data de desbloqueio
+    if parsed.year <= 1:
+        return None
+    return parsed.replace(tzinfo=None)
+
+def _storeTitle(db: Session, xuid: str, title: dict, achievements: List[dict]) -> int:
+    """
+    Grava o título, as definições de conquistas (com a raridade informada pelo Xbox) e os desbloqueios.
+    Retorna o id do jogo.
+    """
+    stored_game = get_or_create_game(db, XBOX, str(title["titleId"]), title.get("name"), title.get("displayImage"))
+
+    definitions = []
+    for ach in achievements:
+        if not ach.get("id"):
+            continue
+        icon = next((asset.get("url") for asset in ach.get("mediaAssets", []) if asset.get("url")), None)
+        definitions.append({
+            "api_name": str(ach["id"]),
+            "display_name": ach.get("name"),
+            "description": ach.get("description") or ach.get("lockedDescription"),
+            "icon_url": icon,
+            "icon_locked_url": None,
+            "hidden": bool(ach.get("isSecret")),
+            "global_percentage": (ach.get("rarity") or {}).get("currentPercentage")
+        })
+    stored_definitions = save_definitions(db, stored_game, definitions)
+
+    unlocked = {
+        stored_definitions[str(ach["id"])].id: _parseTime((ach.get("progression") or {}).get("timeUnlocked"))
+        for ach in achievements
+        if ach.get("progressState") == "Achieved" and str(ach.get("id")) in stored_definitions
+    }
+    save_user_game(
+        db, XBOX, xuid, stored_game, unlocked,  # type: ignore
+        last_played=_parseTime(title.get("titleHistory", {}).get("lastTimePlayed"))
+    )
+    return stored_game.id  # type: ignore
+
+def syncXboxAchievements(db: Session, xuid: str, progress: Optional[Callable[[int, int], None]] = None) -> dict:
+    """
+    Sincroniza os títulos e conquistas Xbox da conta no banco normalizado.
+    Apenas títulos novos ou jogados desde a última sincronização têm as conquistas buscadas novamente.
+    """
+    data = getPlayerAchievements(xuid)
+    if not data or "titles" not in data:
+        raise ValueError("Não foi possível obter os títulos do Xbox")
+
+    titles = [
+        title for title in data["titles"]
+        if title.get("titleId") and is_valid_platform_game(title.get("devices", []))
+    ]
+    user_games = get_user_games(db, XBOX, xuid)
+
+    changed_titles = []
+    for title in titles:
+        user_game = user_games.get(str(title["titleId"]))
+        last_played = _parseTime(title.get("titleHistory", {}).get("lastTimePlayed"))
+        if user_game is None or user_game.last_played != last_played:
+            changed_titles.append(title)
+
+    total = len(titles)
+    processed = total - len(changed_titles)
+    if progress:
+        progress(processed, total)
+
+    refetched = 0
+    for title in changed_titles:
+        # Conquistas vêm do snapshot por título quando o progresso não mudou
+        achievements = getTitleAchievements(xuid, title)
+        # Falha na chamada: mantém os dados anteriores para tentar de novo na próxima sincronização
+        if achievements is not None:
+            _storeTitle(db, xuid, title, achievements)
+            refetched += 1
+        processed += 1
+        if progress:
+            progress(processed, total)
+
+    title_ids = {str(title["titleId"]) for title in titles}
+    user_games = get_user_games(db, XBOX, xuid)
+    remove_user_games(db, XBOX, xuid, (user_game.game_id for title_id, user_game in user_games.items() if title_id in title_ids))
+    db.commit()
+
+    return {
+        "stats": get_account_stats(db, XBOX, xuid),
+        "refetched_titles": refetched
+    }
+
+def xboxAchievementSyncJob(user_id: int) -> Callable[[Session, Callable[[int, int], None]], dict]:
+    """
+    Cria a função executada pelo worker de jobs para sincronizar as conquistas Xbox de um usuário
+    """
+    def run(db: Session, progress: Callable[[int, int], None]) -> dict:
+        user = db.get(User, user_id)
+        if not user or not user.xbox_id:  # type: ignore
+            raise ValueError("Usuário não possui Xbox ID configurado")
+        return syncXboxAchievements(db, user.xbox_id, progress)  # type: ignore
+
+    return run
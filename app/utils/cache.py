@@ -0,0 +1,132 @@
+import threading
+import time
+import traceback
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Hashable, Optional
+from app.utils.singleflight import SingleFlight
+
+_MISSING = object()
+
+class TTLCache:
+    """
+    Cache LRU em memória com expiração por TTL, seguro para uso entre threads.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            item = self._data.get(key, _MISSING)
+            if item is _MISSING:
+                return default
+            expires_at, value = item
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def pop_matching(self, predicate) -> int:
+        """
+        Remove todas as entradas cuja chave satisfaz o predicado e retorna quantas foram removidas.
+        """
+        with self._lock:
+            keys = [key for key in self._data if predicate(key)]
+            for key in keys:
+                del self._data[key]
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
+
+# Recarregamentos em segundo plano do StaleWhileRevalidateCache
+_refresh_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="cache-refresh")
+
+class StaleWhileRevalidateCache:
+    """
+    Cache que, depois do TTL, continua servindo o valor antigo por até stale_ttl segundos
+    enquanto uma recarga roda em segundo plano. Sem valor (ou além do stale_ttl), a carga é
+    feita na hora, agrupando chamadas simultâneas para a mesma chave.
+    O loader retorna None em caso de falha; nesse caso nada é guardado.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, stale_ttl: float):
+        self.ttl = ttl
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl + stale_ttl)
+        self._flight = SingleFlight()
+        self._refreshing: set = set()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        entry = self._cache.get(key)
+        if entry is not None:
+            loaded_at, value = entry
+            if time.monotonic() - loaded_at >= self.ttl:
+                self._refresh(key, loader)
+            return value
+        return self._flight.do(key, lambda: self._load(key, loader))
+
+    def _load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        value = loader()
+        if value is not None:
+            self._cache.set(key, (time.monotonic(), value))
+        return value
+
+    def _refresh(self, key: Hashable, loader: Callable[[], Any]) -> None:
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def run() -> None:
+            try:
+                self._flight.do(key, lambda: self._load(key, loader))
+            except Exception:
+                # Falha na recarga: o valor antigo continua valendo até expirar
+                traceback.print_exc()
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        _refresh_executor.submit(run)
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """
+        Guarda um valor obtido por fora do loader (por exemplo, numa consulta em lote)
+        """
+        self._cache.set(key, (time.monotonic(), value))
+
+    def peek(self, key: Hashable) -> Any:
+        """
+        Retorna o valor guardado (mesmo vencido) sem carregar nem recarregar
+        """
+        entry = self._cache.get(key)
+        return entry[1] if entry is not None else None
+
+    def pop(self, key: Hashable) -> None:
+        self._cache.pop(key)
+
+    def clear(self) -> None:
+        self._cache.clear()
@@ -0,0 +1,124 @@
+import zlib
+import brotli
+from app.config import COMPRESSION_MINIMUM_SIZE, GZIP_LEVEL, BROTLI_QUALITY
+
+# Tipos que já são comprimidos e não ganham nada com gzip/brotli
+_SKIP_CONTENT_TYPES = ("image/", "video/", "audio/", "application/zip", "application/gzip")
+
+def _negotiate(accept_encoding: str) -> str | None:
+    """
+    Escolhe a codificação a partir do Accept-Encoding, preferindo brotli a gzip
+    """
+    accepted = set()
+    for part in accept_encoding.split(","):
+        token, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if quality > 0:
+            accepted.add(token.strip().lower())
+    if "br" in accepted:
+        return "br"
+    if "gzip" in accepted or "*" in accepted:
+        return "gzip"
+    return None
+
+class _Compressor:
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=BROTLI_QUALITY)
+        else:
+            self._zlib = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def chunk(self, data: bytes) -> bytes:
+        """
+        Comprime um pedaço e faz flush, para que respostas em streaming cheguem sem atraso
+        """
+        if self.encoding == "br":
+            return self._brotli.process(data) + self._brotli.flush()
+        return self._zlib.compress(data) + self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes = b"") -> bytes:
+        if self.encoding == "br":
+            return self._brotli.process(data) + self._brotli.finish()
+        return self._zlib.compress(data) + self._zlib.flush()
+
+class CompressionMiddleware:
+    """
+    Middleware ASGI que comprime respostas com brotli ou gzip conforme o Accept-Encoding.
+    Respostas pequenas (< COMPRESSION_MINIMUM_SIZE) seguem sem compressão; respostas em
+    streaming (NDJSON) são comprimidas pedaço a pedaço.
+    """
+
+    def __init__(self, app, minimum_size: int = COMPRESSION_MINIMUM_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        headers = dict(scope.get("headers") or [])
+        encoding = _negotiate(headers.get(b"accept-encoding", b"").decode("latin-1"))
+        if not encoding:
+            return await self.app(scope, receive, send)
+
+        start_message = None
+        compressor = None
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start_message, compressor, passthrough
+
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                return await send(message)
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if compressor is None:
+                response_headers = {k.lower(): v for k, v in start_message["headers"]}  # type: ignore
+                content_type = response_headers.get(b"content-type", b"").decode("latin-1")
+                if (
+                    b"content-encoding" in response_headers
+                    or content_type.startswith(_SKIP_CONTENT_TYPES)
+                    or (not more_body and len(body) < self.minimum_size)
+                ):
+                    passthrough = True
+                    await send(start_message)
+                    return await send(message)
+
+                compressor = _Compressor(encoding)
+                new_headers = [
+                    (k, v) for k, v in start_message["headers"]  # type: ignore
+                    if k.lower() not in (b"content-length", b"content-encoding")
+                ]
+                new_headers.append((b"content-encoding", encoding.encode()))
+                vary = response_headers.get(b"vary")
+                new_headers = [(k, v) for k, v in new_headers if k.lower() != b"vary"]
+                new_headers.append((b"vary", vary + b", Accept-Encoding" if vary else b"Accept-Encoding"))
+
+                if not more_body:
+                    compressed = compressor.finish(body)
+                    new_headers.append((b"content-length", str(len(compressed)).encode()))
+                    await send({**start_message, "headers": new_headers})  # type: ignore
+                    return await send({"type": "http.response.body", "body": compressed})
+
+                await send({**start_message, "headers": new_headers})  # type: ignore
+
+            data = compressor.chunk(body) if more_body else compressor.finish(body)
+            await send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+        await self.app(scope, receive, send_wrapper)
+
+        # Respostas sem corpo (ex.: 204) nunca chegam ao primeiro http.response.body
+        if start_message is not None and compressor is None and not passthrough:
+            await send(start_message)
@@ -0,0 +1,47 @@
+import asyncio
+from typing import AsyncIterator, Awaitable, Callable, Iterable, List, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+_END = object()
+
+async def gather_bounded(items: Iterable[T], func: Callable[[T], Awaitable[R]], limit: int) -> List[R]:
+    """
+    Executa func(item) para cada item com no máximo `limit` chamadas simultâneas.
+    Os resultados são retornados na mesma ordem dos itens.
+    """
+    semaphore = asyncio.Semaphore(max(1, limit))
+
+    async def run(item: T) -> R:
+        async with semaphore:
+            return await func(item)
+
+    return await asyncio.gather(*(run(item) for item in items))
+
+async def iter_bounded(items: Iterable[T], func: Callable[[T], Awaitable[R]], limit: int) -> AsyncIterator[R]:
+    """
+    Executa func(item) com no máximo `limit` chamadas simultâneas e entrega cada resultado assim que fica pronto
+    (na ordem de conclusão). Apenas `limit` tarefas existem ao mesmo tempo, então a memória não cresce com a lista.
+    """
+    iterator = iter(items)
+    pending: set = set()
+
+    def schedule() -> None:
+        while len(pending) < max(1, limit):
+            item = next(iterator, _END)
+            if item is _END:
+                break
+            pending.add(asyncio.ensure_future(func(item)))  # type: ignore
+
+    try:
+        schedule()
+        while pending:
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            pending.difference_update(done)
+            schedule()
+            for task in done:
+                yield task.result()
+    finally:
+        for task in pending:
+            task.cancel()
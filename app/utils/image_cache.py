@@ -0,0 +1,124 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+class DiskImageCache:
+    """
+    Cache de imagens em disco endereçado por conteúdo: os bytes ficam em blobs/<sha256> e cada
+    chave (imagem + tamanho) aponta para um blob por um arquivo em keys/. Quando o total de bytes
+    passa de max_bytes, as chaves usadas há mais tempo são removidas (LRU pelo mtime, que sobrevive
+    a reinícios). Blobs iguais são gravados uma única vez.
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._blobs_dir = os.path.join(directory, "blobs")
+        self._keys_dir = os.path.join(directory, "keys")
+        # chave -> (hash, tamanho), da menos para a mais recente
+        self._keys: "OrderedDict[str, Tuple[str, int]]" = OrderedDict()
+        self._refs: Dict[str, int] = {}
+        self._total_bytes = 0
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def _load(self) -> None:
+        os.makedirs(self._blobs_dir, exist_ok=True)
+        os.makedirs(self._keys_dir, exist_ok=True)
+        entries = []
+        for name in os.listdir(self._keys_dir):
+            path = os.path.join(self._keys_dir, name)
+            try:
+                with open(path) as f:
+                    digest = f.read().strip()
+                size = os.path.getsize(os.path.join(self._blobs_dir, digest))
+                entries.append((os.path.getmtime(path), name, digest, size))
+            except OSError:
+                # Chave sem blob (gravação interrompida): descarta
+                self._remove(path)
+        for _, name, digest, size in sorted(entries):
+            self._track(name, digest, size)
+        self._loaded = True
+
+    def _track(self, key: str, digest: str, size: int) -> None:
+        self._keys[key] = (digest, size)
+        if self._refs.get(digest, 0) == 0:
+            self._total_bytes += size
+        self._refs[digest] = self._refs.get(digest, 0) + 1
+
+    def _untrack(self, key: str) -> None:
+        digest, size = self._keys.pop(key)
+        self._refs[digest] -= 1
+        self._remove(os.path.join(self._keys_dir, key))
+        if self._refs[digest] == 0:
+            del self._refs[digest]
+            self._total_bytes -= size
+            self._remove(os.path.join(self._blobs_dir, digest))
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def get(self, key: str) -> Optional[Tuple[bytes, str]]:
+        """
+        Retorna (bytes, hash do conteúdo) ou None
+        """
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            entry = self._keys.get(key)
+            if entry is None:
+                return None
+            self._keys.move_to_end(key)
+            digest = entry[0]
+            try:
+                os.utime(os.path.join(self._keys_dir, key))
+            except OSError:
+                pass
+
+        # A leitura fica fora do lock; os blobs são gravados por rename, nunca pela metade
+        try:
+            with open(os.path.join(self._blobs_dir, digest), "rb") as f:
+                return f.read(), digest
+        except OSError:
+            with self._lock:
+                # Só descarta se a chave ainda aponta para o blob que sumiu
+                if self._keys.get(key, (None,))[0] == digest:
+                    self._untrack(key)
+            return None
+
+    def set(self, key: str, data: bytes) -> str:
+        """
+        Grava os bytes da chave e retorna o hash do conteúdo (usado como ETag)
+        """
+        digest = hashlib.sha256(data).hexdigest()
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            if key in self._keys:
+                self._untrack(key)
+
+            blob_path = os.path.join(self._blobs_dir, digest)
+            if digest not in self._refs:
+                # Grava em arquivo temporário e renomeia para nunca deixar um blob pela metade
+                tmp_path = f"{blob_path}.{threading.get_ident()}.tmp"
+                with open(tmp_path, "wb") as f:
+                    f.write(data)
+                os.replace(tmp_path, blob_path)
+            with open(os.path.join(self._keys_dir, key), "w") as f:
+                f.write(digest)
+            self._track(key, digest, len(data))
+
+            while self._total_bytes > self.max_bytes and len(self._keys) > 1:
+                oldest = next(iter(self._keys))
+                self._untrack(oldest)
+        return digest
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"keys": len(self._keys), "blobs": len(self._refs), "bytes": self._total_bytes, "max_bytes": self.max_bytes}
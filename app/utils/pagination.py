@@ -0,0 +1,56 @@
+import base64
+import orjson
+from typing import Callable, Hashable, List, Optional, Sequence, Tuple, TypeVar
+
+T = TypeVar("T")
+
+def encode_cursor(position: dict) -> str:
+    """
+    Codifica a posição da página em um cursor opaco (base64 url-safe, sem padding)
+    """
+    return base64.urlsafe_b64encode(orjson.dumps(position)).rstrip(b"=").decode("ascii")
+
+def decode_cursor(cursor: str) -> dict:
+    """
+    Decodifica um cursor gerado por encode_cursor; levanta ValueError se for inválido
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        position = orjson.loads(raw)
+    except (ValueError, orjson.JSONDecodeError) as e:
+        raise ValueError("Cursor inválido") from e
+    if not isinstance(position, dict):
+        raise ValueError("Cursor inválido")
+    return position
+
+def paginate(
+    items: Sequence[T],
+    limit: int,
+    cursor: Optional[str] = None,
+    page: int = 1,
+    key: Callable[[T], Hashable] = lambda item: None
+) -> Tuple[List[T], Optional[str]]:
+    """
+    Retorna uma página da lista e o cursor da próxima (None na última página).
+    Sem cursor, a página é calculada por page/limit. O cursor guarda o deslocamento e a chave
+    do item de referência: se a lista mudou desde que ele foi gerado, a página continua a partir
+    desse item. Levanta ValueError para cursores inválidos.
+    """
+    if cursor:
+        position = decode_cursor(cursor)
+        try:
+            start = int(position.get("o", 0))
+        except (TypeError, ValueError) as e:
+            raise ValueError("Cursor inválido") from e
+        anchor = position.get("t")
+        if anchor is not None and not (0 <= start < len(items) and key(items[start]) == anchor):
+            start = next((i for i, item in enumerate(items) if key(item) == anchor), start)
+    else:
+        start = (page - 1) * limit
+    start = max(start, 0)
+    end = start + limit
+
+    next_cursor = None
+    if end < len(items):
+        next_cursor = encode_cursor({"o": end, "t": key(items[end])})
+    return list(items[start:end]), next_cursor
@@ -0,0 +1,251 @@
+# Limitador de chamadas às APIs externas: token bucket por chave de API, contador diário
+# persistido no banco e classes de prioridade (interativa x segundo plano).
+import asyncio
+import atexit
+import contextvars
+import threading
+import time
+from datetime import date, datetime
+from typing import Dict, Optional
+from sqlalchemy.exc import SQLAlchemyError
+from app.database.database import SessionLocal
+from app.services.quota_service import get_usage, add_usage
+from app.config import (
+    STEAM_RATE_PER_SECOND,
+    STEAM_RATE_BURST,
+    STEAM_DAILY_QUOTA,
+    XBOX_RATE_PER_SECOND,
+    XBOX_RATE_BURST,
+    XBOX_DAILY_QUOTA,
+    IGDB_RATE_PER_SECOND,
+    IGDB_RATE_BURST,
+    IGDB_DAILY_QUOTA,
+    RATE_LIMIT_BACKGROUND_RESERVE,
+    RATE_LIMIT_BACKGROUND_QUOTA,
+    QUOTA_FLUSH_INTERVAL
+)
+
+INTERACTIVE = "interactive"
+BACKGROUND = "background"
+
+# Prioridade das chamadas feitas no contexto atual; os jobs em segundo plano usam BACKGROUND
+request_priority: contextvars.ContextVar[str] = contextvars.ContextVar("request_priority", default=INTERACTIVE)
+
+class QuotaExceededError(Exception):
+    def __init__(self, api: str, used: int, limit: int):
+        self.api = api
+        self.used = used
+        self.limit = limit
+        super().__init__(f"Cota diária da API {api} esgotada ({used}/{limit})")
+
+class TokenBucket:
+    """
+    Token bucket seguro entre threads. Chamadas em segundo plano só consomem tokens acima da
+    reserva, deixando uma parte da capacidade sempre disponível para chamadas interativas.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self, reserve: float = 0.0) -> float:
+        """
+        Consome um token e retorna 0, ou retorna quantos segundos esperar antes de tentar de novo
+        """
+        with self._lock:
+            self._refill()
+            if self.tokens - 1 >= reserve:
+                self.tokens -= 1
+                return 0.0
+            return (reserve + 1 - self.tokens) / self.rate
+
+    def available(self) -> float:
+        with self._lock:
+            self._refill()
+            return self.tokens
+
+class DailyQuota:
+    """
+    Contador diário (UTC) de chamadas. Mantém o total em memória e grava as diferenças
+    no banco periodicamente, relendo o total para incluir as chamadas de outros processos.
+    """
+
+    def __init__(self, api: str, limit: int):
+        self.api = api
+        self.limit = limit
+        self._day: Optional[date] = None
+        self._base = 0
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _today() -> date:
+        return datetime.utcnow().date()
+
+    def _loadUsage(self, day: date) -> int:
+        db = SessionLocal()
+        try:
+            return get_usage(db, self.api, day)
+        except SQLAlchemyError:
+            return 0
+        finally:
+            db.close()
+
+    def _addUsage(self, day: date, delta: int) -> Optional[int]:
+        """
+        Soma delta ao contador do dia no banco e retorna o novo total, ou None em caso de falha
+        """
+        db = SessionLocal()
+        try:
+            return add_usage(db, self.api, day, delta)
+        except SQLAlchemyError:
+            db.rollback()
+            return None
+        finally:
+            db.close()
+
+    def needs_rollover(self) -> bool:
+        return self._day != self._today()
+
+    def rollover(self) -> None:
+        """
+        Troca para o dia atual. O total do novo dia é lido do banco fora do lock, e as chamadas
+        ainda pendentes do dia anterior são gravadas nele antes de serem descartadas.
+        """
+        today = self._today()
+        if self._day == today:
+            return
+        base = self._loadUsage(today)
+        with self._lock:
+            if self._day == today:
+                return
+            stale_day, stale = self._day, self._pending
+            self._day, self._base, self._pending = today, base, 0
+        if stale_day is not None and stale:
+            self._addUsage(stale_day, stale)
+
+    def consume(self, priority: str) -> None:
+        self.rollover()
+        with self._lock:
+            used = self._base + self._pending
+            if self.limit:
+                limit = self.limit if priority == INTERACTIVE else int(self.limit * RATE_LIMIT_BACKGROUND_QUOTA)
+                if used >= limit:
+                    raise QuotaExceededError(self.api, used, limit)
+            self._pending += 1
+
+    def flush(self) -> None:
+        with self._lock:
+            if not self._pending or self._day is None:
+                return
+            day, delta = self._day, self._pending
+            self._pending = 0
+            self._base += delta
+
+        total = self._addUsage(day, delta)
+        with self._lock:
+            if self._day != day:
+                return
+            if total is None:
+                self._base -= delta
+                self._pending += delta
+            else:
+                self._base = total
+
+    def used(self) -> int:
+        self.rollover()
+        with self._lock:
+            return self._base + self._pending
+
+class ApiLimiter:
+    def __init__(self, name: str, rate: float, burst: float, daily_limit: int):
+        self.name = name
+        self.bucket = TokenBucket(rate, burst)
+        self.quota = DailyQuota(name, daily_limit)
+
+    def _reserve(self, priority: str) -> float:
+        return self.bucket.capacity * RATE_LIMIT_BACKGROUND_RESERVE if priority == BACKGROUND else 0.0
+
+    def acquire(self) -> None:
+        priority = request_priority.get()
+        self.quota.consume(priority)
+        reserve = self._reserve(priority)
+        while (wait := self.bucket.try_acquire(reserve)) > 0:
+            time.sleep(wait)
+
+    async def aacquire(self) -> None:
+        priority = request_priority.get()
+        # A virada do dia consulta o banco; fora do event loop
+        if self.quota.needs_rollover():
+            await asyncio.to_thread(self.quota.rollover)
+        self.quota.consume(priority)
+        reserve = self._reserve(priority)
+        while (wait := self.bucket.try_acquire(reserve)) > 0:
+            await asyncio.sleep(wait)
+
+    def usage(self) -> dict:
+        used = self.quota.used()
+        return {
+            "used_today": used,
+            "daily_limit": self.quota.limit or None,
+            "remaining_today": max(self.quota.limit - used, 0) if self.quota.limit else None,
+            "rate_per_second": self.bucket.rate,
+            "burst": self.bucket.capacity,
+            "tokens_available": round(self.bucket.available(), 2)
+        }
+
+# Um limitador por chave de API, identificado pelo host chamado
+_limiters: Dict[str, ApiLimiter] = {
+    "api.steampowered.com": ApiLimiter("steam", STEAM_RATE_PER_SECOND, STEAM_RATE_BURST, STEAM_DAILY_QUOTA),
+    "xbl.io": ApiLimiter("xbox", XBOX_RATE_PER_SECOND, XBOX_RATE_BURST, XBOX_DAILY_QUOTA),
+    "api.igdb.com": ApiLimiter("igdb", IGDB_RATE_PER_SECOND, IGDB_RATE_BURST, IGDB_DAILY_QUOTA),
+}
+
+_flusher_started = False
+_flusher_lock = threading.Lock()
+
+def flush_all() -> None:
+    for limiter in _limiters.values():
+        limiter.quota.flush()
+
+def _flushLoop() -> None:
+    while True:
+        time.sleep(QUOTA_FLUSH_INTERVAL)
+        flush_all()
+
+def _ensureFlusher() -> None:
+    global _flusher_started
+    if _flusher_started:
+        return
+    with _flusher_lock:
+        if not _flusher_started:
+            threading.Thread(target=_flushLoop, name="quota-flush", daemon=True).start()
+            atexit.register(flush_all)
+            _flusher_started = True
+
+def acquire(host: str) -> None:
+    """
+    Aguarda um token para o host informado e contabiliza a chamada na cota diária.
+    Hosts sem limitador configurado passam direto.
+    """
+    limiter = _limiters.get(host)
+    if limiter:
+        _ensureFlusher()
+        limiter.acquire()
+
+async def aacquire(host: str) -> None:
+    limiter = _limiters.get(host)
+    if limiter:
+        _ensureFlusher()
+        await limiter.aacquire()
+
+def usage() -> dict:
+    return {limiter.name: limiter.usage() for limiter in _limiters.values()}
@@ -0,0 +1,60 @@
+import contextvars
+from typing import Any, AsyncIterable, Iterable, Union
+from urllib.parse import parse_qs
+import orjson
+from fastapi.responses import JSONResponse, StreamingResponse
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+# Indentação opcional da resposta, ligada por ?pretty=1 (PrettyJSONMiddleware)
+pretty_json: contextvars.ContextVar[bool] = contextvars.ContextVar("pretty_json", default=False)
+
+_ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+class FastJSONResponse(JSONResponse):
+    """
+    Resposta JSON padrão da API, serializada com orjson (UTF-8, sem indentação por padrão).
+    """
+
+    def render(self, content: Any) -> bytes:
+        option = _ORJSON_OPTIONS | orjson.OPT_INDENT_2 if pretty_json.get() else _ORJSON_OPTIONS
+        return orjson.dumps(content, option=option)
+
+class PrettyJSONMiddleware:
+    """
+    Middleware ASGI que liga a indentação das respostas JSON quando a query tem pretty=1.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+        pretty = query.get("pretty", ["0"])[-1].lower() in ("1", "true", "yes")
+        token = pretty_json.set(pretty)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            pretty_json.reset(token)
+
+def _ndjsonLine(item: Any) -> bytes:
+    return orjson.dumps(item, option=_ORJSON_OPTIONS) + b"\n"
+
+def ndjson_response(items: Union[Iterable[Any], AsyncIterable[Any]]) -> StreamingResponse:
+    """
+    Envia cada item como uma linha JSON (NDJSON) assim que ele é produzido.
+    Aceita iteráveis síncronos (executados no threadpool) e assíncronos.
+    """
+    if hasattr(items, "__aiter__"):
+        async def generate_async():
+            async for item in items:  # type: ignore
+                yield _ndjsonLine(item)
+        return StreamingResponse(generate_async(), media_type=NDJSON_MEDIA_TYPE)
+
+    def generate():
+        for item in items:  # type: ignore
+            yield _ndjsonLine(item)
+    return StreamingResponse(generate(), media_type=NDJSON_MEDIA_TYPE)
@@ -0,0 +1,92 @@
+import re
+import threading
+import unicodedata
+from collections import Counter
+from typing import Any, Dict, Hashable, List, Set, Tuple
+
+def normalize_text(text: str) -> str:
+    """
+    Minúsculas, sem acentos e com pontuação trocada por espaço
+    """
+    text = unicodedata.normalize("NFKD", text or "")
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    return " ".join(re.sub(r"[^0-9a-z]+", " ", text.lower()).split())
+
+def _trigrams(normalized: str, partial: bool = False) -> Set[str]:
+    # Espaço nas pontas para que começos e fins de palavra também virem trigramas. Na busca
+    # (partial) a última palavra pode estar incompleta, então o fim dela não conta.
+    padded = f" {normalized}" if partial else f" {normalized} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class SearchIndex:
+    """
+    Índice em memória de nomes por trigramas e prefixos de palavras, seguro para uso entre threads.
+    Cada entrada guarda um payload arbitrário, devolvido junto com a pontuação da busca (0 a 1).
+    """
+
+    def __init__(self):
+        self._entries: Dict[Hashable, Tuple[str, Any]] = {}
+        self._trigrams: Dict[str, Set[Hashable]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def get(self, key: Hashable) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry[1] if entry is not None else None
+
+    def add(self, key: Hashable, name: str, payload: Any) -> None:
+        normalized = normalize_text(name)
+        if not normalized:
+            return
+        with self._lock:
+            previous = self._entries.get(key)
+            if previous is not None and previous[0] != normalized:
+                self._discard(key, previous[0])
+            self._entries[key] = (normalized, payload)
+            for trigram in _trigrams(normalized):
+                self._trigrams.setdefault(trigram, set()).add(key)
+
+    def _discard(self, key: Hashable, normalized: str) -> None:
+        for trigram in _trigrams(normalized):
+            keys = self._trigrams.get(trigram)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._trigrams[trigram]
+
+    def search(self, query: str, limit: int = 50) -> List[Tuple[float, Any]]:
+        """
+        Retorna (pontuação, payload) das melhores entradas. A pontuação é a fração dos trigramas
+        da busca presentes no nome, com bônus quando o nome (ou uma palavra dele) começa pela busca.
+        """
+        normalized = normalize_text(query)
+        if not normalized:
+            return []
+        query_trigrams = _trigrams(normalized, partial=True)
+
+        with self._lock:
+            hits: Counter = Counter()
+            for trigram in query_trigrams:
+                hits.update(self._trigrams.get(trigram, ()))
+            candidates = [(key, count, self._entries[key]) for key, count in hits.items()]
+
+        results = []
+        for key, count, (name, payload) in candidates:
+            score = count / len(query_trigrams)
+            if name.startswith(normalized):
+                score += 0.5
+            elif f" {normalized}" in f" {name}":
+                score += 0.25
+            # Nomes curtos primeiro entre os empatados: "Hades" antes de "Hades II: Edição de Colecionador"
+            results.append((min(score / 1.5, 1.0), -len(name), payload))
+
+        results.sort(key=lambda item: (item[0], item[1]), reverse=True)
+        return [(score, payload) for score, _, payload in results[:limit]]
@@ -0,0 +1,312 @@
+# Cliente HTTP compartilhado para as APIs externas (Steam, Xbox, IGDB).
+# Mantém um pool de conexões keep-alive por host (requests para chamadas síncronas,
+# httpx para assíncronas), aplica timeouts de conexão/leitura, repete chamadas que
+# falham com 429/5xx usando backoff exponencial com jitter e expõe contadores de uso.
+import asyncio
+import random
+import threading
+import time
+import weakref
+from typing import Awaitable, Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+from app.utils import rate_limiter
+from app.utils.singleflight import SingleFlight
+from app.config import (
+    UPSTREAM_CONNECT_TIMEOUT,
+    UPSTREAM_READ_TIMEOUT,
+    UPSTREAM_POOL_SIZE,
+    UPSTREAM_MAX_RETRIES,
+    UPSTREAM_BACKOFF_BASE,
+    UPSTREAM_BACKOFF_MAX
+)
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+class _HostCounters:
+    def __init__(self):
+        self.requests = 0
+        self.retries = 0
+        self.failures = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def as_dict(self) -> dict:
+        return {
+            "requests": self.requests,
+            "retries": self.retries,
+            "failures": self.failures,
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight
+        }
+
+_counters: Dict[str, _HostCounters] = {}
+_counters_lock = threading.Lock()
+
+def _count(host: str, field: str, delta: int = 1) -> None:
+    with _counters_lock:
+        counters = _counters.setdefault(host, _HostCounters())
+        setattr(counters, field, getattr(counters, field) + delta)
+        counters.max_in_flight = max(counters.max_in_flight, counters.in_flight)
+
+def _backoffDelay(attempt: int, retry_after: Optional[str]) -> float:
+    """
+    Backoff exponencial com jitter ("full jitter"), respeitando Retry-After quando informado
+    """
+    if retry_after and retry_after.isdigit():
+        return min(float(retry_after), UPSTREAM_BACKOFF_MAX)
+    return random.uniform(0, min(UPSTREAM_BACKOFF_MAX, UPSTREAM_BACKOFF_BASE * (2 ** attempt)))
+
+# Requisições idênticas em andamento (mesmo método, URL, params, headers e corpo) são feitas uma
+# única vez e a resposta é compartilhada; cada chamador faz o próprio .json(), sem objetos em comum.
+# Chamadores síncronos e assíncronos entram no mesmo voo: a resposta (ou o erro de rede) do líder
+# é convertida para o tipo do cliente de quem espera (requests x httpx)
+_inflight = SingleFlight()
+
+def _freeze(value):
+    if isinstance(value, dict):
+        return tuple(sorted((str(k), str(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+def _requestKey(method: str, url: str, kwargs: dict):
+    key = (
+        method.upper(),
+        url,
+        _freeze(kwargs.get("params")),
+        _freeze(kwargs.get("headers")),
+        _freeze(kwargs.get("data"))
+    )
+    try:
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+# O corpo já vem descompactado, então os headers de codificação e tamanho não valem mais
+_BODY_HEADERS = {"content-encoding", "content-length", "transfer-encoding"}
+
+def _bodyHeaders(headers) -> list:
+    return [(name, value) for name, value in headers.items() if name.lower() not in _BODY_HEADERS]
+
+def _asRequestsResponse(resp) -> requests.Response:
+    if isinstance(resp, requests.Response):
+        return resp
+    converted = requests.Response()
+    converted.status_code = resp.status_code
+    converted.reason = resp.reason_phrase
+    converted.url = str(resp.url)
+    converted.headers = CaseInsensitiveDict(_bodyHeaders(resp.headers))
+    converted._content = resp.content
+    converted.encoding = resp.encoding
+    return converted
+
+def _asHttpxResponse(resp, method: str, url: str) -> httpx.Response:
+    if isinstance(resp, httpx.Response):
+        return resp
+    return httpx.Response(
+        resp.status_code,
+        headers=_bodyHeaders(resp.headers),
+        content=resp.content,
+        request=httpx.Request(method, resp.url or url)
+    )
+
+def _asRequestsError(error: BaseException) -> BaseException:
+    if isinstance(error, httpx.TimeoutException):
+        return requests.Timeout(str(error))
+    if isinstance(error, httpx.TransportError):
+        return requests.ConnectionError(str(error))
+    return error
+
+def _asHttpxError(error: BaseException) -> BaseException:
+    if isinstance(error, requests.Timeout):
+        return httpx.TimeoutException(str(error))
+    if isinstance(error, requests.RequestException):
+        return httpx.TransportError(str(error))
+    return error
+
+# --- Cliente síncrono (requests) ---
+
+_session = requests.Session()
+# HTTPAdapter mantém um pool de conexões por host; as repetições são feitas por request()
+_adapter = HTTPAdapter(pool_connections=16, pool_maxsize=UPSTREAM_POOL_SIZE, max_retries=0, pool_block=False)
+_session.mount("https://", _adapter)
+_session.mount("http://", _adapter)
+
+def request(method: str, url: str, retry: bool = True, coalesce: bool = True, **kwargs) -> requests.Response:
+    """
+    Executa uma requisição síncrona pelo pool compartilhado, respeitando o limitador da API.
+    Levanta requests.RequestException em falhas de rede depois de esgotar as tentativas;
+    respostas com erro HTTP são retornadas para o chamador decidir (raise_for_status).
+    """
+    key = _requestKey(method, url, kwargs) if coalesce else None
+    if key is None:
+        return _send(method, url, retry, **kwargs)
+    try:
+        return _asRequestsResponse(_inflight.do(key, lambda: _send(method, url, retry, **kwargs)))
+    except (httpx.TransportError, requests.RequestException) as e:
+        error = _asRequestsError(e)
+        if error is e:
+            raise
+        raise error from e
+
+def _send(method: str, url: str, retry: bool, **kwargs) -> requests.Response:
+    host = urlsplit(url).netloc
+    kwargs.setdefault("timeout", (UPSTREAM_CONNECT_TIMEOUT, UPSTREAM_READ_TIMEOUT))
+    attempts = UPSTREAM_MAX_RETRIES + 1 if retry else 1
+
+    for attempt in range(attempts):
+        last_attempt = attempt == attempts - 1
+        rate_limiter.acquire(host)
+        _count(host, "requests")
+        _count(host, "in_flight")
+        try:
+            resp = _session.request(method, url, **kwargs)
+        except (requests.ConnectionError, requests.Timeout):
+            _count(host, "failures")
+            if last_attempt:
+                raise
+            _count(host, "retries")
+            time.sleep(_backoffDelay(attempt, None))
+            continue
+        finally:
+            _count(host, "in_flight", -1)
+
+        if resp.status_code in RETRY_STATUSES and not last_attempt:
+            _count(host, "retries")
+            delay = _backoffDelay(attempt, resp.headers.get("Retry-After"))
+            resp.close()
+            time.sleep(delay)
+            continue
+        if resp.status_code >= 400:
+            _count(host, "failures")
+        return resp
+
+    raise RuntimeError("unreachable")
+
+def get(url: str, **kwargs) -> requests.Response:
+    return request("GET", url, **kwargs)
+
+def post(url: str, **kwargs) -> requests.Response:
+    return request("POST", url, **kwargs)
+
+# --- Cliente assíncrono (httpx) ---
+
+# Um AsyncClient por (event loop, host): cada host tem o seu próprio pool e limite de conexões
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, httpx.AsyncClient]]" = weakref.WeakKeyDictionary()
+
+def _getAsyncClient(host: str) -> httpx.AsyncClient:
+    clients = _async_clients.setdefault(asyncio.get_running_loop(), {})
+    client = clients.get(host)
+    if client is None:
+        client = httpx.AsyncClient(
+            timeout=httpx.Timeout(UPSTREAM_READ_TIMEOUT, connect=UPSTREAM_CONNECT_TIMEOUT, pool=None),
+            limits=httpx.Limits(max_connections=UPSTREAM_POOL_SIZE, max_keepalive_connections=UPSTREAM_POOL_SIZE)
+        )
+        clients[host] = client
+    return client
+
+async def arequest(
+    method: str,
+    url: str,
+    retry: bool = True,
+    coalesce: bool = True,
+    attempt_timeout: Optional[float] = None,
+    **kwargs
+) -> httpx.Response:
+    """
+    Versão assíncrona de request(). Levanta httpx.HTTPError em falhas de rede depois de esgotar as tentativas.
+    Ambas levantam rate_limiter.QuotaExceededError quando a cota diária da API acabou.
+    attempt_timeout limita o tempo total de cada tentativa (httpx.TimeoutException), contado só depois
+    de obtido o token do limitador: a espera na fila da API não consome o prazo.
+    """
+    key = _requestKey(method, url, kwargs) if coalesce else None
+    if key is None:
+        return await _asend(method, url, retry, attempt_timeout, **kwargs)
+    try:
+        return _asHttpxResponse(await _inflight.ado(key, lambda: _asend(method, url, retry, attempt_timeout, **kwargs)), method, url)
+    except (httpx.TransportError, requests.RequestException) as e:
+        error = _asHttpxError(e)
+        if error is e:
+            raise
+        raise error from e
+
+async def _timed(method: str, url: str, attempt: Awaitable[httpx.Response], timeout: Optional[float]) -> httpx.Response:
+    if timeout is None:
+        return await attempt
+    try:
+        return await asyncio.wait_for(attempt, timeout)
+    except asyncio.TimeoutError as e:
+        raise httpx.TimeoutException(f"Sem resposta em {timeout}s", request=httpx.Request(method, url)) from e
+
+async def _asend(method: str, url: str, retry: bool, attempt_timeout: Optional[float] = None, **kwargs) -> httpx.Response:
+    host = urlsplit(url).netloc
+    client = _getAsyncClient(host)
+    attempts = UPSTREAM_MAX_RETRIES + 1 if retry else 1
+
+    for attempt in range(attempts):
+        last_attempt = attempt == attempts - 1
+        await rate_limiter.aacquire(host)
+        _count(host, "requests")
+        _count(host, "in_flight")
+        try:
+            resp = await _timed(method, url, client.request(method, url, **kwargs), attempt_timeout)
+        except httpx.TransportError:
+            _count(host, "failures")
+            if last_attempt:
+                raise
+            _count(host, "retries")
+            await asyncio.sleep(_backoffDelay(attempt, None))
+            continue
+        finally:
+            _count(host, "in_flight", -1)
+
+        if resp.status_code in RETRY_STATUSES and not last_attempt:
+            _count(host, "retries")
+            await asyncio.sleep(_backoffDelay(attempt, resp.headers.get("Retry-After")))
+            continue
+        if resp.status_code >= 400:
+            _count(host, "failures")
+        return resp
+
+    raise RuntimeError("unreachable")
+
+async def aget(url: str, **kwargs) -> httpx.Response:
+    return await arequest("GET", url, **kwargs)
+
+async def apost(url: str, **kwargs) -> httpx.Response:
+    return await arequest("POST", url, **kwargs)
+
+async def aclose() -> None:
+    """
+    Fecha os clientes assíncronos do event loop atual (usado por loops de vida curta, como os jobs)
+    """
+    clients = _async_clients.pop(asyncio.get_running_loop(), {})
+    for client in clients.values():
+        await client.aclose()
+
+# --- Métricas ---
+
+def pool_stats() -> dict:
+    """
+    Contadores de uso por host e, para o pool síncrono, quantas conexões foram abertas
+    (handshakes TCP+TLS) em relação ao número de requisições atendidas.
+    """
+    with _counters_lock:
+        hosts = {host: counters.as_dict() for host, counters in _counters.items()}
+
+    for key, pool in list(_adapter.poolmanager.pools._container.items()):
+        host = key.key_host if not key.key_port or key.key_port in (80, 443) else f"{key.key_host}:{key.key_port}"
+        entry = hosts.setdefault(host, _HostCounters().as_dict())
+        entry["sync_pool"] = {
+            "connections_opened": pool.num_connections,
+            "requests_served": pool.num_requests
+        }
+
+    return {"hosts": hosts}
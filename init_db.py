@@ -1,5 +1,6 @@
 from app.database.database import Base, engine
 from app.models.user_model import User
+from app.models import steam_model, job_model, api_usage_model, achievement_model, identity_model, xbox_model, igdb_model
 
 # Criar todas as tabelas
 Base.metadata.create_all(bind=engine)
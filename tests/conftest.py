@@ -0,0 +1,6 @@
+import os
+import tempfile
+
+# A configuração é lida na importação dos módulos do app: o ambiente de teste vem antes
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'test.db')}")
+os.environ.setdefault("IGDB_ACCESS_TOKEN", "test")
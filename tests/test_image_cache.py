@@ -0,0 +1,133 @@
+import io
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from PIL import Image
+
+from app.utils.image_cache import DiskImageCache
+
+def _jpeg(width: int, height: int, color) -> bytes:
+    output = io.BytesIO()
+    Image.new("RGB", (width, height), color).save(output, format="JPEG")
+    return output.getvalue()
+
+class _Origin(BaseHTTPRequestHandler):
+    """
+    Origem local no lugar de images.igdb.com: t_1080p responde 1920x1080, os demais tamanhos 264x374
+    """
+    hits: list = []
+
+    def do_GET(self):
+        self.hits.append(self.path)
+        if "missing" in self.path:
+            self.send_response(404)
+            self.end_headers()
+            return
+        data = _jpeg(1920, 1080, "red") if "t_1080p" in self.path else _jpeg(264, 374, "blue")
+        self.send_response(200)
+        self.send_header("Content-Type", "image/jpeg")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture(scope="module")
+def origin():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Origin)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}/upload"
+    server.shutdown()
+
+@pytest.fixture(scope="module")
+def client(origin, tmp_path_factory):
+    from fastapi.testclient import TestClient
+    from app.main import app
+    from app.services import image_service
+
+    # Origem local e um diretório de cache só deste módulo
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(image_service, "IMAGE_ORIGIN_URL", origin)
+        patch.setattr(image_service, "_image_cache", DiskImageCache(str(tmp_path_factory.mktemp("image_cache")), 10_000_000))
+        yield TestClient(app)
+
+def test_miss_then_hit(client):
+    _Origin.hits.clear()
+    first = client.get("/images/abc123/cover_big")
+    second = client.get("/images/abc123/cover_big")
+
+    assert first.status_code == second.status_code == 200
+    assert first.headers["content-type"] == "image/jpeg"
+    assert first.content == second.content
+    assert len(_Origin.hits) == 1
+
+def test_etag_not_modified(client):
+    response = client.get("/images/etag1/cover_big")
+    etag = response.headers["etag"]
+
+    cached = client.get("/images/etag1/cover_big", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+
+def test_thumbnail_resized_from_source(client):
+    _Origin.hits.clear()
+    response = client.get("/images/thumb1/w180")
+
+    assert response.status_code == 200
+    assert Image.open(io.BytesIO(response.content)).size == (180, 101)
+    assert [path for path in _Origin.hits if "t_1080p" in path] == _Origin.hits
+
+    client.get("/images/thumb1/w180")
+    assert len(_Origin.hits) == 1
+
+def test_invalid_and_missing_images(client):
+    assert client.get("/images/missing1/cover_big").status_code == 404
+    assert client.get("/images/abc123/w181").status_code == 404
+    assert client.get("/images/ABC!/cover_big").status_code == 404
+
+def test_lru_eviction(tmp_path):
+    cache = DiskImageCache(str(tmp_path), max_bytes=250)
+    cache.set("a", b"a" * 100)
+    cache.set("b", b"b" * 100)
+    # "a" passa a ser a mais recente; "b" é a primeira a sair
+    assert cache.get("a") is not None
+    cache.set("c", b"c" * 100)
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+    assert cache.stats()["bytes"] == 200
+    assert len(os.listdir(tmp_path / "blobs")) == 2
+
+    # Depois de um reinício o índice é reconstruído do disco
+    reloaded = DiskImageCache(str(tmp_path), max_bytes=250)
+    assert reloaded.get("a")[0] == b"a" * 100
+
+def test_identical_blobs_stored_once(tmp_path):
+    cache = DiskImageCache(str(tmp_path), max_bytes=1000)
+    first = cache.set("x", b"same")
+    second = cache.set("y", b"same")
+
+    assert first == second
+    assert cache.stats() == {"keys": 2, "blobs": 1, "bytes": 4, "max_bytes": 1000}
+
+def test_missing_blob_is_dropped(tmp_path):
+    cache = DiskImageCache(str(tmp_path), max_bytes=1000)
+    digest = cache.set("x", b"data")
+    os.remove(tmp_path / "blobs" / digest)
+
+    assert cache.get("x") is None
+    assert cache.stats()["keys"] == 0
+
+def test_admin_image_cache_stats(client, monkeypatch):
+    from app.routes import admin_routes
+    monkeypatch.setattr(admin_routes, "ADMIN_TOKEN", "secret")
+    client.get("/images/stats1/cover_big")
+
+    assert client.get("/admin/image-cache").status_code == 403
+    stats = client.get("/admin/image-cache", headers={"X-Admin-Token": "secret"}).json()
+    assert stats["keys"] >= 1
+    assert 0 < stats["bytes"] <= stats["max_bytes"]
@@ -0,0 +1,173 @@
+import asyncio
+import threading
+from datetime import date
+
+import pytest
+
+from app.database.database import Base, engine, SessionLocal
+from app.models import api_usage_model  # noqa: F401
+from app.services.quota_service import add_usage, get_usage
+from app.utils import rate_limiter
+from app.utils.rate_limiter import ApiLimiter, DailyQuota, QuotaExceededError, TokenBucket, INTERACTIVE, BACKGROUND
+
+DAY_1 = date(2026, 1, 1)
+DAY_2 = date(2026, 1, 2)
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(rate_limiter.time, "monotonic", clock)
+    return clock
+
+@pytest.fixture
+def db():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    session = SessionLocal()
+    yield session
+    session.close()
+
+@pytest.fixture
+def today():
+    return [DAY_1]
+
+@pytest.fixture
+def quota(db, today, monkeypatch):
+    quota = DailyQuota("steam", 10)
+    monkeypatch.setattr(quota, "_today", lambda: today[0])
+    return quota
+
+# --- TokenBucket ---
+
+def test_bucket_burst_then_wait(clock):
+    bucket = TokenBucket(rate=2, capacity=3)
+
+    assert [bucket.try_acquire() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket.try_acquire() == pytest.approx(0.5)
+
+    clock.now += 0.5
+    assert bucket.try_acquire() == 0.0
+
+def test_bucket_refill_is_capped(clock):
+    bucket = TokenBucket(rate=10, capacity=2)
+    bucket.try_acquire()
+    clock.now += 60
+
+    assert bucket.available() == 2
+
+def test_background_keeps_reserve_for_interactive(clock, monkeypatch):
+    monkeypatch.setattr(rate_limiter, "RATE_LIMIT_BACKGROUND_RESERVE", 0.5)
+    limiter = ApiLimiter("steam", rate=1, burst=4, daily_limit=0)
+    reserve = limiter._reserve(BACKGROUND)
+
+    assert limiter._reserve(INTERACTIVE) == 0.0
+    assert reserve == 2.0
+    # Segundo plano para quando restam só os tokens reservados
+    assert [limiter.bucket.try_acquire(reserve) for _ in range(2)] == [0.0, 0.0]
+    assert limiter.bucket.try_acquire(reserve) == pytest.approx(1.0)
+    # A reserva continua disponível para chamadas interativas
+    assert [limiter.bucket.try_acquire() for _ in range(2)] == [0.0, 0.0]
+
+def test_bucket_is_thread_safe(clock):
+    bucket = TokenBucket(rate=1, capacity=100)
+    granted = []
+
+    def worker():
+        granted.extend(1 for _ in range(50) if bucket.try_acquire() == 0.0)
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(granted) == 100
+
+# --- DailyQuota ---
+
+def test_quota_limits_by_priority(quota, monkeypatch):
+    monkeypatch.setattr(rate_limiter, "RATE_LIMIT_BACKGROUND_QUOTA", 0.5)
+    for _ in range(5):
+        quota.consume(BACKGROUND)
+
+    with pytest.raises(QuotaExceededError) as error:
+        quota.consume(BACKGROUND)
+    assert error.value.limit == 5
+
+    for _ in range(5):
+        quota.consume(INTERACTIVE)
+    with pytest.raises(QuotaExceededError):
+        quota.consume(INTERACTIVE)
+    assert quota.used() == 10
+
+def test_flush_includes_other_processes(quota, db):
+    quota.consume(INTERACTIVE)
+    quota.consume(INTERACTIVE)
+    # Outro processo gravou chamadas no mesmo dia
+    add_usage(db, "steam", DAY_1, 3)
+
+    quota.flush()
+
+    assert get_usage(db, "steam", DAY_1) == 5
+    assert quota.used() == 5
+
+def test_failed_flush_keeps_pending(quota, db, monkeypatch):
+    quota.consume(INTERACTIVE)
+    monkeypatch.setattr(quota, "_addUsage", lambda day, delta: None)
+
+    quota.flush()
+
+    assert quota.used() == 1
+    assert get_usage(db, "steam", DAY_1) == 0
+
+def test_rollover_flushes_previous_day(quota, db, today):
+    add_usage(db, "steam", DAY_2, 4)
+    for _ in range(3):
+        quota.consume(INTERACTIVE)
+
+    today[0] = DAY_2
+    quota.consume(INTERACTIVE)
+
+    assert get_usage(db, "steam", DAY_1) == 3
+    # O total do novo dia parte do que já está no banco
+    assert quota.used() == 5
+
+def test_async_rollover_reads_off_the_event_loop(quota, today, monkeypatch):
+    limiter = ApiLimiter("steam", rate=100, burst=100, daily_limit=0)
+    limiter.quota = quota
+    quota.consume(INTERACTIVE)
+    today[0] = DAY_2
+
+    loop_thread = threading.get_ident()
+    threads = []
+    load_usage = quota._loadUsage
+    monkeypatch.setattr(quota, "_loadUsage", lambda day: threads.append(threading.get_ident()) or load_usage(day))
+
+    asyncio.run(limiter.aacquire())
+
+    assert threads and loop_thread not in threads
+    assert quota.used() == 1
+
+def test_igdb_routes_answer_429_when_quota_is_exhausted(monkeypatch):
+    from fastapi.testclient import TestClient
+    from app.main import app
+    from app.routes import igdb_routes
+
+    def exhausted(*args, **kwargs):
+        raise QuotaExceededError("igdb", 10, 10)
+
+    for name in ("get_home_feed", "get_trending_games", "find_games", "get_game_by_id"):
+        monkeypatch.setattr(igdb_routes, name, exhausted)
+    client = TestClient(app)
+
+    for path in ("/igdb/home", "/igdb/trending", "/igdb/search?q=hades", "/igdb/games/1"):
+        response = client.get(path)
+        assert response.status_code == 429
+        assert "igdb" in response.json()["detail"]
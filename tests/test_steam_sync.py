@@ -0,0 +1,137 @@
+import asyncio
+
+import pytest
+
+from app.database.database import Base, engine, SessionLocal
+from app.models import user_model, steam_model, job_model, api_usage_model, achievement_model  # noqa: F401
+from app.models.user_model import User, GeneralStats
+from app.services import steam_sync_service
+from app.services.achievement_store_service import STEAM, get_account_stats
+from app.services.steam_service import AchievementRarityIndex
+
+STEAMID = "76561198000000001"
+AGGREGATES = ("total_games", "total_hours", "recent_games")
+
+class FakeSteam:
+    """
+    Steam API em memória: biblioteca editável e appids cujas conquistas falham (como um 403)
+    """
+
+    def __init__(self):
+        self.games = {
+            10: {"appid": 10, "name": "A", "playtime_forever": 5, "playtime_2weeks": 1, "rtime_last_played": 100, "has_community_visible_stats": True},
+            20: {"appid": 20, "name": "B", "playtime_forever": 4, "rtime_last_played": 100, "has_community_visible_stats": True},
+            30: {"appid": 30, "name": "C", "playtime_forever": 6, "rtime_last_played": 100},
+        }
+        self.failing = set()
+        self.fetched = []
+
+    async def owned_games(self, steamid):
+        return {"games": [dict(game) for game in self.games.values()]}
+
+    async def player_achievements(self, steamid, appid):
+        self.fetched.append(appid)
+        if appid in self.failing:
+            return {}
+        return {"achievements": [{"apiname": f"a{appid}_{i}", "achieved": int(i == 0), "unlocktime": 1700000000} for i in range(2)]}
+
+    async def schema(self, appid):
+        return [{"name": f"a{appid}_{i}", "displayName": f"N{i}"} for i in range(2)]
+
+    async def rarity_index(self, appid):
+        return AchievementRarityIndex([{"name": f"a{appid}_0", "percent": 5.0}])
+
+@pytest.fixture
+def steam(monkeypatch):
+    fake = FakeSteam()
+    monkeypatch.setattr(steam_sync_service, "getOwnedGamesAsync", fake.owned_games)
+    monkeypatch.setattr(steam_sync_service, "getPlayerAchievementsAsync", fake.player_achievements)
+    monkeypatch.setattr(steam_sync_service, "getGameAchievementSchemaAsync", fake.schema)
+    monkeypatch.setattr(steam_sync_service, "getAchievementRarityIndexAsync", fake.rarity_index)
+    return fake
+
+@pytest.fixture
+def db():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    session = SessionLocal()
+    yield session
+    session.close()
+
+@pytest.fixture
+def user(db):
+    stats = GeneralStats()
+    db.add(stats)
+    db.commit()
+    user = User(username="sync", email="sync@example.com", password="x", steam_id=STEAMID, general_stats_id=stats.id)
+    db.add(user)
+    db.commit()
+    return user
+
+def _sync(db, user) -> dict:
+    return asyncio.run(steam_sync_service.syncSteamGeneralStats(db, user, user.general_stats))
+
+def _assertStoreMatches(db, result: dict) -> None:
+    store = get_account_stats(db, STEAM, STEAMID)
+    assert {key: store[key] for key in AGGREGATES} == {key: result["stats"][key] for key in AGGREGATES}
+
+def test_first_sync_matches_store(db, user, steam):
+    result = _sync(db, user)
+
+    assert result["refetched_games"] == 3
+    assert result["stats"]["total_games"] == 3
+    assert result["stats"]["total_hours"] == 15
+    _assertStoreMatches(db, result)
+
+def test_unchanged_games_are_not_refetched(db, user, steam):
+    _sync(db, user)
+    steam.fetched.clear()
+    steam.games[10]["playtime_forever"] = 7
+
+    result = _sync(db, user)
+
+    assert result["refetched_games"] == 1
+    assert steam.fetched == [10]
+    _assertStoreMatches(db, result)
+
+def test_failed_fetch_keeps_game_in_store(db, user, steam):
+    _sync(db, user)
+    steam.games[40] = {"appid": 40, "name": "D", "playtime_forever": 1, "rtime_last_played": 200, "has_community_visible_stats": True}
+    steam.failing.add(40)
+
+    result = _sync(db, user)
+
+    assert result["stats"]["total_games"] == 4
+    assert result["stats"]["total_hours"] == 16
+    _assertStoreMatches(db, result)
+
+    # Sem snapshot, o jogo é buscado de novo na sincronização seguinte
+    steam.failing.clear()
+    steam.fetched.clear()
+    result = _sync(db, user)
+    assert steam.fetched == [40]
+    _assertStoreMatches(db, result)
+
+def test_failed_fetch_keeps_previous_unlocks(db, user, steam):
+    first = _sync(db, user)
+    steam.games[10]["playtime_forever"] = 9
+    steam.failing.add(10)
+
+    result = _sync(db, user)
+
+    assert result["stats"]["total_achievements"] == first["stats"]["total_achievements"]
+    store = get_account_stats(db, STEAM, STEAMID)
+    assert store["total_achievements"] == first["stats"]["total_achievements"]
+    _assertStoreMatches(db, result)
+
+def test_removed_game_leaves_store(db, user, steam):
+    steam.games[40] = {"appid": 40, "name": "D", "playtime_forever": 1, "rtime_last_played": 200, "has_community_visible_stats": True}
+    steam.failing.add(40)
+    _sync(db, user)
+    del steam.games[30]
+
+    result = _sync(db, user)
+
+    assert result["stats"]["total_games"] == 3
+    assert result["stats"]["total_hours"] == 10
+    _assertStoreMatches(db, result)
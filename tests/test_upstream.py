@@ -0,0 +1,144 @@
+import asyncio
+import gzip
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+import requests
+
+from app.utils import upstream
+
+class _Api(BaseHTTPRequestHandler):
+    """
+    API local lenta (0,3 s), com corpo gzip, para que as chamadas concorrentes se sobreponham
+    """
+    hits: list = []
+
+    def do_GET(self):
+        self.hits.append(self.path)
+        time.sleep(0.3)
+        body = gzip.compress(json.dumps({"path": self.path}).encode())
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture(scope="module")
+def api():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Api)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+
+@pytest.fixture(autouse=True)
+def no_retries(monkeypatch):
+    monkeypatch.setattr(upstream, "UPSTREAM_MAX_RETRIES", 0)
+    _Api.hits.clear()
+
+def _run(coro):
+    async def run():
+        try:
+            return await coro
+        finally:
+            await upstream.aclose()
+    return asyncio.run(run())
+
+def test_sync_leader_shares_with_async_follower(api):
+    url = f"{api}/sync-first"
+    results = {}
+
+    async def scenario():
+        thread = threading.Thread(target=lambda: results.setdefault("sync", upstream.get(url, params={"a": 1})))
+        thread.start()
+        await asyncio.sleep(0.1)
+        results["async"] = await upstream.aget(url, params={"a": 1})
+        await asyncio.to_thread(thread.join)
+
+    _run(scenario())
+
+    assert len(_Api.hits) == 1
+    assert isinstance(results["sync"], requests.Response)
+    assert isinstance(results["async"], httpx.Response)
+    assert results["sync"].json() == results["async"].json() == {"path": "/sync-first?a=1"}
+    results["async"].raise_for_status()
+
+def test_async_leader_shares_with_sync_follower(api):
+    url = f"{api}/async-first"
+
+    async def scenario():
+        leader = asyncio.create_task(upstream.aget(url))
+        await asyncio.sleep(0.1)
+        follower = await asyncio.to_thread(upstream.get, url)
+        return await leader, follower
+
+    leader, follower = _run(scenario())
+
+    assert len(_Api.hits) == 1
+    assert isinstance(leader, httpx.Response)
+    assert isinstance(follower, requests.Response)
+    assert follower.status_code == 200
+    assert follower.json() == leader.json() == {"path": "/async-first"}
+
+def test_different_keys_are_not_shared(api):
+    async def scenario():
+        return await asyncio.gather(upstream.aget(f"{api}/k", params={"a": 1}), upstream.aget(f"{api}/k", params={"a": 2}))
+
+    _run(scenario())
+
+    assert sorted(_Api.hits) == ["/k?a=1", "/k?a=2"]
+
+def test_errors_are_raised_as_each_callers_library_type(monkeypatch):
+    # Porta fechada: a conexão falha. O envio atrasa para que os dois chamadores entrem no mesmo voo
+    url = "http://127.0.0.1:1/closed"
+    send, asend = upstream._send, upstream._asend
+    attempts = []
+
+    def slow_send(*args, **kwargs):
+        attempts.append("sync")
+        time.sleep(0.2)
+        return send(*args, **kwargs)
+
+    async def slow_asend(*args, **kwargs):
+        attempts.append("async")
+        await asyncio.sleep(0.2)
+        return await asend(*args, **kwargs)
+
+    monkeypatch.setattr(upstream, "_send", slow_send)
+    monkeypatch.setattr(upstream, "_asend", slow_asend)
+    errors = {}
+
+    async def call_async():
+        try:
+            await upstream.aget(url)
+        except Exception as e:
+            errors["async"] = e
+
+    def call_sync():
+        try:
+            upstream.get(url)
+        except Exception as e:
+            errors["sync"] = e
+
+    async def scenario():
+        await asyncio.gather(call_async(), asyncio.to_thread(call_sync))
+
+    _run(scenario())
+
+    assert len(attempts) == 1
+    assert isinstance(errors["async"], httpx.TransportError)
+    assert isinstance(errors["sync"], requests.ConnectionError)
+
+def test_converted_timeouts_keep_their_type():
+    assert isinstance(upstream._asRequestsError(httpx.ReadTimeout("slow")), requests.Timeout)
+    assert isinstance(upstream._asHttpxError(requests.Timeout("slow")), httpx.TimeoutException)
+    error = ValueError("other")
+    assert upstream._asRequestsError(error) is error
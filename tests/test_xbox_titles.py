@@ -0,0 +1,81 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.services import xbox_service
+from app.utils import rate_limiter, upstream
+from app.utils.rate_limiter import ApiLimiter
+
+TIMEOUT = 0.3
+SLOW = 2.0
+
+class _XblIo(BaseHTTPRequestHandler):
+    """
+    xbl.io local: o título "slow" demora SLOW segundos, "broken" responde 500 e os demais respondem na hora
+    """
+
+    def do_GET(self):
+        title_id = self.path.rsplit("/", 1)[-1]
+        if title_id == "slow":
+            time.sleep(SLOW)
+        if title_id == "broken":
+            self.send_response(500)
+            self.end_headers()
+            return
+        body = json.dumps({"achievements": [{"id": f"{title_id}-1"}]}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture(scope="module")
+def xbl_io():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _XblIo)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+
+@pytest.fixture
+def xbox(xbl_io, monkeypatch):
+    monkeypatch.setattr(xbox_service, "BASE_URL", f"http://127.0.0.1:{xbl_io.server_port}")
+    monkeypatch.setattr(xbox_service, "XBOX_API_KEY", "test")
+    monkeypatch.setattr(xbox_service, "XBOX_TITLE_TIMEOUT", TIMEOUT)
+    monkeypatch.setattr(xbox_service, "_loadStoredAchievements", lambda xuid, jogos: {})
+    monkeypatch.setattr(xbox_service, "_storeAchievements", lambda xuid, jogo, achievements: None)
+    monkeypatch.setattr(upstream, "UPSTREAM_MAX_RETRIES", 0)
+    return f"127.0.0.1:{xbl_io.server_port}"
+
+def _fetch(titles) -> list:
+    async def run():
+        try:
+            return await xbox_service.fetchTitlesWithAchievements("X", [{"titleId": title, "name": title} for title in titles])
+        finally:
+            await upstream.aclose()
+    return asyncio.run(run())
+
+def test_page_returns_error_markers_without_waiting_for_slow_titles(xbox):
+    started = time.monotonic()
+    results = _fetch(["slow", "broken", "ok"])
+    elapsed = time.monotonic() - started
+
+    assert [result.get("error") for result in results] == ["timeout", "unavailable", None]
+    assert results[2]["achievements"] == [{"id": "ok-1"}]
+    assert elapsed < SLOW
+
+def test_limiter_wait_does_not_count_against_the_timeout(xbox, monkeypatch):
+    # 1 token de rajada a 4/s: o último título espera ~0,75 s na fila, mais que o timeout
+    monkeypatch.setitem(rate_limiter._limiters, xbox, ApiLimiter("xbox-test", rate=4, burst=1, daily_limit=0))
+
+    results = _fetch(["t1", "t2", "t3", "t4"])
+
+    assert [result.get("error") for result in results] == [None] * 4
+    assert [result["achievements"] for result in results] == [[{"id": f"t{i}-1"}] for i in range(1, 5)]